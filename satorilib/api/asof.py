@@ -0,0 +1,348 @@
+'''
+as-of joins of many streams onto the timeline of a target stream.
+
+each row of the result is a target observation along with the latest
+observation of every other stream at or before its time, as pd.merge_asof
+gives, but every input is aligned to the target timeline directly with one
+searchsorted rather than merging the streams pairwise, and AsOfJoin keeps the
+result so new observations only touch the rows they affect.
+'''
+
+from typing import Union
+import numpy as np
+import pandas as pd
+
+
+class Growable():
+    ''' a numpy array, or 2d array of rows, that grows in amortized constant time '''
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+        self.size = array.shape[0]
+
+    def __len__(self):
+        return self.size
+
+    def view(self) -> np.ndarray:
+        return self.array[:self.size]
+
+    def _reserve(self, count: int):
+        if self.size + count <= self.array.shape[0]:
+            return
+        capacity = max(self.size + count, self.array.shape[0] * 2, 16)
+        array = np.empty((capacity,) + self.array.shape[1:], dtype=self.array.dtype)
+        array[:self.size] = self.array[:self.size]
+        self.array = array
+
+    def append(self, rows: np.ndarray):
+        self._reserve(rows.shape[0])
+        self.array[self.size:self.size + rows.shape[0]] = rows
+        self.size += rows.shape[0]
+
+    def insert(self, position: int, rows: np.ndarray):
+        ''' shifts everything from position along to make room '''
+        count = rows.shape[0]
+        self._reserve(count)
+        self.array[position + count:self.size + count] = self.array[position:self.size]
+        self.array[position:position + count] = rows
+        self.size += count
+
+
+def inTimeOrder(df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+    '''
+    the frame with a datetime index, sorted by time, keeping rows at equal
+    times in their order, and the times as int64 nanoseconds.
+    '''
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df = df.set_axis(pd.DatetimeIndex(pd.to_datetime(df.index)), axis=0)
+    times = df.index.asi8
+    if len(times) > 1 and (times[1:] < times[:-1]).any():
+        order = np.argsort(times, kind='stable')
+        return df.iloc[order], times[order]
+    return df, times
+
+
+def indexOf(times: np.ndarray, name: str = None, tz=None) -> pd.DatetimeIndex:
+    ''' a datetime index over int64 nanoseconds, in the timezone given '''
+    index = pd.DatetimeIndex(times.view('datetime64[ns]'), name=name)
+    if tz is not None:
+        index = index.tz_localize('UTC').tz_convert(tz)
+    return index
+
+
+def targetFirst(dfs: list[pd.DataFrame], targetColumn: 'str|tuple[str]') -> list[pd.DataFrame]:
+    for ix, df in enumerate(dfs):
+        if targetColumn in df.columns:
+            return [df] + dfs[:ix] + dfs[ix + 1:]
+    return list(dfs)
+
+
+def asOf(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    ''' values at positions, NaN where the position is -1, before any observation '''
+    if values.shape[0] == 0:
+        return np.full(positions.shape + values.shape[1:], np.nan)
+    taken = values.take(np.maximum(positions, 0), axis=0)
+    missing = positions < 0
+    if missing.any():
+        if taken.dtype.kind in 'biu':
+            taken = taken.astype(np.float64)
+        elif taken.dtype.kind not in 'fcO':
+            taken = taken.astype(object)
+        taken[missing] = np.nan
+    return taken
+
+
+def asOfMerge(dfs: list[pd.DataFrame], targetColumn: 'str|tuple[str]') -> Union[pd.DataFrame, None]:
+    ''' the as-of join of every frame onto the frame holding the target column '''
+    if len(dfs) == 0:
+        return None
+    dfs = targetFirst(dfs, targetColumn)
+    target, times = inTimeOrder(dfs[0])
+    arrays = [target.iloc[:, i].values for i in range(target.shape[1])]
+    columns = target.columns
+    for df in dfs[1:]:
+        df, featureTimes = inTimeOrder(df)
+        positions = np.searchsorted(featureTimes, times, side='right') - 1
+        arrays.extend([asOf(df.iloc[:, i].values, positions) for i in range(df.shape[1])])
+        columns = columns.append(df.columns)
+    merged = pd.DataFrame(dict(enumerate(arrays)), index=target.index)
+    merged.columns = columns
+    return merged
+
+
+class AsOfJoin():
+    '''
+    an as-of join kept up to date as observations arrive instead of rebuilt.
+    a new target observation adds one row, looking each feature up with a
+    bisect; a feature observation rewrites only that feature's columns, and
+    only in the rows at or after its time. the merged values are one growable
+    2d array, so frame() is a view of it rather than a copy: frames handed
+    out earlier change along with it, copy one to keep it as it was.
+    '''
+
+    def __init__(self, dfs: list[pd.DataFrame], targetColumn: 'str|tuple[str]'):
+        dfs = targetFirst(dfs, targetColumn)
+        merged = asOfMerge(dfs, targetColumn)
+        self.targetColumn = targetColumn
+        self.columns = merged.columns
+        self.indexName = merged.index.name
+        self.tz = merged.index.tz
+        # per input: its times, its values and where its columns start
+        self.inputTimes: list[Growable] = []
+        self.inputValues: list[Growable] = []
+        self.offsets: list[int] = []
+        offset = 0
+        for df in dfs:
+            df, times = inTimeOrder(df)
+            self.inputTimes.append(Growable(times.copy()))
+            self.inputValues.append(Growable(df.values.copy()))
+            self.offsets.append(offset)
+            offset += df.shape[1]
+        dtype = np.result_type(np.float64, *[v.array.dtype for v in self.inputValues])
+        self.times = Growable(merged.index.asi8.copy())
+        self.values = Growable(merged.values.astype(dtype))
+
+    def __len__(self):
+        return len(self.times)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            self.values.view(),
+            index=indexOf(self.times.view(), self.indexName, self.tz),
+            columns=self.columns,
+            copy=False)
+
+    def _inputOf(self, df: pd.DataFrame) -> int:
+        ''' which input the observation belongs to, by its columns '''
+        for ix, offset in enumerate(self.offsets):
+            width = self.inputValues[ix].array.shape[1]
+            if all(column in self.columns[offset:offset + width] for column in df.columns):
+                return ix
+        raise ValueError(f'observation columns not in the join: {list(df.columns)}')
+
+    def _row(self, time: int, targetValues: np.ndarray) -> np.ndarray:
+        ''' a merged row for a target observation '''
+        row = np.empty(self.values.array.shape[1], dtype=self.values.array.dtype)
+        row[:len(targetValues)] = targetValues
+        for ix in range(1, len(self.inputTimes)):
+            width = self.inputValues[ix].array.shape[1]
+            position = np.searchsorted(self.inputTimes[ix].view(), time, side='right') - 1
+            row[self.offsets[ix]:self.offsets[ix] + width] = (
+                self.inputValues[ix].view()[position] if position >= 0 else np.nan)
+        return row
+
+    def _store(self, ix: int, times: np.ndarray, values: np.ndarray):
+        inputTimes = self.inputTimes[ix]
+        for time, value in zip(times, values):
+            position = np.searchsorted(inputTimes.view(), time, side='right')
+            if position == len(inputTimes):
+                inputTimes.append(np.array([time]))
+                self.inputValues[ix].append(value[np.newaxis])
+            else:
+                inputTimes.insert(position, np.array([time]))
+                self.inputValues[ix].insert(position, value[np.newaxis])
+
+    def observe(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        takes new observations of one input, with the same columns the input
+        had, and returns the updated join.
+        '''
+        if df is None or df.empty:
+            return self.frame()
+        ix = self._inputOf(df)
+        df = df.reindex(columns=self.columns[
+            self.offsets[ix]:self.offsets[ix] + self.inputValues[ix].array.shape[1]])
+        df, times = inTimeOrder(df)
+        values = df.values
+        self._store(ix, times, values)
+        if ix == 0:
+            for time, value in zip(times, values):
+                merged = self.times.view()
+                position = np.searchsorted(merged, time, side='left')
+                row = self._row(time, value)
+                if position < len(merged) and merged[position] == time:
+                    self.values.view()[position] = row
+                elif position == len(merged):
+                    self.times.append(np.array([time]))
+                    self.values.append(row[np.newaxis])
+                else:
+                    self.times.insert(position, np.array([time]))
+                    self.values.insert(position, row[np.newaxis])
+            return self.frame()
+        start = np.searchsorted(self.times.view(), times.min(), side='left')
+        if start < len(self.times):
+            positions = np.searchsorted(
+                self.inputTimes[ix].view(),
+                self.times.view()[start:],
+                side='right') - 1
+            self.values.view()[start:, self.offsets[ix]:self.offsets[ix] + values.shape[1]] = (
+                asOf(self.inputValues[ix].view(), positions))
+        return self.frame()
+
+
+class InsertBuffer():
+    '''
+    merged model inputs kept in time order as observations arrive. rows live
+    in growable 2d arrays, so a row after the last is appended in amortized
+    constant time and one earlier is placed with a bisect, rather than
+    appending to a dataframe and sorting it again. the rows are kept as
+    observed, gaps and all, alongside a forward filled copy the frame is a
+    view of. an observation refills only the rows it can change: its own, and
+    the rows after it up to the next observation of each of its columns.
+    '''
+
+    def __init__(self, columns: pd.Index, indexName: str = None, tz=None, dtype=np.float64):
+        self.columns = columns if isinstance(columns, pd.Index) else pd.Index(columns)
+        self.indexName = indexName
+        self.tz = tz
+        self.times = Growable(np.empty(0, dtype=np.int64))
+        self.observed = Growable(np.empty((0, len(self.columns)), dtype=dtype))
+        self.values = Growable(np.empty((0, len(self.columns)), dtype=dtype))
+        self._frame: Union[pd.DataFrame, None] = None
+
+    @staticmethod
+    def fromFrame(df: pd.DataFrame) -> 'InsertBuffer':
+        df, times = inTimeOrder(df)
+        buffer = InsertBuffer(
+            columns=df.columns,
+            indexName=df.index.name,
+            tz=df.index.tz,
+            dtype=np.result_type(np.float64, *df.dtypes.values))
+        dtype = buffer.values.array.dtype
+        buffer.times = Growable(times.copy())
+        buffer.observed = Growable(df.values.astype(dtype))
+        buffer.values = Growable(df.fillna(method='ffill').values.astype(dtype))
+        return buffer
+
+    def __len__(self):
+        return len(self.times)
+
+    def frame(self) -> pd.DataFrame:
+        ''' a view of the forward filled rows, reused until a row is added '''
+        if self._frame is None:
+            self._frame = pd.DataFrame(
+                self.values.view(),
+                index=indexOf(self.times.view(), self.indexName, self.tz),
+                columns=self.columns,
+                copy=False)
+        return self._frame
+
+    def _positionsOf(self, columns: pd.Index) -> np.ndarray:
+        ''' where the columns are, adding any we haven't seen '''
+        missing = columns[self.columns.get_indexer(columns) < 0]
+        if len(missing) > 0:
+            self.columns = self.columns.append(missing)
+            for name in ('observed', 'values'):
+                values = getattr(self, name).view()
+                setattr(self, name, Growable(np.concatenate(
+                    [values, np.full((values.shape[0], len(missing)), np.nan, dtype=values.dtype)],
+                    axis=1)))
+            self._frame = None
+        return self.columns.get_indexer(columns)
+
+    def _fits(self, values: np.ndarray):
+        ''' holds everything as objects once something isn't a number '''
+        if self.values.array.dtype != object and np.result_type(
+            self.values.array.dtype, values.dtype) == object:
+            self.observed.array = self.observed.array.astype(object)
+            self.values.array = self.values.array.astype(object)
+            self._frame = None
+
+    def insert(self, incremental: pd.DataFrame) -> pd.DataFrame:
+        '''
+        puts the rows of the incremental, usually one multicolumn row, in
+        time order, setting just its columns where the time is already held.
+        returns the updated frame.
+        '''
+        if incremental is None or incremental.empty:
+            return self.frame()
+        incremental, times = inTimeOrder(incremental)
+        if self.tz is None and len(self) == 0:
+            self.tz = incremental.index.tz
+        positions = self._positionsOf(incremental.columns)
+        values = incremental.values
+        self._fits(values)
+        for time, row in zip(times, values):
+            self._insertRow(time, row, positions)
+        return self.frame()
+
+    def _insertRow(self, time: int, row: np.ndarray, positions: np.ndarray):
+        times = self.times.view()
+        position = len(times)
+        if position == 0 or times[-1] < time:
+            self._add(position, time)
+        else:
+            position = np.searchsorted(times, time, side='left')
+            if times[position] != time:
+                self._add(position, time)
+        self.observed.view()[position, positions] = row
+        self._fill(position, positions)
+
+    def _add(self, position: int, time: int):
+        empty = np.full((1, len(self.columns)), np.nan, dtype=self.values.array.dtype)
+        if position == len(self.times):
+            self.times.append(np.array([time]))
+            self.observed.append(empty)
+            self.values.append(empty)
+        else:
+            self.times.insert(position, np.array([time]))
+            self.observed.insert(position, empty)
+            self.values.insert(position, empty)
+        if position > 0:
+            # a new row holds what was last observed before it
+            self.values.view()[position] = self.values.view()[position - 1]
+        self._frame = None
+
+    def _fill(self, position: int, positions: np.ndarray):
+        ''' refills the columns from position up to their next observation '''
+        observed = self.observed.view()
+        values = self.values.view()
+        for column in positions:
+            value = observed[position, column]
+            if pd.isna(value):
+                value = values[position - 1, column] if position > 0 else np.nan
+            values[position, column] = value
+            following = pd.isna(observed[position + 1:, column])
+            end = position + 1 + (
+                len(following) if following.all() else int(np.argmin(following)))
+            values[position + 1:end, column] = value
@@ -3,5 +3,8 @@ from satorilib.api.disk.model import ModelApi
 from satorilib.api.disk.wallet import WalletApi
 from satorilib.api.disk.utils import safetify, safetifyWithResult
 from satorilib.api.disk.filetypes.csv import CSVManager
+from satorilib.api.disk.filetypes.binary import BinaryManager, convertCsvFolders
+from satorilib.api.disk.filetypes.sqlite import SqliteManager, migrateCsvFolders
 from satorilib.api.disk.disk import Disk
 from satorilib.api.disk.cache import Cache, Cached
+from satorilib.api.disk.registry import CacheRegistry
@@ -0,0 +1,250 @@
+''' the in memory rows of a stream, grown in place rather than concatenated '''
+
+from typing import Union
+import sys
+import datetime as dt
+from array import array
+from bisect import bisect_left, bisect_right
+import numpy as np
+import pandas as pd
+
+
+class RowBuffer():
+    '''
+    time ordered, unique rows held as one python list per column. lists grow in
+    amortized constant time, so appending an observation doesn't copy history
+    the way concatenating dataframes does. the dataframe view is built on
+    demand and reused until the rows change.
+
+    alongside the timestamps we keep their epoch microseconds in an int64
+    array, so lookups by time are a bisect over integers rather than a mask
+    over the whole index, and timestamps written with or without fractional
+    seconds still land in the right place. if the index isn't made of
+    timestamps we bisect the index values themselves. those same integers
+    give a datetime indexed view of the rows without parsing anything again.
+    '''
+
+    def __init__(self, columns: list = None, indexName: str = None):
+        self.columns = list(columns or [])
+        self.indexName = indexName
+        self.times: list = []
+        self.keys: Union[array, None] = array('q')
+        self.data: dict[str, list] = {column: [] for column in self.columns}
+        self._frame: Union[pd.DataFrame, None] = None
+        self._native: Union[pd.DataFrame, None] = None
+
+    @staticmethod
+    def keyOf(time) -> Union[int, None]:
+        ''' epoch microseconds of a timestamp, None if it isn't one '''
+        if isinstance(time, (dt.datetime, np.datetime64)):
+            time = pd.Timestamp(time)
+            if time is pd.NaT:
+                return None
+            return time.value // 1000
+        try:
+            key = np.datetime64(str(time), 'us')
+        except ValueError:
+            return None
+        return None if np.isnat(key) else int(key.astype(np.int64))
+
+    @staticmethod
+    def keysOf(times: list) -> Union[np.ndarray, None]:
+        try:
+            keys = np.array([str(t) for t in times], dtype='datetime64[us]')
+        except ValueError:
+            return None
+        if np.isnat(keys).any():
+            return None
+        return keys.astype(np.int64)
+
+    @staticmethod
+    def fromFrame(df: pd.DataFrame) -> 'RowBuffer':
+        if df is None:
+            return RowBuffer()
+        keys = RowBuffer.keysOf(df.index)
+        if keys is None:
+            if not (df.index.is_monotonic_increasing and df.index.is_unique):
+                df = df[~df.index.duplicated(keep='last')].sort_index()
+        elif len(keys) > 1 and not (keys[1:] > keys[:-1]).all():
+            # sort by instant, keeping the last of any repeated instant
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            last = np.append(keys[1:] != keys[:-1], True)
+            df = df.iloc[order[last]]
+            keys = keys[last]
+        rows = RowBuffer(columns=df.columns.tolist(), indexName=df.index.name)
+        rows.times = df.index.tolist()
+        rows.keys = array('q', keys.tobytes()) if keys is not None else None
+        rows.data = {column: df[column].tolist() for column in rows.columns}
+        rows._frame = df
+        return rows
+
+    def __len__(self):
+        return len(self.times)
+
+    def __contains__(self, time) -> bool:
+        return self.find(time) is not None
+
+    ### positions ###
+
+    def _bisect(self, time, right: bool = False) -> int:
+        bisect = bisect_right if right else bisect_left
+        if self.keys is not None:
+            key = RowBuffer.keyOf(time)
+            if key is not None:
+                return bisect(self.keys, key)
+        return bisect(self.times, time)
+
+    def _equal(self, position: int, time) -> bool:
+        if self.keys is not None:
+            key = RowBuffer.keyOf(time)
+            if key is not None:
+                return self.keys[position] == key
+        return self.times[position] == time
+
+    def position(self, time) -> int:
+        ''' where time is or would be inserted '''
+        return self._bisect(time)
+
+    def after(self, time) -> int:
+        ''' position of the first row after time '''
+        return self._bisect(time, right=True)
+
+    def find(self, time) -> Union[int, None]:
+        ''' position of the row at time, if there is one '''
+        position = self._bisect(time)
+        if position < len(self.times) and self._equal(position, time):
+            return position
+        return None
+
+    @staticmethod
+    def _same(a, b) -> bool:
+        ''' values read back from disk are floats, but often arrive as strings '''
+        if a == b or (a != a and b != b):
+            return True
+        try:
+            return float(a) == float(b)
+        except (ValueError, TypeError):
+            return False
+
+    def matches(self, time, row: dict) -> bool:
+        ''' True if the row is already held at that time, unchanged '''
+        position = self.find(time)
+        if position is None:
+            return False
+        return all(
+            RowBuffer._same(row.get(column), self.data[column][position])
+            for column in self.columns)
+
+    def last(self, column: str):
+        return self.data[column][-1] if len(self.times) > 0 else None
+
+    def column(self, column: str, start: int = 0, end: int = None) -> list:
+        return self.data[column][start:end] if column in self.data else []
+
+    def nbytes(self) -> int:
+        '''
+        roughly the memory held: the column lists and the objects in them,
+        sized from a sample of rows, the keys, and the dataframe view if built.
+        '''
+        count = len(self.times)
+        if count == 0:
+            return 0
+        sample = range(0, count, max(count // 16, 1))
+        perRow = 8 + (8 if self.keys is not None else 0)
+        for items in [self.times] + [self.data[column] for column in self.columns]:
+            perRow += 8 + sum(sys.getsizeof(items[i]) for i in sample) / len(sample)
+        if self._frame is not None:
+            perRow += 8 * (len(self.columns) + 1)
+        if self._native is not None:
+            perRow += 8
+        return int(count * perRow)
+
+    ### views ###
+
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = pd.DataFrame(
+                {column: self.data[column] for column in self.columns},
+                index=pd.Index(self.times, name=self.indexName))
+        return self._frame
+
+    def nativeFrame(self) -> pd.DataFrame:
+        '''
+        the frame indexed by datetime64 rather than the timestamp strings,
+        made from the keys so nothing is parsed. the same as frame() if the
+        index isn't made of timestamps.
+        '''
+        if self.keys is None:
+            return self.frame()
+        if self._native is None:
+            index = pd.DatetimeIndex(
+                np.frombuffer(self.keys, dtype=np.int64).view('datetime64[us]').astype('datetime64[ns]'),
+                name=self.indexName)
+            self._native = self.frame().set_axis(index, axis=0, copy=False)
+        return self._native
+
+    def nativeSlice(self, start: int = 0, end: int = None) -> pd.DataFrame:
+        return self.nativeFrame().iloc[start:end]
+
+    def frameOf(self, start: int, end: int = None) -> pd.DataFrame:
+        ''' a dataframe of just the rows in [start, end) '''
+        end = end if end is not None else start + 1
+        return pd.DataFrame(
+            {column: self.data[column][start:end] for column in self.columns},
+            index=pd.Index(self.times[start:end], name=self.indexName))
+
+    def slice(self, start: int = 0, end: int = None) -> pd.DataFrame:
+        ''' the rows in [start, end), a view of the dataframe if it's built '''
+        if self._frame is not None:
+            return self._frame.iloc[start:end]
+        return self.frameOf(start, end if end is not None else len(self.times))
+
+    ### changes ###
+
+    def _changed(self):
+        self._frame = None
+        self._native = None
+
+    def insert(self, time, row: dict) -> bool:
+        '''
+        puts the row in time order, replacing any row at the same time.
+        returns True if the row is new.
+        '''
+        if len(self.columns) == 0:
+            self.columns = list(row.keys())
+            self.data = {column: [] for column in self.columns}
+        self._changed()
+        key = RowBuffer.keyOf(time) if self.keys is not None else None
+        if key is None:
+            self.keys = None
+        if len(self.times) == 0 or (
+            self.keys[-1] < key if key is not None else self.times[-1] < time
+        ):
+            self.times.append(time)
+            if key is not None:
+                self.keys.append(key)
+            for column in self.columns:
+                self.data[column].append(row.get(column))
+            return True
+        position = self.find(time)
+        if position is not None:
+            for column in self.columns:
+                self.data[column][position] = row.get(column)
+            return False
+        position = self._bisect(time)
+        self.times.insert(position, time)
+        if key is not None:
+            self.keys.insert(position, key)
+        for column in self.columns:
+            self.data[column].insert(position, row.get(column))
+        return True
+
+    def keep(self, start: int = 0, end: int = None):
+        ''' keeps only the rows in [start, end) '''
+        self._changed()
+        self.times = self.times[start:end]
+        if self.keys is not None:
+            self.keys = self.keys[start:end]
+        for column in self.columns:
+            self.data[column] = self.data[column][start:end]
@@ -2,20 +2,53 @@
 
 from typing import Union
 import os
+import threading
+from functools import wraps
+import datetime as dt
+import numpy as np
 import pandas as pd
 from satorilib import logging
 from satorilib.concepts import StreamId
 from satorilib.api import memory
-from satorilib.api.time import datetimeToTimestamp, earliestDate, now
-from satorilib.api.hash import hashIt, generatePathId, historyHashes, verifyHashes, cleanHashes, verifyRoot, verifyHashesReturnError, verifyHashesReturnLastGood
+from satorilib.api.time import datetimeToTimestamp, datetimesToTimestamps, earliestDate, now
+from satorilib.api.hash import hashIt, generatePathId, historyHashes, verifyHashes, cleanHashes, verifyRoot, verifyHashesReturnError, verifyHashesReturnLastGood, firstBrokenLink
 from satorilib.api.disk import Disk
+from satorilib.api.disk.buffer import RowBuffer
+from satorilib.api.disk.view import StreamView
 from satorilib.api.disk.utils import safetify, safetifyWithResult
 from satorilib.api.disk.model import ModelApi
 from satorilib.api.disk.wallet import WalletApi
-from satorilib.api.disk.filetypes.csv import CSVManager
+from satorilib.api.disk.filetypes import managerOf, SqliteManager
+from satorilib.api.disk.verify import VerificationReport, verifyStreams, workersFromConfig
 from satorilib.concepts import Observation
 
 
+def nativeFromConfig(config) -> bool:
+    ''' reads `native timestamps` from the config, off unless it is set '''
+    try:
+        return str(config.get().get('native timestamps', '')).lower() in ('true', 'yes', '1')
+    except Exception as _:
+        return False
+
+
+def isTime(time) -> bool:
+    return isinstance(time, (str, dt.datetime, np.datetime64))
+
+
+def inUse(method):
+    ''' keeps the registry from unloading the rows while the method runs '''
+    @wraps(method)
+    def pinned(self, *args, **kwargs):
+        with self.pinLock:
+            self.pins += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            with self.pinLock:
+                self.pins -= 1
+    return pinned
+
+
 class CachedResult():
     def __init__(
         self,
@@ -51,16 +84,142 @@ class Cache(Disk):
         id: StreamId = None,
         loc: str = None,
         ext: str = 'csv',
+        lazy: bool = False,
+        registry: 'CacheRegistry' = None,
+        native: bool = None,
         **kwargs,
     ):
+        '''
+        lazy - don't read the stream from disk until its rows are first used
+        registry - the CacheRegistry sharing this cache, told of its use
+        native - hand out times as datetime64 rather than timestamp strings,
+            see nativeFrame. defaults to `native timestamps` in the config
+        '''
+        self._rows = None
+        self.signature = None
+        # how many methods are using the rows, see inUse
+        self.pins = 0
+        self.pinLock = threading.Lock()
+        self.registry = registry
+        self.native = native if native is not None else nativeFromConfig(Cache.config)
         super().__init__(df=df, id=id, loc=loc, ext=ext, **kwargs)
-        self.loadCache()
+        if lazy and df is None:
+            self._rows = None
+        else:
+            self.loadCache()
         self.checkedHash = ''
         self.checkedIndex = None
 
     def __str__(self):
         return f'Cache({self.id}, {self.df.tail()})'
 
+    @property
+    def rows(self) -> RowBuffer:
+        ''' loaded from disk on first use, and again after being unloaded '''
+        if self._rows is None:
+            self._rows = RowBuffer()
+            self.loadCache()
+            if self.registry is not None:
+                self.registry.loaded(self)
+        elif self.registry is not None:
+            self.registry.used(self)
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows: RowBuffer):
+        self._rows = rows
+
+    @property
+    def loaded(self) -> bool:
+        return self._rows is not None
+
+    def unload(self):
+        '''
+        frees the rows, and the connections to a database, they're read from
+        disk again when next used
+        '''
+        self._rows = None
+        if self.ext == 'db':
+            SqliteManager.close(self.path())
+
+    def unloadIdle(self) -> bool:
+        ''' unloads unless a method is using the rows, returns whether it did '''
+        if not self.pinLock.acquire(blocking=False):
+            return False
+        try:
+            if self.pins > 0:
+                return False
+            self.unload()
+            return True
+        finally:
+            self.pinLock.release()
+
+    def fileSignature(self) -> Union[tuple, None]:
+        '''
+        the size and modified time of the file, and of its write ahead log if
+        it has one, None if there's no file
+        '''
+        signature = ()
+        path = self.path()
+        for path in (path, f'{path}-wal'):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature += (stat.st_size, stat.st_mtime_ns)
+        return signature or None
+
+    def isFresh(self) -> bool:
+        ''' nothing else has changed the file since we read or wrote it '''
+        return self.signature == self.fileSignature()
+
+    def refresh(self) -> 'Cache':
+        ''' unloads the rows if something else changed the file since '''
+        if self.loaded and not self.isFresh():
+            self.unload()
+        return self
+
+    def wrote(self, result, fresh: bool):
+        '''
+        after writing the file ourselves, the rows still match it if they
+        did before, so they aren't read again
+        '''
+        if fresh:
+            self.signature = self.fileSignature()
+        return result
+
+    def nbytes(self) -> int:
+        ''' approximate memory held by the rows, 0 if unloaded '''
+        return self._rows.nbytes() if self._rows is not None else 0
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self.rows.frame()
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self.rows = RowBuffer.fromFrame(df)
+
+    @classmethod
+    def verifyStreams(
+        cls,
+        streamIds: list[StreamId],
+        workers: int = None,
+        progress: callable = None,
+        loc: str = None,
+        ext: str = 'csv',
+    ) -> VerificationReport:
+        '''
+        verifies the hash chains of many streams in parallel processes, the
+        number of workers defaults to `verification workers` in the config.
+        '''
+        return verifyStreams(
+            streamIds=streamIds,
+            dataPath=loc or cls.config.dataPath(),
+            workers=workers or workersFromConfig(cls.config),
+            progress=progress,
+            ext=ext)
+
     ### passthru ###
 
     def clearCache(self):
@@ -125,17 +284,20 @@ class Cache(Disk):
         exact: bool = False
     ) -> pd.DataFrame:
         if (
-            not isinstance(time, str) or
-            not any([before, after, exact]) or
-            self.df is None
+            not (isinstance(time, str) or (self.native and isTime(time))) or
+            not any([before, after, exact])
         ):
             return None
+        rowsOf = self.rows.nativeSlice if self.native else self.rows.slice
         if before:
-            return self.df[self.df.index < time]
+            return rowsOf(0, self.rows.position(time))
         if after:
-            return self.df[self.df.index > time]
+            return rowsOf(self.rows.after(time))
         if exact:
-            return self.df[self.df.index == time]
+            position = self.rows.find(time)
+            if position is None:
+                return rowsOf(0, 0)
+            return rowsOf(position, position + 1)
         return None
 
     ### helpers ###
@@ -170,7 +332,7 @@ class Cache(Disk):
     def hashDataFrame(self, df: pd.DataFrame = None, priorRowHash: str = '') -> pd.DataFrame:
         ''' first we have to flattent the columns, then rename them '''
         return historyHashes(
-            df=self.csv.conformFlatColumns(self.memory.flatten(
+            df=self.manager.conformFlatColumns(self.memory.flatten(
                 df if isinstance(df, pd.DataFrame) else self.df)),
             priorRowHash=priorRowHash)
 
@@ -237,22 +399,25 @@ class Cache(Disk):
         with open(path, 'a') as f:
             f.write(prediction)
 
+    @inUse
     def overwriteClean(self) -> bool:
         success, result = self.cleanByHashes()
         if success == False and isinstance(result, pd.DataFrame):
             return self.overwrite(result)
 
+    @inUse
     def overwrite(self, df: pd.DataFrame) -> bool:
-        return self.csv.write(
-            filePath=self.path(),
-            data=self.updateCache(df))
+        data = self.updateCache(df)
+        return self.wrote(self.manager.write(filePath=self.path(), data=data), fresh=True)
 
+    @inUse
     def write(self, df: pd.DataFrame = None) -> bool:
-        return self.csv.write(
-            filePath=self.path(),
-            data=self.updateCache(self.hashDataFrame(
-                self.updateCache(df) if df is not None else self.df)))
+        data = self.updateCache(self.hashDataFrame(
+            self.updateCache(df) if df is not None else self.df))
+        # the rows are the whole file once it's written
+        return self.wrote(self.manager.write(filePath=self.path(), data=data), fresh=True)
 
+    @inUse
     def merge(self, df: pd.DataFrame) -> bool:
         ''' appends to the end of the file while also hashing '''
         if df is None or df.shape[0] == 0 or 'value' not in df.columns:
@@ -270,16 +435,38 @@ class Cache(Disk):
         self.df = self.df.combine_first(df)  # add rows that are not in self.df
         return self.write(self.df)
 
+    @inUse
+    def appendRows(self, df: pd.DataFrame) -> pd.DataFrame:
+        '''
+        puts the rows into the cache in place, returns only those that were
+        new or different from what the cache already held.
+        '''
+        times = []
+        rows = []
+        hashes = df['hash'].tolist() if 'hash' in df.columns else [''] * df.shape[0]
+        for time, value, rowHash in zip(df.index.tolist(), df['value'].tolist(), hashes):
+            row = {'value': value, 'hash': rowHash}
+            if self.rows.matches(time, row):
+                continue
+            self.rows.insert(time, row)
+            times.append(time)
+            rows.append(row)
+        return pd.DataFrame(rows, index=times, columns=['value', 'hash'])
+
+    @inUse
     def append(self, df: pd.DataFrame, hashThis: bool = False) -> bool:
         ''' appends to the end of the file while also hashing '''
-        if self.df.empty:
+        if len(self.rows) == 0:
             self.loadCache()
-            if self.df.empty:
+            if len(self.rows) == 0:
                 return self.write(df)
         if df is None or df.shape[0] == 0 or len(df.columns) > 2:
             return False
-        if all([i in self.df.index for i in df.index]):
+        if all([i in self.rows for i in df.index]):
             return False
+        if isinstance(df.index, pd.DatetimeIndex):
+            # stored and hashed as the timestamp strings
+            df = df.set_axis(datetimesToTimestamps(df.index), axis=0)
         df = df.sort_index()
         if 'hash' not in df.columns:
             if hashThis:
@@ -288,11 +475,12 @@ class Cache(Disk):
                     priorRowHash=self.getHashBefore(df.index[0]))
             else:
                 df['hash'] = ''
-        combined = pd.concat([self.df, df])
-        return self.csv.append(
-            filePath=self.path(),
-            data=self.updateCacheShowDifference(combined))
+        fresh = self.isFresh()
+        return self.wrote(
+            self.manager.append(filePath=self.path(), data=self.appendRows(df)),
+            fresh)
 
+    @inUse
     def appendByAttributes(
         self,
         value: str,
@@ -305,7 +493,12 @@ class Cache(Disk):
         returns success and timestamp and observationHash
         '''
         timestamp = timestamp or datetimeToTimestamp(now())
-        if timestamp in self.df.index:
+        if not isinstance(timestamp, str):
+            # stored and hashed as the timestamp string
+            timestamp = datetimesToTimestamps(pd.DatetimeIndex([timestamp]))[0]
+        if len(self.rows) == 0:
+            self.loadCache()
+        if timestamp in self.rows:
             return CachedResult(
                 success=False,
                 time=timestamp,
@@ -317,18 +510,16 @@ class Cache(Disk):
         df = pd.DataFrame(
             {'value': [value], 'hash': [observationHash]},
             index=[timestamp])
-        if self.df.empty:
-            self.loadCache()
-            if self.df.empty:
-                return CachedResult(
-                    success=self.write(df),
-                    time=timestamp,
-                    hash=observationHash,
-                    data=value,
-                    validated=True)
-        success = self.csv.append(
-            filePath=self.path(),
-            data=self.updateCacheShowDifference(pd.concat([self.df, df]))),
+        if len(self.rows) == 0:
+            return CachedResult(
+                success=self.write(df),
+                time=timestamp,
+                hash=observationHash,
+                data=value,
+                validated=True)
+        fresh = self.isFresh()
+        self.rows.insert(timestamp, {'value': value, 'hash': observationHash})
+        success = self.wrote(self.manager.append(filePath=self.path(), data=df), fresh)
         validated, validatedFrame = self.performValidation()
         return CachedResult(
             time=timestamp,
@@ -338,24 +529,36 @@ class Cache(Disk):
             validated=validated,
             validatedFrame=validatedFrame)
 
+    @inUse
     def performValidation(self, entire: bool = False) -> tuple[bool, Union[pd.DataFrame, None]]:
         ''' validates the hashes (efficiently using cached) returns results'''
-        if self.df.empty:
+        if len(self.rows) == 0:
             return True, None
         if entire:
-            success, df = self.validateAllHashes()
-        else:
-            success, df = self.validateAllHashes(
-                df=(self.df[self.df.index > self.checkedIndex]
-                    if self.checkedIndex is not None else None),
-                priorRowHash=self.checkedHash)
-        return success, df
+            return self.validateAllHashes()
+        if self.checkedIndex is None:
+            return self.validateFromCheckpoint(df=self.df)
+        # only the rows after the last validated one need to be checked
+        start = self.rows.after(self.checkedIndex)
+        position = firstBrokenLink(
+            indexes=[str(time) for time in self.rows.times[start:]],
+            values=[str(value) for value in self.rows.column('value', start)],
+            hashes=self.rows.column('hash', start),
+            priorRowHash=self.checkedHash or '')
+        if position is None:
+            return True, None
+        return False, self.rows.frameOf(start + position - 1) if position > 0 else None
 
+    @inUse
     def modifyBasedValidation(self, success: bool, df: Union[pd.DataFrame, None] = None):
         ''' modification done separately '''
         if success:
-            self.checkedHash = self.df.iloc[-1].hash
-            self.checkedIndex = self.df.index[-1]
+            self.checkedHash = self.rows.last('hash')
+            self.checkedIndex = self.rows.times[-1] if len(self.rows) > 0 else None
+            if self.ext == 'csv':
+                last = self.checkpoints.last()
+                if len(self.rows) - (last.row + 1 if last else 0) >= self.checkpoints.interval:
+                    self.checkpoints.record(self.df)
         else:
             # logging.debug('validation failed', df, color='yellow')
             if df is None or df.empty:
@@ -367,83 +570,121 @@ class Cache(Disk):
                 self.checkedIndex = df.index[-1]
         return success
 
+    @inUse
     def clear(self) -> Union[bool, None]:
         self.updateCacheSimple(self.df[0:0])
-        self.csv.write(filePath=self.path(), data=self.df)
+        self.wrote(self.manager.write(filePath=self.path(), data=self.df), fresh=True)
 
     def remove(self) -> Union[bool, None]:
-        self.csv.remove(filePath=self.path())
+        self.manager.remove(filePath=self.path())
+        self.checkpoints.clear()
+        self.rowIndex.clear()
         self.clearCache()
 
+    @inUse
     def removeItAndAfter(self, timestamp) -> Union[bool, None]:
-        self.updateCacheSimple(self.df[self.df.index < timestamp])
-        self.csv.write(filePath=self.path(), data=self.df)
-
+        self.rows.keep(end=self.rows.position(timestamp))
+        if self.ext == 'db':
+            # a delete by key rather than rewriting what's left
+            fresh = self.isFresh()
+            return self.wrote(self.manager.removeFrom(filePath=self.path(), time=timestamp), fresh)
+        self.wrote(self.manager.write(filePath=self.path(), data=self.df), fresh=True)
+
+    @inUse
     def removeItAndBefore(self, timestamp) -> Union[bool, None]:
-        self.updateCacheSimple(self.df[self.df.index > timestamp])
-        self.csv.write(filePath=self.path(), data=self.df)
+        self.rows.keep(start=self.rows.after(timestamp))
+        if self.ext == 'db':
+            fresh = self.isFresh()
+            return self.wrote(self.manager.removeThrough(filePath=self.path(), time=timestamp), fresh)
+        self.wrote(self.manager.write(filePath=self.path(), data=self.df), fresh=True)
 
     ### read ###
 
     @property
     def cache(self) -> pd.DataFrame:
-        if self.df.empty:
+        if len(self.rows) == 0:
             self.loadCache()
-        return self.df
+        return self.nativeFrame if self.native else self.df
+
+    @property
+    def nativeFrame(self) -> pd.DataFrame:
+        '''
+        the rows indexed by datetime64, from the times parsed once at load,
+        so sorting, lookups and the as of joins of gather need not parse
+        the timestamp strings again. the strings themselves are kept for the
+        hash chain and for writing, so neither changes by a byte.
+        '''
+        return self.rows.nativeFrame()
 
     def loadCache(self) -> pd.DataFrame:
+        # taken first, so a change made while reading is seen next time
+        self.signature = self.fileSignature()
         return self.updateCache(self.read())
 
     def read(self, start: int = None, end: int = None) -> Union[pd.DataFrame, None]:
         if not self.exists():
             return None
         if start != None:
-            return self.csv.readLines(
+            return self.manager.readLines(
                 filePath=self.path(),
                 start=start,
                 end=end).sort_index()
-        return self.csv.read(filePath=self.path())
+        return self.manager.read(filePath=self.path())
 
     def timeExistsInAggregate(self, time: str) -> bool:
-        return isinstance(self.df, pd.DataFrame) and time in self.df.index
+        return time in self.rows
 
     def getRowCounts(self) -> int:
         ''' returns number of rows in incremental and aggregate tables '''
-        if isinstance(self.df, pd.DataFrame):
-            return self.df.shape[0]
-        try:
-            df = self.read()
-            if isinstance(df, pd.DataFrame):
-                return df.shape[0]
-        except Exception as _:
-            return 0
+        return len(self.rows)
+
+    def getHashOf(self, time: str) -> Union[str, None]:
+        ''' gets the hash of the observation at the given time '''
+        position = self.rows.find(time)
+        if position is None or 'hash' not in self.rows.data:
+            return None
+        return self.rows.data['hash'][position]
 
     def getHashBefore(self, time: str) -> str:
         ''' gets the hash of the observation just before a given time '''
-        rows = self.search(time, before=True)
-        if rows is None or rows.empty:
+        if not isTime(time) or 'hash' not in self.rows.data:
+            return ''
+        position = self.rows.position(time)
+        if position == 0:
             return ''
-        return rows.iloc[-1].hash
+        return self.rows.data['hash'][position - 1]
 
     def getObservationAfter(self, time: str) -> pd.DataFrame:
         ''' gets the observation just after a given time '''
-        rows = self.search(time, after=True)
-        if rows.empty:
-            return rows
-        return rows.iloc[[0]]
+        position = self.rows.after(time)
+        return self.rows.frameOf(position, min(position + 1, len(self.rows)))
 
     def getObservationBefore(self, time: str) -> pd.DataFrame:
         ''' gets the observation just before a given time '''
-        rows = self.search(time, before=True)
-        if rows.empty:
-            return rows
-        return rows.iloc[[-1]]
-
-    def getLatestObservationTime(self) -> str:
-        ''' gets most recent time '''
-        if self.df is None or self.df.empty:
+        position = self.rows.position(time)
+        return self.rows.frameOf(max(position - 1, 0), position)
+
+    def getLatestObservationTime(self) -> 'str|pd.Timestamp':
+        ''' gets most recent time, a pd.Timestamp if native '''
+        if self.native:
+            if len(self.rows) == 0:
+                return pd.Timestamp.min
+            return self.nativeFrame.index[-1]
+        if len(self.rows) == 0:
             return datetimeToTimestamp(earliestDate())
-        return self.df.sort_index().index.values[-1]
+        return self.rows.times[-1]
+
+    def views(self, streamIds: list[StreamId] = None) -> dict[StreamId, Union[StreamView, None]]:
+        '''
+        zero copy views of the streams for read only consumers like training,
+        None for any stream not stored in the binary format.
+        '''
+        return {
+            streamId: (
+                self if streamId == self.id
+                # a plain Disk, since a Cache would load the whole stream
+                else Disk(id=streamId, loc=self.loc, ext=self.ext)).view()
+            for streamId in (streamIds or [self.id])}
 
     def gather(
         self,
@@ -451,6 +692,7 @@ class Cache(Disk):
         streamIds: list[StreamId] = None,
     ) -> pd.DataFrame:
         ''' retrieves the targets and merges them '''
+        from satorilib.api.disk.registry import CacheRegistry
         streamIds = streamIds or [
             self.id or
             StreamId(
@@ -462,10 +704,15 @@ class Cache(Disk):
                     if len(self.df.columns.levels) == 4 else None))]
         dfs = []
         for streamId in streamIds:
-            df = (self if streamId == self.id else Cache(id=streamId)).read()
-            if df is None:
+            # shared caches rather than rereading every stream from disk,
+            # only read again if something else has written to it since
+            df = (
+                self if streamId == self.id
+                else CacheRegistry.instance().get(streamId, loc=self.loc, ext=self.ext)
+            ).refresh().cache
+            if df is None or df.empty:
                 continue
-            dfs.append(self.memory.expand(df=df, streamId=streamId))
+            dfs.append(self.memory.expand(df=df.copy(), streamId=streamId))
         if len(dfs) == 0:
             return None
         if len(dfs) == 1:
@@ -0,0 +1,239 @@
+'''
+verified milestones of a stream's hash chain, saved next to its aggregate file.
+
+every `interval` rows we record the row number, its timestamp and hash, the byte
+offset just past its line in the aggregate file, and a digest chained over the
+file's bytes up to that offset. after a restart we can trust everything up to
+the latest checkpoint by re-digesting the file prefix (native speed) instead of
+re-hashing every row, and only walk the hash chain from there. if the prefix
+was modified or the file truncated the digests won't match and we fall back to
+verifying the entire history.
+'''
+
+from typing import Union
+import os
+import hashlib
+import pandas as pd
+
+
+class Checkpoint():
+    def __init__(self, row: int, time: str, hash: str, offset: int, digest: str):
+        self.row = row
+        self.time = time
+        self.hash = hash
+        self.offset = offset
+        self.digest = digest
+
+    def __repr__(self):
+        return f'Checkpoint({self.row}, {self.time}, {self.hash}, {self.offset})'
+
+    def toLine(self) -> str:
+        return f'{self.row},{self.time},{self.hash},{self.offset},{self.digest}\n'
+
+    @staticmethod
+    def fromLine(line: str) -> 'Checkpoint':
+        row, time, hash, offset, digest = line.strip().split(',')
+        return Checkpoint(
+            row=int(row),
+            time=time,
+            hash=hash,
+            offset=int(offset),
+            digest=digest)
+
+
+class Checkpoints():
+    ''' manages the checkpoint sidecar file of one stream '''
+
+    interval = 10000
+    chunkSize = 1024 * 1024
+
+    def __init__(self, filePath: str, dataPath: str, interval: int = None):
+        '''
+        filePath - path of the checkpoint sidecar file
+        dataPath - path of the aggregate file the checkpoints describe
+        '''
+        self.filePath = filePath
+        self.dataPath = dataPath
+        self.interval = interval or Checkpoints.interval
+        self.checkpoints: Union[list[Checkpoint], None] = None
+
+    ### helpers ###
+
+    @staticmethod
+    def _digest(priorDigest: str, chunks) -> str:
+        hasher = hashlib.blake2b(bytes.fromhex(priorDigest), digest_size=16)
+        for chunk in chunks:
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def _chunks(self, f, start: int, end: int):
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(self.chunkSize, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+    @staticmethod
+    def _parseLine(line: bytes) -> tuple[bytes, bytes]:
+        ''' returns the timestamp and hash of a `time,value,hash` line '''
+        fields = line.rstrip(b'\r\n').split(b',')
+        return fields[0], fields[-1]
+
+    @staticmethod
+    def _matchesRow(df: pd.DataFrame, checkpoint: Checkpoint) -> bool:
+        return (
+            checkpoint.row < df.shape[0] and
+            str(df.index[checkpoint.row]) == checkpoint.time and
+            str(df['hash'].iloc[checkpoint.row]) == checkpoint.hash)
+
+    ### read ###
+
+    def load(self) -> list[Checkpoint]:
+        if self.checkpoints is None:
+            self.checkpoints = []
+            if os.path.exists(self.filePath):
+                try:
+                    with open(self.filePath, mode='r') as f:
+                        self.checkpoints = [
+                            Checkpoint.fromLine(line) for line in f if line.strip()]
+                except Exception as _:
+                    self.checkpoints = []
+        return self.checkpoints
+
+    def last(self) -> Union[Checkpoint, None]:
+        checkpoints = self.load()
+        return checkpoints[-1] if len(checkpoints) > 0 else None
+
+    def trusted(self, df: pd.DataFrame) -> Union[Checkpoint, None]:
+        '''
+        returns the latest checkpoint if the aggregate file still holds exactly
+        the bytes it was recorded from, its row is still in the same place in
+        the dataframe, and every line after it is accounted for in the
+        dataframe; otherwise None, meaning verify the entire history.
+        '''
+        checkpoints = self.load()
+        if len(checkpoints) == 0 or df is None or df.empty:
+            return None
+        last = checkpoints[-1]
+        try:
+            if os.path.getsize(self.dataPath) < last.offset:
+                return None
+            if not Checkpoints._matchesRow(df, last):
+                return None
+            with open(self.dataPath, mode='rb') as f:
+                priorOffset = 0
+                priorDigest = ''
+                for checkpoint in checkpoints:
+                    priorDigest = Checkpoints._digest(
+                        priorDigest,
+                        self._chunks(f, priorOffset, checkpoint.offset))
+                    if priorDigest != checkpoint.digest:
+                        return None
+                    priorOffset = checkpoint.offset
+                f.seek(last.offset)
+                tail = f.read()
+        except Exception as _:
+            return None
+        tailRows = tail.count(b'\n') + (
+            1 if len(tail) > 0 and not tail.endswith(b'\n') else 0)
+        if tailRows != df.shape[0] - last.row - 1:
+            return None
+        return last
+
+    ### write ###
+
+    def save(self, checkpoints: list[Checkpoint]) -> bool:
+        self.checkpoints = checkpoints
+        try:
+            with open(self.filePath, mode='w') as f:
+                f.write(''.join([c.toLine() for c in checkpoints]))
+            return True
+        except Exception as _:
+            return False
+
+    def clear(self) -> bool:
+        self.checkpoints = []
+        try:
+            os.remove(self.filePath)
+            return True
+        except FileNotFoundError as _:
+            return True
+        except Exception as _:
+            return False
+
+    def _stillValid(self, df: pd.DataFrame, checkpoint: Checkpoint) -> bool:
+        ''' cheap check that the file wasn't rewritten under the checkpoint '''
+        if not Checkpoints._matchesRow(df, checkpoint):
+            return False
+        try:
+            with open(self.dataPath, mode='rb') as f:
+                start = max(0, checkpoint.offset - 512)
+                f.seek(start)
+                lines = f.read(checkpoint.offset - start).splitlines()
+        except Exception as _:
+            return False
+        if len(lines) == 0:
+            return False
+        time, rowHash = Checkpoints._parseLine(lines[-1])
+        return (
+            time.decode() == checkpoint.time and
+            rowHash.decode() == checkpoint.hash)
+
+    def record(self, df: pd.DataFrame) -> bool:
+        '''
+        extends the checkpoints over a dataframe whose hash chain was just
+        verified. scans the aggregate file from the last checkpoint, stops at
+        the first line that isn't the corresponding row of the dataframe, or
+        isn't in strictly increasing time order, since then the file and the
+        verified dataframe no longer describe the same rows.
+        '''
+        if df is None or df.empty or not os.path.exists(self.dataPath):
+            return False
+        checkpoints = list(self.load())
+        last = checkpoints[-1] if len(checkpoints) > 0 else None
+        if last is not None and not self._stillValid(df, last):
+            checkpoints = []
+            last = None
+        if df.shape[0] - (last.row + 1 if last else 0) < self.interval:
+            return False
+        row = last.row if last else -1
+        offset = last.offset if last else 0
+        priorDigest = last.digest if last else ''
+        priorTime = last.time.encode() if last else b''
+        hashes = df['hash']
+        added = []
+        with open(self.dataPath, mode='rb') as f:
+            f.seek(offset)
+            segment = []
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                row += 1
+                if row >= df.shape[0]:
+                    break
+                time, rowHash = Checkpoints._parseLine(line)
+                if time <= priorTime:
+                    break
+                priorTime = time
+                offset += len(line)
+                segment.append(line)
+                if (row + 1) % self.interval != 0:
+                    continue
+                time = time.decode()
+                rowHash = rowHash.decode()
+                if time != str(df.index[row]) or rowHash != str(hashes.iloc[row]):
+                    break
+                priorDigest = Checkpoints._digest(priorDigest, segment)
+                segment = []
+                added.append(Checkpoint(
+                    row=row,
+                    time=time,
+                    hash=rowHash,
+                    offset=offset,
+                    digest=priorDigest))
+        if len(added) == 0:
+            return False
+        return self.save(checkpoints + added)
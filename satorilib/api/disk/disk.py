@@ -11,7 +11,10 @@ from satorilib.api.interfaces.model import ModelDataDiskApi
 from satorilib.api.disk.utils import safetify, safetifyWithResult
 from satorilib.api.disk.model import ModelApi
 from satorilib.api.disk.wallet import WalletApi
-from satorilib.api.disk.filetypes.csv import CSVManager
+from satorilib.api.disk.filetypes import managerOf
+from satorilib.api.disk.checkpoint import Checkpoints
+from satorilib.api.disk.rowindex import RowIndex
+from satorilib.api.disk.view import StreamView
 
 
 class Disk(ModelDataDiskApi):
@@ -34,7 +37,6 @@ class Disk(ModelDataDiskApi):
         **kwargs,
     ):
         self.memory = memory.Memory
-        self.csv = CSVManager()
         self.setAttributes(df=df, id=id, loc=loc, ext=ext, **kwargs)
 
     def setAttributes(
@@ -53,6 +55,7 @@ class Disk(ModelDataDiskApi):
             target=kwargs.get('target'))
         self.loc = loc
         self.ext = ext
+        self.manager = managerOf(ext)
         return self
 
     def setId(self, id: StreamId = None):
@@ -124,16 +127,70 @@ class Disk(ModelDataDiskApi):
     def exists(self, filename: str = None):
         return os.path.exists(self.path(filename=filename))
 
+    @property
+    def checkpoints(self) -> Checkpoints:
+        ''' verified milestones of the hash chain, kept next to the data '''
+        dataPath = self.path()
+        if (
+            not hasattr(self, '_checkpoints') or
+            self._checkpoints is None or
+            self._checkpoints.dataPath != dataPath
+        ):
+            self._checkpoints = Checkpoints(
+                filePath=self.path(filename='checkpoints.csv'),
+                dataPath=dataPath)
+        return self._checkpoints
+
+    @property
+    def rowIndex(self) -> RowIndex:
+        ''' sparse timestamp to row and byte offset index, kept next to the data '''
+        return RowIndex.of(self.path())
+
+    def updateCache(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df is not None:
+            self.df = df
+        return df
+
+    def addToCacheCount(self, count: int):
+        ''' extends the row index over the rows just appended '''
+        if count > 0 and self.ext == 'csv':
+            self.rowIndex.refresh()
+
     def hashDataFrame(self, df: pd.DataFrame = None, priorRowHash: str = '') -> pd.DataFrame:
         ''' first we have to flattent the columns, then rename them '''
         return historyHashes(
-            df=self.csv.conformFlatColumns(self.memory.flatten(df)),
+            df=self.manager.conformFlatColumns(self.memory.flatten(df)),
             priorRowHash=priorRowHash)
 
     def validateAllHashes(self, df: pd.DataFrame = None, priorRowHash: str = '') -> tuple[bool, Union[pd.DataFrame, None]]:
         ''' passthrough for hashing verification '''
+        if not isinstance(df, pd.DataFrame) and not priorRowHash:
+            return self.validateFromCheckpoint()
         return verifyHashes(df=df if isinstance(df, pd.DataFrame) else self.read(), priorRowHash=priorRowHash)
 
+    def validateFromCheckpoint(self, df: pd.DataFrame = None) -> tuple[bool, Union[pd.DataFrame, None]]:
+        '''
+        verifies the entire history, but only hashes the rows after the last
+        trusted checkpoint; without one it hashes everything. on success the
+        checkpoints are extended so the next restart has less to do.
+        '''
+        df = df if isinstance(df, pd.DataFrame) else self.read()
+        if df is None or df.empty:
+            return True, None
+        # checkpoints locate rows by csv line, other formats verify everything
+        checkpoint = self.checkpoints.trusted(df) if self.ext == 'csv' else None
+        if checkpoint is None:
+            success, result = verifyHashes(df=df)
+        else:
+            success, result = verifyHashes(
+                df=df.iloc[checkpoint.row + 1:],
+                priorRowHash=checkpoint.hash)
+            if not success and result is None:
+                result = df.iloc[checkpoint.row].to_frame().T
+        if success and self.ext == 'csv':
+            self.checkpoints.record(df)
+        return success, result
+
     def validateAllHashesReturnError(self, df: pd.DataFrame = None, priorRowHash: str = '') -> tuple[bool, Union[pd.DataFrame, None]]:
         ''' passthrough for hashing verification '''
         return verifyHashesReturnError(df=df if isinstance(df, pd.DataFrame) else self.read(), priorRowHash=priorRowHash)
@@ -189,7 +246,8 @@ class Disk(ModelDataDiskApi):
             f.write(prediction)
 
     def write(self, df: pd.DataFrame) -> bool:
-        return self.csv.write(
+        self.rowIndex.clear()
+        return self.manager.write(
             filePath=self.path(),
             data=self.updateCache(self.hashDataFrame(df.sort_index())))
 
@@ -199,25 +257,28 @@ class Disk(ModelDataDiskApi):
             return False
         # assumes no duplicates...
         df = df.sort_index()
-        self.addToCacheCount(df.shape[0])
-        if 'hash' in df.columns:
-            return self.csv.append(filePath=self.path(), data=df)
-        if hashThis:
-            df = self.hashDataFrame(
-                df=df,
-                priorRowHash=self.getHashBefore(df.index[0]))
-        else:
-            df['hash'] = ''
-        return self.csv.append(
-            filePath=self.path(),
-            data=df)
+        if 'hash' not in df.columns:
+            if hashThis:
+                df = self.hashDataFrame(
+                    df=df,
+                    priorRowHash=self.getHashBefore(df.index[0]))
+            else:
+                df['hash'] = ''
+        success = self.manager.append(filePath=self.path(), data=df)
+        if success:
+            self.addToCacheCount(df.shape[0])
+        return success
 
     def remove(self) -> Union[bool, None]:
-        self.csv.remove(filePath=self.path())
+        self.manager.remove(filePath=self.path())
+        self.checkpoints.clear()
+        self.rowIndex.clear()
 
     def removeItAndBeforeIt(self, timestamp) -> Union[bool, None]:
+        if self.ext == 'db':
+            return self.manager.removeThrough(filePath=self.path(), time=timestamp)
         df = self.read()
-        self.csv.write(
+        self.manager.write(
             filePath=self.path(),
             data=df[df.index > timestamp])
 
@@ -227,29 +288,70 @@ class Disk(ModelDataDiskApi):
         if not self.exists():
             return None
         if start == None:
-            df = self.csv.read(filePath=self.path())
+            df = self.manager.read(filePath=self.path())
             self.updateCache(df)
             df = df.sort_index()
             return df
-        return self.csv.readLines(filePath=self.path(), start=start, end=end).sort_index()
+        return self.manager.readLines(filePath=self.path(), start=start, end=end).sort_index()
 
-    def getHashOf(self, time: str) -> Union[str, None]:
-        ''' gets the hash of the observation at the given time '''
+    def view(self) -> Union[StreamView, None]:
+        '''
+        memory maps the stream for read only use without loading it, None
+        unless it's stored in the binary format (ext='bin').
+        '''
+        if self.ext != 'bin' or not self.exists():
+            return None
+        records = self.manager.memmap(filePath=self.path())
+        return StreamView(records) if records is not None else None
+
+    def searchCache(self, time: str) -> tuple[Union[int, None], Union[int, None], Union[str, None]]:
+        '''
+        looks the time up in the row index, returns the rows between which the
+        observations before, at and after the time are found, and the time of
+        the first of those rows. (None, None, None) if the index can't be used.
+        '''
+        found = self.rowIndex.search(time) if self.ext == 'csv' else None
+        if found is None:
+            return None, None, None
+        return found
+
+    def readIndexed(self, time: str) -> Union[pd.DataFrame, None]:
+        '''
+        reads just the rows surrounding time by seeking to their byte offsets,
+        None if the index can't be used or the rows aren't as it describes.
+        '''
         before, after, index = self.searchCache(time)
         if index is None:
             return None
-        if before == after:
-            series = self.read(start=before).iloc[0]
-            if series is not None and 'hash' in series:
-                return series.hash
+        start = self.rowIndex.offsetOf(before)
+        end = self.rowIndex.offsetOf(after)
+        if start is None or end is None:
+            return None
+        df = self.manager.readBytes(filePath=self.path(), start=start, end=end)
+        if df is None or str(df.index[0]) != index:
+            # the file was rewritten in a way the index didn't notice
+            self.rowIndex.clear()
+            return None
+        if not df.index.is_monotonic_increasing:
+            # lines were appended out of time order, only a full read will do
             return None
-        df = self.read(start=before, end=after)
+        return df
+
+    def getHashOf(self, time: str) -> Union[str, None]:
+        ''' gets the hash of the observation at the given time '''
+        if self.ext == 'db':
+            df = self.manager.rowOf(filePath=self.path(), time=time) if self.exists() else None
+            return df['hash'].values[0] if df is not None else None
+        df = self.readIndexed(time)
+        df = df if df is not None else self.read()
         if df is not None and 'hash' in df and time in df.index:
             return df.loc[time].hash
         return None
 
     def getHashBefore(self, time: str, df: pd.DataFrame = None) -> Union[str, None]:
         ''' gets the hash of the observation just before a given time '''
+        if df is None and self.ext == 'db':
+            df = self.manager.before(filePath=self.path(), time=time) if self.exists() else None
         df = df if df is not None else self.read()
         if df is None or df.shape[0] == 0:
             return ''
@@ -290,67 +392,32 @@ class Disk(ModelDataDiskApi):
     def getObservationAfter(self, time: str) -> Union[pd.DataFrame, None]:
         ''' gets the observation just after a given time '''
 
-        def getTheRow(df):
-
-            def getRowAfterTime(df: pd.DataFrame, targetTime: str) -> Union[pd.DataFrame, None]:
-                timeAfterTarget = df[df.index > targetTime].index.max()
-                # not np.nan which is a float
-                if timeAfterTarget is not pd.NaT and isinstance(timeAfterTarget, str):
-                    return df.loc[[timeAfterTarget]]
+        def getRowAfterTime(df: pd.DataFrame) -> Union[pd.DataFrame, None]:
+            if df is None:
                 return None
+            rows = df[df.index > time]
+            return rows.iloc[[0]] if not rows.empty else None
 
-            row = getRowAfterTime(df, time)
-            if row is not None:
-                return row
-            return None
-
-        before, after, index = self.searchCache(time)
-        if index is None:
-            return None
-        if before == after:
-            if (before == 0 or index < time):
-                df = self.read(start=after, end=after+2)
-            else:
-                df = self.read(start=after, end=after+2)
-            if df is not None:
-                return df
-        else:
-            theRow = getTheRow(self.read(start=before, end=after+2))
-            if theRow is not None:
-                return theRow
-        return getTheRow(self.read())
+        if self.ext == 'db':
+            df = self.manager.after(filePath=self.path(), time=time) if self.exists() else None
+            return df if df is not None and not df.empty else None
+        df = self.readIndexed(time)
+        return getRowAfterTime(df if df is not None else self.read())
 
     def getObservationBefore(self, time: str) -> Union[pd.DataFrame, None]:
         ''' gets the observation just before a given time '''
 
-        def getTheRow(df):
-
-            def getRowBeforeTime(df: pd.DataFrame, targetTime: str) -> Union[pd.DataFrame, None]:
-                timeBeforeTarget = df[df.index < targetTime].index.max()
-                if timeBeforeTarget is not pd.NaT:
-                    return df.loc[[timeBeforeTarget]]
+        def getRowBeforeTime(df: pd.DataFrame) -> Union[pd.DataFrame, None]:
+            if df is None:
                 return None
-
-            row = getRowBeforeTime(df, time)
-            if row is not None:
-                return row
-            return None
-
-        before, after, index = self.searchCache(time)
-        if index is None:
-            return None
-        if before == after:
-            if (before == 0 or index < time):
-                df = self.read(start=before)
-            else:
-                df = self.read(start=before-1)
-            if df is not None:
-                return df
-        else:
-            theRow = getTheRow(self.read(start=before, end=after))
-            if theRow is not None:
-                return theRow
-        return getTheRow(self.read())
+            rows = df[df.index < time]
+            return rows.iloc[[-1]] if not rows.empty else None
+
+        if self.ext == 'db':
+            df = self.manager.before(filePath=self.path(), time=time) if self.exists() else None
+            return df if df is not None and not df.empty else None
+        df = self.readIndexed(time)
+        return getRowBeforeTime(df if df is not None else self.read())
 
     def gather(
         self,
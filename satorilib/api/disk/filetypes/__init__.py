@@ -0,0 +1,14 @@
+from satorilib.api.interfaces.data import FileManager
+from satorilib.api.disk.filetypes.csv import CSVManager
+from satorilib.api.disk.filetypes.binary import BinaryManager, convertCsvFolders
+from satorilib.api.disk.filetypes.sqlite import SqliteManager, migrateCsvFolders
+
+managers = {
+    'csv': CSVManager,
+    'bin': BinaryManager,
+    'db': SqliteManager}
+
+
+def managerOf(ext: str) -> FileManager:
+    ''' the file manager for a file extension, csv by default '''
+    return managers.get(ext, CSVManager)()
@@ -0,0 +1,310 @@
+'''
+an append friendly, memory mappable binary format for stream history.
+
+after a 16 byte header every row is a fixed width record:
+    time  - int64, microseconds since the epoch
+    hash  - the 8 raw bytes of the 16 character hex hash (zeros when unhashed)
+    value - float64 or int64, according to the header
+fixed width records mean appending is writing bytes to the end of the file,
+reading a range of rows is a seek, and the whole file can be memory mapped as a
+numpy structured array whose fields are typed column views.
+
+timestamps are rendered back to '%Y-%m-%d %H:%M:%S.%f' on read, so only
+timestamps in that exact form can be stored, and only numeric values, since the
+hash chain depends on their string form; write refuses anything else.
+'''
+
+from typing import Union
+import os
+import numpy as np
+import pandas as pd
+from satorilib import logging
+from satorilib.api.interfaces.data import FileManager
+from satorilib.api.disk.filetypes.csv import CSVManager
+
+# the value of every hex digit, 255 for anything else
+_nibbles = np.full(256, 255, dtype=np.uint8)
+_nibbles[np.frombuffer(b'0123456789abcdef', dtype=np.uint8)] = np.arange(16)
+_nibbles[np.frombuffer(b'ABCDEF', dtype=np.uint8)] = np.arange(10, 16)
+
+# rendering timestamps: two ascii digits at a time into a fixed layout per row
+_digitPairs = np.array([f'{i:02d}'.encode() for i in range(100)], dtype='S2')
+_timeDigits = [
+    ('century', 0), ('year', 2), ('month', 5), ('day', 8), ('hour', 11),
+    ('minute', 14), ('second', 17), ('micro0', 20), ('micro1', 22),
+    ('micro2', 24)]
+_timeSeparators = [
+    ('dash0', b'-'), ('dash1', b'-'), ('space', b' '), ('colon0', b':'),
+    ('colon1', b':'), ('dot', b'.'), ('newline', b'\n')]
+_timeLayout = np.dtype({
+    'names': [name for name, _ in _timeDigits] + [name for name, _ in _timeSeparators],
+    'formats': ['S2'] * len(_timeDigits) + ['S1'] * len(_timeSeparators),
+    'offsets': [offset for _, offset in _timeDigits] + [4, 7, 10, 13, 16, 19, 26],
+    'itemsize': 27})
+
+
+class BinaryManager(FileManager):
+    ''' manages reading and writing to fixed width binary files using numpy '''
+
+    magic = b'SATBIN'
+    version = 1
+    headerSize = 16
+    kinds = {b'd': '<f8', b'q': '<i8'}
+    timeFormat = '%Y-%m-%d %H:%M:%S.%f'
+
+    @staticmethod
+    def recordType(kind: bytes) -> np.dtype:
+        return np.dtype([
+            ('time', '<i8'),
+            ('hash', 'V8'),
+            ('value', BinaryManager.kinds[kind])])
+
+    ### conversions ###
+
+    @staticmethod
+    def _header(kind: bytes) -> bytes:
+        return (
+            BinaryManager.magic +
+            bytes([BinaryManager.version]) +
+            kind +
+            bytes(BinaryManager.headerSize - len(BinaryManager.magic) - 2))
+
+    @staticmethod
+    def _kindOf(header: bytes) -> bytes:
+        if len(header) < BinaryManager.headerSize or not header.startswith(BinaryManager.magic):
+            raise ValueError('not a satori binary file')
+        return header[len(BinaryManager.magic) + 1:len(BinaryManager.magic) + 2]
+
+    @staticmethod
+    def timesToStrings(times: np.ndarray) -> list[str]:
+        ''' renders epoch microseconds as '%Y-%m-%d %H:%M:%S.%f' strings '''
+        times = np.asarray(times, dtype=np.int64)
+        days, micros = np.divmod(times, 86_400_000_000)
+        # civil from days, http://howardhinnant.github.io/date_algorithms.html
+        z = days.astype(np.int32) + 719468
+        era = z // 146097
+        doe = z - era * 146097
+        yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+        doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+        mp = (5 * doy + 2) // 153
+        day = doy - (153 * mp + 2) // 5 + 1
+        month = np.where(mp < 10, mp + 3, mp - 9)
+        year = yoe + era * 400 + (month <= 2)
+        seconds, micros = np.divmod(micros, 1_000_000)
+        seconds = seconds.astype(np.int32)
+        micros = micros.astype(np.int32)
+        minutes, seconds = np.divmod(seconds, 60)
+        hours, minutes = np.divmod(minutes, 60)
+        chars = np.empty(times.shape[0], dtype=_timeLayout)
+        for name, separator in _timeSeparators:
+            chars[name] = separator
+        for name, number in [
+            ('century', year // 100), ('year', year % 100), ('month', month),
+            ('day', day), ('hour', hours), ('minute', minutes),
+            ('second', seconds), ('micro0', micros // 10000),
+            ('micro1', micros // 100 % 100), ('micro2', micros % 100),
+        ]:
+            chars[name] = _digitPairs[number]
+        return chars.tobytes().decode('ascii').split('\n')[:-1]
+
+    @staticmethod
+    def stringsToTimes(strings: 'list[str]|pd.Index') -> np.ndarray:
+        ''' parses '%Y-%m-%d %H:%M:%S.%f' strings into epoch microseconds '''
+        # numpy rather than pandas, whose nanoseconds end at the year 2262
+        return np.array(
+            [str(s) for s in strings],
+            dtype='datetime64[us]').astype(np.int64)
+
+    @staticmethod
+    def hashesToStrings(hashes: np.ndarray) -> list:
+        ''' renders 8 raw bytes per row as hex, all zeros as missing '''
+        raw = hashes.tobytes()
+        if len(raw) == 0:
+            return []
+        strings = raw.hex('\n', 8).split('\n')
+        for position in np.flatnonzero(
+            ~np.frombuffer(raw, dtype=np.uint8).reshape(-1, 8).any(axis=1)
+        ):
+            strings[position] = np.nan
+        return strings
+
+    @staticmethod
+    def stringsToHashes(strings: list) -> np.ndarray:
+        ''' parses 16 character hex hashes into 8 raw bytes, missing as zeros '''
+        strings = [
+            s if isinstance(s, str) and s != '' else '0' * 16
+            for s in strings]
+        if any(len(s) != 16 for s in strings):
+            raise ValueError('hashes must be 16 hex characters')
+        nibbles = _nibbles[
+            np.frombuffer(''.join(strings).encode('ascii'), dtype=np.uint8)
+        ].reshape(-1, 16)
+        if (nibbles == 255).any():
+            raise ValueError('hashes must be 16 hex characters')
+        return (nibbles[:, 0::2] << 4 | nibbles[:, 1::2]).copy().view('V8').ravel()
+
+    @staticmethod
+    def valueKind(values: pd.Series) -> bytes:
+        if pd.api.types.is_bool_dtype(values):
+            raise ValueError('values must be numeric')
+        if pd.api.types.is_integer_dtype(values):
+            return b'q'
+        if pd.api.types.is_numeric_dtype(values):
+            return b'd'
+        pd.to_numeric(values, errors='raise')
+        return b'd'
+
+    def toRecords(self, data: pd.DataFrame, kind: bytes = None) -> tuple[np.ndarray, bytes]:
+        data = self.conformFlatColumns(data)
+        kind = kind or BinaryManager.valueKind(data['value'])
+        times = BinaryManager.stringsToTimes(data.index)
+        if BinaryManager.timesToStrings(times) != [str(i) for i in data.index]:
+            raise ValueError(
+                f'timestamps must be formatted as {BinaryManager.timeFormat}')
+        records = np.empty(data.shape[0], dtype=BinaryManager.recordType(kind))
+        records['time'] = times
+        records['value'] = pd.to_numeric(data['value'], errors='raise').to_numpy(
+            dtype=BinaryManager.kinds[kind])
+        records['hash'] = BinaryManager.stringsToHashes(
+            data['hash'].tolist() if 'hash' in data.columns else [''] * data.shape[0])
+        return records, kind
+
+    def toFrame(self, records: np.ndarray, clean: bool = True) -> pd.DataFrame:
+        if clean and records.shape[0] > 1:
+            times = records['time']
+            if not (times[1:] > times[:-1]).all():
+                records = records[np.argsort(times, kind='stable')]
+                times = records['time']
+                # keep the last of any duplicated times, like the csv manager
+                records = records[np.append(times[1:] != times[:-1], True)]
+        return pd.DataFrame(
+            {
+                'value': records['value'],
+                'hash': BinaryManager.hashesToStrings(records['hash'])},
+            index=BinaryManager.timesToStrings(records['time']))
+
+    ### read ###
+
+    def memmap(self, filePath: str) -> Union[np.memmap, None]:
+        ''' the records of the file, mapped read only, without copying '''
+        try:
+            with open(filePath, mode='rb') as f:
+                kind = BinaryManager._kindOf(f.read(BinaryManager.headerSize))
+            recordType = BinaryManager.recordType(kind)
+            rows = (os.path.getsize(filePath) - BinaryManager.headerSize) // recordType.itemsize
+            if rows == 0:
+                return np.empty(0, dtype=recordType)
+            return np.memmap(
+                filePath,
+                dtype=recordType,
+                mode='r',
+                offset=BinaryManager.headerSize,
+                shape=(rows,))
+        except Exception as _:
+            return None
+
+    def read(self, filePath: str, **kwargs) -> pd.DataFrame:
+        try:
+            with open(filePath, mode='rb') as f:
+                kind = BinaryManager._kindOf(f.read(BinaryManager.headerSize))
+                records = np.fromfile(f, dtype=BinaryManager.recordType(kind))
+            return self.toFrame(records)
+        except Exception as _:
+            return None
+
+    def readLines(
+        self,
+        filePath: str,
+        start: int,
+        end: int = None,
+    ) -> Union[pd.DataFrame, None]:
+        ''' 0-indexed, a negative start counts back from the end of the file '''
+        count = self._lineCount(start, end)
+        try:
+            with open(filePath, mode='rb') as f:
+                kind = BinaryManager._kindOf(f.read(BinaryManager.headerSize))
+                recordType = BinaryManager.recordType(kind)
+                if start < 0:
+                    rows = (os.path.getsize(filePath) - BinaryManager.headerSize) // recordType.itemsize
+                    start = max(rows + start, 0)
+                f.seek(BinaryManager.headerSize + start * recordType.itemsize)
+                records = np.fromfile(f, dtype=recordType, count=count)
+            return self.toFrame(records, clean=False)
+        except Exception as e:
+            logging.error('unable to get data', e, print=True)
+            return None
+
+    ### write ###
+
+    def write(self, filePath: str, data: pd.DataFrame) -> bool:
+        try:
+            records, kind = self.toRecords(data)
+            temp = f'{filePath}.tmp'
+            with open(temp, mode='wb') as f:
+                f.write(BinaryManager._header(kind))
+                f.write(records.tobytes())
+            os.replace(temp, filePath)
+            return True
+        except Exception as e:
+            logging.error('unable to write binary file', e)
+            return False
+
+    def append(self, filePath: str, data: pd.DataFrame) -> bool:
+        try:
+            if not os.path.exists(filePath) or os.path.getsize(filePath) < BinaryManager.headerSize:
+                return self.write(filePath, data)
+            with open(filePath, mode='rb') as f:
+                kind = BinaryManager._kindOf(f.read(BinaryManager.headerSize))
+            if kind == b'q' and BinaryManager.valueKind(self.conformFlatColumns(data)['value']) != b'q':
+                # integer file receiving floats, widen the whole file
+                return self.write(filePath, self._merge([self.read(filePath), data]))
+            records, _ = self.toRecords(data, kind=kind)
+            with open(filePath, mode='ab') as f:
+                f.write(records.tobytes())
+            return True
+        except Exception as e:
+            logging.error('unable to append to binary file', e)
+            return False
+
+
+def convertCsvFolders(
+    dataPath: str,
+    remove: bool = False,
+    manager: FileManager = None,
+    ext: str = 'bin',
+) -> dict[str, bool]:
+    '''
+    one shot conversion of every stream folder's aggregate.csv under dataPath
+    into aggregate.bin, or aggregate.{ext} written by the manager given. each
+    converted file is read back and compared to the csv before it counts as a
+    success. the csv is only removed when asked to and the conversion
+    succeeded. returns {folder: success}.
+    '''
+    csv = CSVManager()
+    binary = manager or BinaryManager()
+    results = {}
+    for folder in sorted(os.listdir(dataPath)):
+        csvPath = os.path.join(dataPath, folder, 'aggregate.csv')
+        if not os.path.isfile(csvPath):
+            continue
+        binPath = os.path.join(dataPath, folder, f'aggregate.{ext}')
+        df = csv.read(filePath=csvPath)
+        success = (
+            df is not None and
+            binary.write(filePath=binPath, data=df.copy()))
+        if success:
+            converted = binary.read(filePath=binPath)
+            success = (
+                converted is not None and
+                converted.index.tolist() == df.index.tolist() and
+                [str(v) for v in converted['value']] == [str(v) for v in df['value']] and
+                converted['hash'].fillna('').tolist() == (
+                    df['hash'].fillna('').tolist() if 'hash' in df.columns
+                    else [''] * df.shape[0]))
+        if not success:
+            logging.warning('unable to convert', csvPath, f'to {ext}, keeping csv')
+            binary.remove(filePath=binPath)
+        elif remove:
+            csv.remove(filePath=csvPath)
+        results[folder] = success
+    return results
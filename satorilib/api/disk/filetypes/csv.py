@@ -1,47 +1,16 @@
 from typing import Union
+import io
 import os
 import pandas as pd
 from satorilib.api.interfaces.data import FileManager
+from satorilib.api.disk.rowindex import RowIndex
 from satorilib import logging
 
 
 class CSVManager(FileManager):
     ''' manages reading and writing to CSV files usind pandas '''
 
-    def _conformBasic(self, df: pd.DataFrame) -> pd.DataFrame:
-        return self._conformIndexName(self.conformFlatColumns(df))
-
-    def _conformIndexName(self, df: pd.DataFrame) -> pd.DataFrame:
-        df.index.name = None
-        return df
-
-    def conformFlatColumns(self, df: pd.DataFrame) -> pd.DataFrame:
-        if len(df.columns) == 1:
-            df.columns = ['value']
-        if len(df.columns) == 2:
-            df.columns = ['value', 'hash']
-        return df
-
-    def _clean(self, df: pd.DataFrame) -> pd.DataFrame:
-        return self._sort(self._dedupe(df))
-
-    def _sort(self, df: pd.DataFrame) -> pd.DataFrame:
-        return df.sort_index()
-
-    def _dedupe(self, df: pd.DataFrame) -> pd.DataFrame:
-        return df[~df.index.duplicated(keep='last')]
-
-    def _merge(self, dfs: list[pd.DataFrame]) -> pd.DataFrame:
-        return self._clean(pd.concat(dfs, axis=0))
-
-    def remove(self, filePath: str) -> Union[bool, None]:
-        try:
-            os.remove(filePath)
-            return True
-        except FileNotFoundError as _:
-            return None
-        except Exception as _:
-            return False
+    tailBlockSize = 64 * 1024
 
     def read(self, filePath: str, **kwargs) -> pd.DataFrame:
         try:
@@ -72,26 +41,72 @@ class CSVManager(FileManager):
         except Exception as _:
             return False
 
+    def readBytes(self, filePath: str, start: int, end: int = None) -> Union[pd.DataFrame, None]:
+        ''' parses only the lines held in bytes [start, end) of the file '''
+        try:
+            with open(filePath, mode='rb') as f:
+                f.seek(start)
+                raw = f.read(end - start) if end is not None else f.read()
+            if len(raw) == 0:
+                return None
+            return self._conformBasic(pd.read_csv(io.BytesIO(raw), index_col=0, header=None))
+        except Exception as e:
+            logging.error('unable to get data', e, print=True)
+            return None
+
     def readLines(
         self,
         filePath: str,
         start: int,
         end: int = None,
     ) -> Union[pd.DataFrame, None]:
-        ''' 0-indexed '''
-        end = (end if end is not None and end > start else None) or start+1
-        capture = end - start - 1
+        '''
+        0-indexed, reads rows [start, end) or just the row at start. a negative
+        start counts back from the end of the file, like a python index.
+        rather than tokenizing every line before start we seek to the nearest
+        row in the file's row index and skip at most an interval of lines.
+        '''
+        count = self._lineCount(start, end)
+        if start < 0:
+            df = self.readTail(filePath, rows=-start)
+            return df.iloc[:count] if df is not None else None
+        try:
+            index = RowIndex.of(filePath)
+            index.refresh()
+            row, offset = index.seek(start)
+            with open(filePath, mode='rb') as f:
+                f.seek(offset)
+                for _ in range(start - row):
+                    f.readline()
+                lines = [f.readline() for _ in range(count)]
+            return self._parseLines(lines)
+        except Exception as e:
+            logging.error('unable to get data', e, print=True)
+            return None
+
+    def readTail(self, filePath: str, rows: int = 1) -> Union[pd.DataFrame, None]:
+        ''' the last rows of the file, found by reading backwards from its end '''
         try:
-            df = self._conformBasic(pd.read_table(
-                filePath,
-                sep=",",
-                index_col=0,
-                header=None,
-                skiprows=start,
-                # skipfooter=end, # slicing is faster; since using c engine
-                # engine='python', # required for skipfooter
-            ))
-            return df.iloc[[capture]] if capture == 0 else df.iloc[0:capture+1]
+            with open(filePath, mode='rb') as f:
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                raw = b''
+                # one more newline than rows guarantees the first is whole
+                while position > 0 and raw.rstrip(b'\r\n').count(b'\n') < rows:
+                    step = min(self.tailBlockSize, position)
+                    position -= step
+                    f.seek(position)
+                    raw = f.read(step) + raw
+            lines = raw.splitlines()[1 if position > 0 else 0:]
+            return self._parseLines([line for line in lines if line.strip()][-rows:])
         except Exception as e:
             logging.error('unable to get data', e, print=True)
             return None
+
+    def _parseLines(self, lines: list[bytes]) -> Union[pd.DataFrame, None]:
+        raw = b''.join([
+            line if line.endswith(b'\n') else line + b'\n'
+            for line in lines if line.strip()])
+        if len(raw) == 0:
+            return None
+        return self._conformBasic(pd.read_csv(io.BytesIO(raw), index_col=0, header=None))
@@ -0,0 +1,245 @@
+'''
+stream history in a sqlite database, one table keyed by timestamp.
+
+the primary key is the timestamp text, and the '%Y-%m-%d %H:%M:%S.%f' layout
+sorts as it reads, so lookups around a time, ranges of rows and removing
+everything after a time are indexed queries rather than reading or rewriting
+the whole file. values are stored as they're given, the hash chain depends on
+their string form, and read back as numbers where they are numbers, as csv is.
+'''
+
+from typing import Union
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from satorilib import logging
+from satorilib.sqlite.pool import ConnectionPool
+from satorilib.api.interfaces.data import FileManager
+from satorilib.api.disk.filetypes.binary import convertCsvFolders
+
+# a database per stream, so a smaller page cache than a shared database gets
+pragmas = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -2000,
+    'busy_timeout': 5000,
+}
+
+
+class SqliteManager(FileManager):
+    '''
+    manages reading and writing stream history to sqlite databases. the
+    connections to the most recently used databases are kept open, beyond
+    maxPools the least recently used are retired, to be opened again the next
+    time they're used. a retired database's connections are closed by the
+    threads that own them, the next time each asks for a connection, so none
+    is closed while another thread is using it.
+    '''
+
+    create = (
+        'create table if not exists stream ('
+        'ts text primary key, value, hash text) without rowid')
+    maxPools = 64
+    pools: OrderedDict[str, ConnectionPool] = OrderedDict()
+    retired: list[ConnectionPool] = []
+    lock = threading.Lock()
+
+    @staticmethod
+    def connection(filePath: str) -> sqlite3.Connection:
+        ''' this thread's connection to the database, kept open '''
+        with SqliteManager.lock:
+            pool = SqliteManager.pools.get(filePath)
+            if pool is None:
+                pool = ConnectionPool(filePath, pragmas=pragmas, initialize=SqliteManager.create)
+                SqliteManager.pools[filePath] = pool
+                while len(SqliteManager.pools) > max(SqliteManager.maxPools, 1):
+                    SqliteManager.retired.append(SqliteManager.pools.popitem(last=False)[1])
+            else:
+                SqliteManager.pools.move_to_end(filePath)
+        SqliteManager.release()
+        conn = pool.connection()
+        with SqliteManager.lock:
+            if SqliteManager.pools.get(filePath) is not pool and not any(
+                pool is stale for stale in SqliteManager.retired
+            ):
+                # retired while we connected, and since let go of by the rest
+                SqliteManager.retired.append(pool)
+        return conn
+
+    @staticmethod
+    def close(filePath: str = None):
+        '''
+        retires the connections to a database, or to all of them, closing
+        this thread's now and every other thread's when it's done with it
+        '''
+        with SqliteManager.lock:
+            SqliteManager.retired.extend(
+                pool for pool in (
+                    SqliteManager.pools.pop(path, None)
+                    for path in ([filePath] if filePath else list(SqliteManager.pools.keys())))
+                if pool is not None)
+        SqliteManager.release()
+
+    @staticmethod
+    def release():
+        ''' closes this thread's connections to retired databases '''
+        with SqliteManager.lock:
+            retired = list(SqliteManager.retired)
+        closed = [pool for pool in retired if pool.release()]
+        if closed:
+            with SqliteManager.lock:
+                SqliteManager.retired = [
+                    pool for pool in SqliteManager.retired
+                    if not any(pool is done for done in closed)]
+
+    ### conversions ###
+
+    def toFrame(self, rows: list[tuple]) -> pd.DataFrame:
+        ''' rows of (ts, value, hash) as a frame like the csv manager reads '''
+        times, values, hashes = zip(*rows) if rows else ([], [], [])
+        values = pd.Series(values, dtype=object if len(values) == 0 else None)
+        if values.dtype == object:
+            values = pd.to_numeric(values, errors='ignore')
+        hashes = pd.Series(hashes, dtype=object)
+        df = pd.DataFrame(
+            {'value': values.values, 'hash': hashes.where(hashes.notna(), np.nan).values},
+            index=pd.Index(times, dtype=object))
+        return self._conformIndexName(df)
+
+    def toRows(self, data: pd.DataFrame) -> list[tuple]:
+        data = self.conformFlatColumns(data)
+        hashes = (
+            data['hash'].where(data['hash'].notna(), None).tolist()
+            if 'hash' in data.columns else [None] * data.shape[0])
+        return list(zip(
+            [str(time) for time in data.index],
+            data['value'].tolist(),
+            hashes))
+
+    def _select(self, filePath: str, where: str = '', params: tuple = (), order: str = 'asc', limit: int = None, offset: int = 0) -> Union[pd.DataFrame, None]:
+        if not os.path.exists(filePath):
+            return None
+        query = f'select ts, value, hash from stream {where} order by ts {order}'
+        if limit is not None:
+            query += ' limit ? offset ?'
+            params = (*params, limit, offset)
+        try:
+            rows = SqliteManager.connection(filePath).execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            logging.error('unable to read stream database', e)
+            return None
+        return self.toFrame(rows[::-1] if order == 'desc' else rows)
+
+    ### read ###
+
+    def read(self, filePath: str, **kwargs) -> pd.DataFrame:
+        return self._select(filePath)
+
+    def readLines(
+        self,
+        filePath: str,
+        start: int,
+        end: int = None,
+    ) -> Union[pd.DataFrame, None]:
+        ''' 0-indexed, a negative start counts back from the end '''
+        count = self._lineCount(start, end)
+        if start < 0:
+            if -start >= count:
+                # counted back from the newest rather than counting them all
+                df = self._select(filePath, order='desc', limit=count, offset=-start - count)
+                if df is None or len(df) == count:
+                    return df
+            start = max(self.rowCount(filePath) + start, 0)
+        return self._select(filePath, limit=count, offset=start)
+
+    def rowCount(self, filePath: str) -> int:
+        if not os.path.exists(filePath):
+            return 0
+        return SqliteManager.connection(filePath).execute(
+            'select count(*) from stream').fetchone()[0]
+
+    def rowOf(self, filePath: str, time: str) -> Union[pd.DataFrame, None]:
+        ''' the observation at time, None if there isn't one '''
+        df = self._select(filePath, where='where ts = ?', params=(time,))
+        return df if df is not None and not df.empty else None
+
+    def before(self, filePath: str, time: str, count: int = 1) -> Union[pd.DataFrame, None]:
+        ''' the last count observations before time '''
+        return self._select(filePath, where='where ts < ?', params=(time,), order='desc', limit=count)
+
+    def after(self, filePath: str, time: str, count: int = 1) -> Union[pd.DataFrame, None]:
+        ''' the first count observations after time '''
+        return self._select(filePath, where='where ts > ?', params=(time,), limit=count)
+
+    def between(self, filePath: str, start: str = None, end: str = None) -> Union[pd.DataFrame, None]:
+        ''' observations in [start, end), either end open if not given '''
+        conditions = [
+            condition for condition, time in [('ts >= ?', start), ('ts < ?', end)]
+            if time is not None]
+        return self._select(
+            filePath,
+            where=('where ' + ' and '.join(conditions)) if conditions else '',
+            params=tuple(time for time in (start, end) if time is not None))
+
+    ### write ###
+
+    def write(self, filePath: str, data: pd.DataFrame) -> bool:
+        try:
+            conn = SqliteManager.connection(filePath)
+            with conn:
+                conn.execute('delete from stream')
+                conn.executemany('insert or replace into stream values (?, ?, ?)', self.toRows(data))
+            return True
+        except Exception as e:
+            logging.error('unable to write stream database', e)
+            return False
+
+    def append(self, filePath: str, data: pd.DataFrame) -> bool:
+        ''' adds the rows, replacing any already held at the same times '''
+        try:
+            conn = SqliteManager.connection(filePath)
+            with conn:
+                conn.executemany('insert or replace into stream values (?, ?, ?)', self.toRows(data))
+            return True
+        except Exception as e:
+            logging.error('unable to append to stream database', e)
+            return False
+
+    def removeFrom(self, filePath: str, time: str) -> bool:
+        ''' removes the observation at time and every one after it '''
+        return self._delete(filePath, 'delete from stream where ts >= ?', time)
+
+    def removeThrough(self, filePath: str, time: str) -> bool:
+        ''' removes the observation at time and every one before it '''
+        return self._delete(filePath, 'delete from stream where ts <= ?', time)
+
+    def _delete(self, filePath: str, query: str, time: str) -> bool:
+        if not os.path.exists(filePath):
+            return False
+        try:
+            conn = SqliteManager.connection(filePath)
+            with conn:
+                conn.execute(query, (time,))
+            return True
+        except sqlite3.Error as e:
+            logging.error('unable to remove from stream database', e)
+            return False
+
+    def remove(self, filePath: str) -> Union[bool, None]:
+        SqliteManager.close(filePath)
+        for path in (f'{filePath}-wal', f'{filePath}-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        return super().remove(filePath)
+
+
+def migrateCsvFolders(dataPath: str, remove: bool = False) -> dict[str, bool]:
+    '''
+    one shot conversion of every stream folder's aggregate.csv under dataPath
+    into aggregate.db, checked the same way convertCsvFolders checks the
+    binary conversion. returns {folder: success}.
+    '''
+    return convertCsvFolders(dataPath, remove=remove, manager=SqliteManager(), ext='db')
@@ -0,0 +1,144 @@
+''' one shared cache per stream for the whole process, within a memory budget '''
+
+from typing import Union
+import threading
+from collections import OrderedDict
+from satorilib import logging
+from satorilib.concepts import StreamId
+from satorilib.api.disk.cache import Cache
+
+
+def budgetFromConfig(config) -> Union[int, None]:
+    ''' reads `cache memory budget`, in megabytes, from the config if it is set '''
+    try:
+        budget = config.get().get('cache memory budget')
+        return int(float(budget) * 1024 * 1024) if budget else None
+    except Exception as _:
+        return None
+
+
+class CacheRegistry():
+    '''
+    hands out one lazily loaded Cache per stream rather than every caller
+    constructing its own and reading the file again. caches are kept in least
+    recently used order; when the rows they hold add up to more than the
+    budget, the least recently used are unloaded, to be read from disk again
+    the next time they're used.
+    '''
+
+    budget = 1024 * 1024 * 1024
+    shared: Union['CacheRegistry', None] = None
+
+    @classmethod
+    def instance(cls) -> 'CacheRegistry':
+        ''' the process wide registry '''
+        if cls.shared is None:
+            cls.shared = CacheRegistry(budget=budgetFromConfig(Cache.config))
+        return cls.shared
+
+    def __init__(self, budget: int = None, loc: str = None, ext: str = 'csv'):
+        '''
+        budget - bytes of rows to hold across all streams
+        loc, ext - passed on to every Cache not asked for with its own
+        '''
+        self.budget = budget or CacheRegistry.budget
+        self.loc = loc
+        self.ext = ext
+        # keyed by stream, folder and file type, see keyOf
+        self.caches: OrderedDict[tuple, Cache] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    def __repr__(self):
+        return f'CacheRegistry({self.stats})'
+
+    @property
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'streams': len(self.caches),
+                'loaded': sum(1 for cache in self.caches.values() if cache.loaded),
+                'bytes': self.nbytes(),
+                'budget': self.budget,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions}
+
+    def nbytes(self) -> int:
+        with self.lock:
+            return sum(cache.nbytes() for cache in self.caches.values())
+
+    @staticmethod
+    def keyOf(cache: Cache) -> tuple:
+        return (cache.id, cache.loc, cache.ext)
+
+    def get(self, streamId: StreamId, loc: str = None, ext: str = None) -> Cache:
+        '''
+        the shared cache of a stream, its rows are read when first used.
+        loc and ext default to the registry's.
+        '''
+        key = (streamId, self.loc if loc is None else loc, ext or self.ext)
+        with self.lock:
+            cache = self.caches.get(key)
+            if cache is None:
+                cache = Cache(
+                    id=streamId,
+                    loc=key[1],
+                    ext=key[2],
+                    lazy=True,
+                    registry=self)
+                self.caches[key] = cache
+            elif cache.loaded:
+                self.hits += 1
+            self.caches.move_to_end(key)
+            return cache
+
+    def remove(self, streamId: StreamId, loc: str = None, ext: str = None):
+        key = (streamId, self.loc if loc is None else loc, ext or self.ext)
+        with self.lock:
+            cache = self.caches.pop(key, None)
+            if cache is not None:
+                cache.registry = None
+
+    def clear(self):
+        with self.lock:
+            for cache in self.caches.values():
+                cache.registry = None
+            self.caches = OrderedDict()
+
+    ### called by the caches ###
+
+    def used(self, cache: Cache):
+        with self.lock:
+            if CacheRegistry.keyOf(cache) in self.caches:
+                self.caches.move_to_end(CacheRegistry.keyOf(cache))
+
+    def loaded(self, cache: Cache):
+        ''' a cache just read its stream from disk '''
+        with self.lock:
+            self.misses += 1
+            if CacheRegistry.keyOf(cache) in self.caches:
+                self.caches.move_to_end(CacheRegistry.keyOf(cache))
+            self.enforce(keep=cache)
+
+    def enforce(self, keep: Cache = None):
+        '''
+        unloads least recently used caches until within the budget, skipping
+        any a thread is changing
+        '''
+        with self.lock:
+            total = self.nbytes()
+            for cache in list(self.caches.values()):
+                if total <= self.budget:
+                    break
+                if cache is keep or not cache.loaded:
+                    continue
+                nbytes = cache.nbytes()
+                # one in the middle of a change is left for next time
+                if not cache.unloadIdle():
+                    continue
+                total -= nbytes
+                self.evictions += 1
+                logging.debug('unloaded cache', cache.id)
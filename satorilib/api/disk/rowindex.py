@@ -0,0 +1,218 @@
+'''
+a sparse index of a stream's aggregate csv, saved next to it.
+
+every `interval` rows we note the row number, its timestamp and the byte offset
+its line starts at. a lookup by time bisects these entries and seeks straight
+to the few blocks of lines that can hold the answer, rather than reading or
+skipping through the file from the top. the index is extended from where it
+left off whenever lines are appended, and rebuilt if the file was rewritten
+underneath it.
+'''
+
+from typing import Union
+import os
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+
+class RowIndex():
+    ''' manages the row index sidecar file of one stream '''
+
+    interval = 1000
+    chunkSize = 16 * 1024 * 1024
+    suffix = '.rowindex.csv'
+    indexes: dict[str, 'RowIndex'] = {}
+
+    @classmethod
+    def sidecarOf(cls, dataPath: str) -> str:
+        ''' aggregate.csv is indexed in aggregate.rowindex.csv beside it '''
+        return f'{os.path.splitext(dataPath)[0]}{cls.suffix}'
+
+    @classmethod
+    def of(cls, dataPath: str) -> 'RowIndex':
+        ''' the index of an aggregate file, shared within the process '''
+        index = cls.indexes.get(dataPath)
+        if index is None or index.interval != cls.interval:
+            index = RowIndex(filePath=cls.sidecarOf(dataPath), dataPath=dataPath)
+            cls.indexes[dataPath] = index
+        return index
+
+    def __init__(self, filePath: str, dataPath: str, interval: int = None):
+        '''
+        filePath - path of the index sidecar file
+        dataPath - path of the aggregate file the index describes
+        '''
+        self.filePath = filePath
+        self.dataPath = dataPath
+        self.interval = interval or RowIndex.interval
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.size = 0
+        self.saved = 0
+        self.rowNumbers: list[int] = []
+        self.times: list[str] = []
+        self.offsets: list[int] = []
+        self.ordered = True
+        self.loaded = False
+
+    def _checkOrder(self):
+        ''' lines appended out of time order make the index unusable '''
+        self.ordered = all(a < b for a, b in zip(self.times, self.times[1:]))
+
+    ### read ###
+
+    def load(self):
+        ''' reads the sidecar, once '''
+        if self.loaded:
+            return
+        self.loaded = True
+        if not os.path.exists(self.filePath):
+            return
+        try:
+            with open(self.filePath, mode='r') as f:
+                rows, size, interval = f.readline().strip().split(',')
+                if int(interval) != self.interval:
+                    return
+                for line in f:
+                    row, time, offset = line.strip().split(',')
+                    self.rowNumbers.append(int(row))
+                    self.times.append(time)
+                    self.offsets.append(int(offset))
+            self.rows = int(rows)
+            self.size = int(size)
+            self.saved = len(self.offsets)
+            self._checkOrder()
+        except Exception as _:
+            self.reset()
+            self.loaded = True
+
+    def _timeAt(self, f, offset: int) -> str:
+        f.seek(offset)
+        return f.readline().split(b',')[0].decode()
+
+    def _stillValid(self) -> bool:
+        ''' cheap check that the file wasn't rewritten under the index '''
+        try:
+            if os.path.getsize(self.dataPath) < self.size:
+                return False
+            if len(self.offsets) == 0:
+                return True
+            with open(self.dataPath, mode='rb') as f:
+                if self._timeAt(f, self.offsets[-1]) != self.times[-1]:
+                    return False
+                f.seek(self.size - 1)
+                return f.read(1) == b'\n'
+        except Exception as _:
+            return False
+
+    def refresh(self) -> bool:
+        '''
+        brings the index up to date with the aggregate file: extends it over
+        any lines appended since, or rebuilds it if the file changed. returns
+        False if there is no file to index.
+        '''
+        self.load()
+        if not os.path.exists(self.dataPath):
+            self.reset()
+            return False
+        if not self._stillValid():
+            self.reset()
+            self.loaded = True
+        if os.path.getsize(self.dataPath) > self.size:
+            self._scan()
+        return True
+
+    def _scan(self):
+        ''' finds the start of every interval'th line after what's indexed '''
+        starts = []
+        with open(self.dataPath, mode='rb') as f:
+            f.seek(self.size)
+            offset = self.size
+            lineStart = self.size
+            row = self.rows
+            while True:
+                chunk = f.read(self.chunkSize)
+                if not chunk:
+                    break
+                ends = np.flatnonzero(
+                    np.frombuffer(chunk, dtype=np.uint8) == 10) + offset + 1
+                offset += len(chunk)
+                if len(ends) == 0:
+                    continue
+                lineStarts = np.concatenate(([lineStart], ends[:-1]))
+                rowNumbers = np.arange(row, row + len(ends))
+                marked = rowNumbers % self.interval == 0
+                starts.extend(zip(
+                    rowNumbers[marked].tolist(),
+                    lineStarts[marked].tolist()))
+                lineStart = int(ends[-1])
+                row += len(ends)
+            for rowNumber, start in starts:
+                self.rowNumbers.append(rowNumber)
+                self.times.append(self._timeAt(f, start))
+                self.offsets.append(start)
+        self.rows = row
+        self.size = lineStart
+        if len(self.offsets) > self.saved:
+            self._checkOrder()
+            self.save()
+
+    ### write ###
+
+    def save(self) -> bool:
+        try:
+            with open(self.filePath, mode='w') as f:
+                f.write(f'{self.rows},{self.size},{self.interval}\n')
+                f.write(''.join([
+                    f'{row},{time},{offset}\n'
+                    for row, time, offset in zip(self.rowNumbers, self.times, self.offsets)]))
+            self.saved = len(self.offsets)
+            return True
+        except Exception as _:
+            return False
+
+    def clear(self) -> bool:
+        self.reset()
+        try:
+            os.remove(self.filePath)
+            return True
+        except FileNotFoundError as _:
+            return True
+        except Exception as _:
+            return False
+
+    ### search ###
+
+    def search(self, time: str) -> Union[tuple[int, int, str], None]:
+        '''
+        returns the row number of the latest indexed row before time, the row
+        number where the search should stop and the timestamp of the first.
+        the rows between them hold the row before time, the row at time, if
+        any, and the row after it. None if the index can't be used.
+        '''
+        if not self.refresh() or len(self.offsets) == 0 or not self.ordered:
+            return None
+        position = max(bisect_left(self.times, time) - 1, 0)
+        end = position + 3
+        return (
+            self.rowNumbers[position],
+            self.rowNumbers[end] if end < len(self.rowNumbers) else self.rows,
+            self.times[position])
+
+    def seek(self, row: int) -> tuple[int, int]:
+        ''' the nearest indexed row at or before row, and its byte offset '''
+        position = bisect_right(self.rowNumbers, row) - 1
+        if position < 0:
+            return 0, 0
+        return self.rowNumbers[position], self.offsets[position]
+
+    def offsetOf(self, row: int) -> Union[int, None]:
+        ''' byte offset of an indexed row, or of the end of the indexed rows '''
+        if row == self.rows:
+            return self.size
+        position = bisect_left(self.rowNumbers, row)
+        if position < len(self.rowNumbers) and self.rowNumbers[position] == row:
+            return self.offsets[position]
+        return None
@@ -0,0 +1,115 @@
+''' verifies the hash chains of many streams at once across a process pool '''
+
+from typing import Union, Callable
+import os
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from satorilib import logging
+from satorilib.concepts import StreamId
+from satorilib.api.hash import generatePathId, verifyHashesReturnLastGood
+from satorilib.api.disk.filetypes import managerOf
+
+
+class VerificationReport():
+    def __init__(
+        self,
+        results: dict[StreamId, tuple[Union[bool, None], Union[pd.DataFrame, pd.Series, None]]],
+        rows: int,
+        seconds: float,
+        workers: int,
+    ):
+        self.results = results
+        self.rows = rows
+        self.seconds = seconds
+        self.workers = workers
+
+    def __repr__(self):
+        return (
+            f'VerificationReport({len(self.results)} streams, '
+            f'{len(self.failures)} failed, {len(self.missing)} missing, '
+            f'{self.rows} rows, '
+            f'{self.rowsPerSecond:.0f} rows/sec, {self.workers} workers)')
+
+    @property
+    def failures(self) -> list[StreamId]:
+        return [k for k, (success, _) in self.results.items() if success is False]
+
+    @property
+    def missing(self) -> list[StreamId]:
+        ''' streams without a file to verify, neither verified nor failed '''
+        return [k for k, (success, _) in self.results.items() if success is None]
+
+    @property
+    def rowsPerSecond(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def workersFromConfig(config) -> Union[int, None]:
+    ''' reads `verification workers` from the config, if it is set '''
+    try:
+        workers = config.get().get('verification workers')
+        return int(workers) if workers else None
+    except Exception as _:
+        return None
+
+
+def verifyPath(filePath: str, ext: str = 'csv') -> tuple[Union[bool, None], Union[pd.DataFrame, pd.Series, None], int]:
+    '''
+    runs in the worker process: reads one aggregate file and returns the result
+    of verifyHashesReturnLastGood along with the number of rows verified, or
+    None rather than a result if there is no file.
+    '''
+    if not os.path.exists(filePath):
+        return None, None, 0
+    df = managerOf(ext).read(filePath=filePath)
+    if df is None:
+        return True, None, 0
+    success, lastGood = verifyHashesReturnLastGood(df)
+    return success, lastGood, df.shape[0]
+
+
+def verifyStreams(
+    streamIds: list[StreamId],
+    dataPath: str,
+    workers: int = None,
+    progress: Callable[[int, int, StreamId], None] = None,
+    ext: str = 'csv',
+) -> VerificationReport:
+    '''
+    verifies every stream's hash chain in a ProcessPoolExecutor.
+    progress, if given, is called with (done, total, streamId) as each stream
+    finishes. the results map each streamId to the same (success, lastGood)
+    verifyHashesReturnLastGood returns for it, or (None, None) if its file is
+    missing. ext is the type of the aggregate files: csv, bin or db.
+    '''
+    workers = workers or os.cpu_count() or 1
+    paths = {
+        streamId: os.path.join(
+            dataPath, generatePathId(streamId=streamId), f'aggregate.{ext}')
+        for streamId in streamIds}
+    results = {}
+    rows = 0
+    then = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(verifyPath, path, ext): streamId
+            for streamId, path in paths.items()}
+        for done, future in enumerate(as_completed(futures), start=1):
+            streamId = futures[future]
+            try:
+                success, lastGood, count = future.result()
+            except Exception as e:
+                logging.error('unable to verify', streamId, e)
+                success, lastGood, count = False, None, 0
+            results[streamId] = (success, lastGood)
+            rows += count
+            if isinstance(progress, Callable):
+                progress(done, len(futures), streamId)
+    report = VerificationReport(
+        results=results,
+        rows=rows,
+        seconds=time.time() - then,
+        workers=workers)
+    logging.info(report)
+    return report
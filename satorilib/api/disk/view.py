@@ -0,0 +1,62 @@
+'''
+a read only view of a stream's history straight out of its memory mapped file.
+
+the columns are numpy views into the mapping, nothing is copied or parsed until
+asked for, and the pages belong to the os page cache, so every process reading
+the same stream on a host shares one copy of it rather than holding its own
+dataframe of strings. only the binary format is fixed width, so only binary
+streams can be viewed this way.
+'''
+
+from typing import Union
+import numpy as np
+import pandas as pd
+from satorilib.api.disk.filetypes.binary import BinaryManager
+
+
+class StreamView():
+    ''' the records of a binary stream file as they were when mapped '''
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+
+    def __len__(self):
+        return self.records.shape[0]
+
+    def __repr__(self):
+        return f'StreamView({len(self)} rows)'
+
+    @property
+    def times(self) -> np.ndarray:
+        ''' int64 microseconds since the epoch '''
+        return self.records['time']
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.records['value']
+
+    @property
+    def hashes(self) -> np.ndarray:
+        ''' the 8 raw bytes of each hash '''
+        return self.records['hash']
+
+    @property
+    def ordered(self) -> bool:
+        ''' appends may land out of order until the file is rewritten '''
+        return len(self) < 2 or bool((self.times[1:] > self.times[:-1]).all())
+
+    def between(self, start: str = None, end: str = None) -> 'StreamView':
+        ''' the rows in [start, end), still without copying, if ordered '''
+        first, last = BinaryManager.stringsToTimes(
+            [start or '0001-01-01', end or '9999-12-31'])
+        return StreamView(self.records[
+            np.searchsorted(self.times, first, side='left') if start else 0:
+            np.searchsorted(self.times, last, side='left') if end else len(self)])
+
+    def timestamps(self) -> list[str]:
+        ''' renders the times as timestamp strings, which copies them '''
+        return BinaryManager.timesToStrings(self.times)
+
+    def frame(self) -> pd.DataFrame:
+        ''' copies the rows into a dataframe, as Disk.read would return them '''
+        return BinaryManager().toFrame(np.array(self.records))
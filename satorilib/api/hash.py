@@ -45,28 +45,67 @@ def hashIt(string: str) -> str:
         digest_size=8).hexdigest()  # 27mb / million rows
 
 
+def chainInputs(df: pd.DataFrame) -> tuple[list[str], list[str]]:
+    '''
+    extracts the index and value columns once, as the strings we hash.
+    iterrows upcasts each row to the frame's common dtype, so a frame of mixed
+    numeric columns (int value, float hash of NaNs) hashes its values as floats;
+    we take the values the same way so the hashes never change.
+    '''
+    indexes = [str(index) for index in df.index]
+    if len(df.columns) == 1 or any(dtype == object for dtype in df.dtypes):
+        values = df['value'].tolist()
+    else:
+        values = df.values[:, df.columns.get_loc('value')].tolist()
+    return indexes, [str(value) for value in values]
+
+
+def chainHashes(
+    indexes: list[str],
+    values: list[str],
+    priorRowHash: str = '',
+) -> list[str]:
+    ''' the hash chain of every row, each hash built on the prior one '''
+    blake2s = hashlib.blake2s
+    rowHashes = []
+    append = rowHashes.append
+    for index, value in zip(indexes, values):
+        priorRowHash = blake2s(
+            (priorRowHash + index + value).encode(),
+            digest_size=8).hexdigest()
+        append(priorRowHash)
+    return rowHashes
+
+
+def firstBrokenLink(
+    indexes: list[str],
+    values: list[str],
+    hashes: list[str],
+    priorRowHash: str = '',
+) -> Union[int, None]:
+    ''' position of the first row that fails the hash chain, or None '''
+    blake2s = hashlib.blake2s
+    for position, (index, value, rowHash) in enumerate(zip(indexes, values, hashes)):
+        priorRowHash = blake2s(
+            (priorRowHash + index + value).encode(),
+            digest_size=8).hexdigest()
+        if priorRowHash != rowHash:
+            return position
+    return None
+
+
 def historyHashes(df: pd.DataFrame, priorRowHash: str = None) -> pd.DataFrame:
     ''' creates hashes of every row in the dataframe based on prior hash '''
-    priorRowHash = priorRowHash or ''
-    rowHashes = []
-    for index, row in df.iterrows():
-        rowStr = priorRowHash + str(index) + str(row['value'])
-        rowHash = hashIt(rowStr)
-        rowHashes.append(rowHash)
-        priorRowHash = rowHash
-    df['hash'] = rowHashes
+    df['hash'] = chainHashes(*chainInputs(df), priorRowHash=priorRowHash or '')
     return df
 
 
 def verifyRoot(df: pd.DataFrame) -> bool:
     ''' returns true if root hash is empty string plus the first row '''
-    for index, row in df.iterrows():
-        rowStr = '' + str(index) + str(row['value'])
-        rowHash = hashIt(rowStr)
-        if rowHash == row['hash']:
-            return True
+    if df.empty:
         return False
-    return False
+    indexes, values = chainInputs(df.iloc[:1])
+    return hashIt('' + indexes[0] + values[0]) == df['hash'].iloc[0]
 
 
 def verifyHashes(df: pd.DataFrame, priorRowHash: str = None) -> tuple[bool, Union[pd.DataFrame, None]]:
@@ -78,15 +117,15 @@ def verifyHashes(df: pd.DataFrame, priorRowHash: str = None) -> tuple[bool, Unio
     empty string because it's the first peice of data that was recorded. if new
     data was found before it, all the hashes change.
     '''
-    priorRowHash = priorRowHash or ''
-    priorRow = None
-    for index, row in df.iterrows():
-        rowHash = hashIt(priorRowHash + str(index) + str(row['value']))
-        if rowHash != row['hash']:
-            return False, priorRow.to_frame().T if isinstance(priorRow, pd.Series) else None
-        priorRowHash = rowHash
-        priorRow = row
-    return True, None
+    if df.empty:
+        return True, None
+    position = firstBrokenLink(
+        *chainInputs(df),
+        hashes=df['hash'].tolist(),
+        priorRowHash=priorRowHash or '')
+    if position is None:
+        return True, None
+    return False, df.iloc[position - 1].to_frame().T if position > 0 else None
 
 
 def verifyHashesReturnError(df: pd.DataFrame, priorRowHash: str = None) -> tuple[bool, Union[pd.DataFrame, None]]:
@@ -98,13 +137,15 @@ def verifyHashesReturnError(df: pd.DataFrame, priorRowHash: str = None) -> tuple
     empty string because it's the first peice of data that was recorded. if new
     data was found before it, all the hashes change.
     '''
-    priorRowHash = priorRowHash or ''
-    for index, row in df.iterrows():
-        rowHash = hashIt(priorRowHash + str(index) + str(row['value']))
-        if rowHash != row['hash']:
-            return False, row.to_frame().T
-        priorRowHash = rowHash
-    return True, None
+    if df.empty:
+        return True, None
+    position = firstBrokenLink(
+        *chainInputs(df),
+        hashes=df['hash'].tolist(),
+        priorRowHash=priorRowHash or '')
+    if position is None:
+        return True, None
+    return False, df.iloc[position].to_frame().T
 
 # verifyHashes(pd.DataFrame({'value':[1,2,3,4,5,6], 'hash':['ce8efc6eeb9fc30b','e2cc1a4e70bdba14','42359a663f6c3e30','6278827c73894e0c','c7a6682880ee6f8d','d607268c4f2e75ed']}, index=[0,1,2,3,4,9,5]))
 
@@ -113,14 +154,13 @@ def verifyHashesReturnLastGood(df: pd.DataFrame, priorRowHash: str = None) -> tu
     ''' returns success flag and the last known good row as DataFrame '''
     if df.empty:
         return True, None
-    priorRowHash = priorRowHash or ''
-    for index, row in df.iterrows():
-        rowHash = hashIt(priorRowHash + str(index) + str(row['value']))
-        if rowHash != row['hash']:
-            return False, priorRow.to_frame().T
-        priorRowHash = rowHash
-        priorRow = row
-    return True, row
+    position = firstBrokenLink(
+        *chainInputs(df),
+        hashes=df['hash'].tolist(),
+        priorRowHash=priorRowHash or '')
+    if position is None:
+        return True, df.iloc[-1]
+    return False, df.iloc[position - 1].to_frame().T if position > 0 else None
 
 
 def cleanHashes(df: pd.DataFrame) -> tuple[bool, Union[pd.DataFrame, None]]:
@@ -132,25 +172,25 @@ def cleanHashes(df: pd.DataFrame) -> tuple[bool, Union[pd.DataFrame, None]]:
     unable to make a new dataframe or the one it makes matches the input, it 
     returns None.
     '''
+    if df.empty:
+        return False, None
+    indexes, values = chainInputs(df)
+    blake2s = hashlib.blake2s
     priorRowHash = ''
-    i = 0
-    success = False
-    rows = []
-    for index, row in df.iterrows():
-        rowStr = priorRowHash + str(index) + str(row['value'])
-        rowHash = hashIt(rowStr)
-        if i == 0 and row['hash'] == rowHash:
-            success = True
-        i += 1
-        if rowHash != row['hash']:
+    kept = []
+    for position, (index, value, rowHash) in enumerate(zip(indexes, values, df['hash'].tolist())):
+        candidate = blake2s(
+            (priorRowHash + index + value).encode(),
+            digest_size=8).hexdigest()
+        if candidate != rowHash:
             # skip this row
             continue
-        rows.append(row)
-        priorRowHash = rowHash
-    dfReturn = pd.DataFrame(rows, columns=df.columns)
-    if dfReturn.equals(df):
+        kept.append(position)
+        priorRowHash = candidate
+    success = len(kept) > 0 and kept[0] == 0
+    if len(kept) == df.shape[0]:
         return success, None
-    return success, dfReturn
+    return success, df.iloc[kept]
 
 # cleanHashes(pd.DataFrame({'value':[1,2,3,4,5,6], 'hash':['ce8efc6eeb9fc30b','e2cc1a4e70bdba14','42359a663f6c3e30','6278827c73894e0c','c7a6682880ee6f8d','d607268c4f2e75ed']}, index=[0,1,2,3,4,9,5]))
 # cleanHashes(pd.DataFrame({'value':[1,2,3,4,5,9,6], 'hash':['ce8efc6eeb9fc30b','e2cc1a4e70bdba14','42359a663f6c3e30','6278827c73894e0c','c7a6682880ee6f8d','erroneous row','d607268c4f2e75ed']}, index=[0,1,2,3,4,9,5]))
@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Union
+import os
+import pandas as pd
 
 
 class FileManager(ABC):
@@ -17,3 +20,43 @@ class FileManager(ABC):
     @abstractmethod
     def readLines(self, filePath: str, start: int, end: int):
         pass
+
+    @staticmethod
+    def _lineCount(start: int, end: int = None) -> int:
+        ''' rows asked of readLines, which reads [start, end) or just start '''
+        return end - start if end is not None and end > start else 1
+
+    def _conformBasic(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._conformIndexName(self.conformFlatColumns(df))
+
+    def _conformIndexName(self, df: pd.DataFrame) -> pd.DataFrame:
+        df.index.name = None
+        return df
+
+    def conformFlatColumns(self, df: pd.DataFrame) -> pd.DataFrame:
+        if len(df.columns) == 1:
+            df.columns = ['value']
+        if len(df.columns) == 2:
+            df.columns = ['value', 'hash']
+        return df
+
+    def _clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._sort(self._dedupe(df))
+
+    def _sort(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.sort_index()
+
+    def _dedupe(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[~df.index.duplicated(keep='last')]
+
+    def _merge(self, dfs: list[pd.DataFrame]) -> pd.DataFrame:
+        return self._clean(pd.concat(dfs, axis=0))
+
+    def remove(self, filePath: str) -> Union[bool, None]:
+        try:
+            os.remove(filePath)
+            return True
+        except FileNotFoundError as _:
+            return None
+        except Exception as _:
+            return False
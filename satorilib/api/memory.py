@@ -1,10 +1,12 @@
 from functools import reduce
+import numpy as np
 import pandas as pd
 import warnings
 from satorilib import logging
 from satorilib.concepts import StreamId
 from satorilib.api.interfaces.memory import DiskMemory
 from satorilib.api.interfaces.model import ModelMemoryApi
+from satorilib.api.asof import asOfMerge, InsertBuffer
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
@@ -85,67 +87,79 @@ class Memory(ModelMemoryApi, DiskMemory):
             return None
         if len(dfs) == 1:
             return dfs[0]
-        for ix, item in enumerate(dfs):
-            if targetColumn in item.columns:
-                dfs.insert(0, dfs.pop(ix))
-                break
-            # if we get through this loop without hitting the if
-            # we could possibly use that as a trigger to use the
-            # other merge function, also if targetColumn is None
-            # why would we make a dataset without target though?
-        for df in dfs:
-            df.index = pd.to_datetime(df.index)
-        return reduce(
-            lambda left, right:
-                pd.merge_asof(left, right, left_index=True, right_index=True),
-            dfs)
+        # the target goes first, its timeline is the one every stream is
+        # aligned to. if no frame holds the target column we could possibly
+        # use that as a trigger to use the other merge function, also if
+        # targetColumn is None
+        # why would we make a dataset without target though?
+        # each stream is aligned to the target in one pass, see asof.py, this
+        # gives the same result as reducing pd.merge_asof over them pairwise
+        return asOfMerge(dfs, targetColumn)
 
     @staticmethod
-    def appendInsert(df: pd.DataFrame, incremental: pd.DataFrame):
+    def appendInsert(df: 'pd.DataFrame|InsertBuffer', incremental: pd.DataFrame):
         ''' Layer 2
         after datasets merged one cannot merely append a dataframe. 
         we must insert the incremental at the correct location.
         this function is more of a helper function after we gather,
         to be used by models, it doesn't talk to disk directly.
         incremental should be a multicolumn, one row DataFrame. 
+        a dataframe is copied into an InsertBuffer every call, so models
+        taking a stream of incrementals should hold one and pass it instead,
+        then each insert only touches the rows it changes.
         '''
-        df.index = pd.to_datetime(df.index)
-        incremental.index = pd.to_datetime(incremental.index)
-        if incremental.index.values[0] in df.index.values:
-            df.loc[incremental.index, [
-                x for x in incremental.columns]] = incremental
-        else:
-            df = df.append(incremental).sort_index()
-        return df.fillna(method='ffill')
+        if not isinstance(df, InsertBuffer):
+            df = InsertBuffer.fromFrame(df)
+        return df.insert(incremental)
 
     @staticmethod
-    def dropDuplicates(df: pd.DataFrame, col=None):
-        if df.empty:
-            return df
-
-        if isinstance(df.columns, pd.MultiIndex):
-            # supports the typical hierarchy of source, author, stream, target
-            column = (
-                ('group',) +
-                tuple(('' for _ in range(1, len(df.columns[0])))))
-        else:
-            # unused edgecase - normal index columns
-            column = 'group'
+    def _keepMask(values: np.ndarray, last=None) -> np.ndarray:
+        '''
+        True for each value that differs from the one before it, the first
+        compared to the last one kept, if we have it. NaN never equals
+        anything so every NaN is kept, as before.
+        '''
+        keep = np.empty(len(values), dtype=bool)
+        if len(values) == 0:
+            return keep
+        keep[0] = last is None or bool(values[0] != last)
+        np.not_equal(values[1:], values[:-1], out=keep[1:])
+        return keep
 
+    @staticmethod
+    def _dedupeColumn(df: pd.DataFrame, col=None):
+        ''' the column consecutive duplicates are judged by, or None '''
         if len(df.columns) > 1 and col is None:
             logging.error('must provide column')
+            return None
+        # unused edgecase - multiple columns in dataframe
+        return df[col] if len(df.columns) > 1 else df.iloc[:, 0]
+
+    @staticmethod
+    def dropDuplicates(df: pd.DataFrame, col=None):
+        '''
+        drops rows repeating the value of the row before them, leaving the
+        caller's frame alone. returns it as is if nothing repeats.
+        '''
+        if df.empty:
             return df
-        elif len(df.columns) > 1 and col is not None:
-            # unused edgecase - multiple columns in dataframe
-            df[column] = (df[col] != df[col].shift()).cumsum()
-            df = df.drop_duplicates(subset=column, keep='first')
-            df = df.drop(columns=[column])
+        column = Memory._dedupeColumn(df, col)
+        if column is None:
             return df
+        keep = Memory._keepMask(column.values)
+        return df if keep.all() else df[keep]
 
-        # Create a new grouping column based on consecutive duplicates
-        df[column] = (df != df.shift()).cumsum()
-        # Drop duplicates based on groups, keeping the first occurrence
-        df = df.drop_duplicates(subset=column, keep='first')
-        # Drop the grouping column
-        df = df.drop(columns=[column])
-        return df
+    @staticmethod
+    def dropDuplicatesAfter(df: pd.DataFrame, last, col=None):
+        '''
+        dropDuplicates for observations as they arrive: the first is also
+        compared to the last value kept, so a stream can be deduped one
+        observation at a time without reading back what came before.
+        '''
+        if df.empty:
+            return df
+        column = Memory._dedupeColumn(df, col)
+        if column is None:
+            return df
+        keep = Memory._keepMask(column.values, last)
+        return df if keep.all() else df[keep]
@@ -1,5 +1,6 @@
 from .time import (
-    datetimeToTimestamp, timestampToDatetime,
+    datetimeToTimestamp, timestampToDatetime, datetimesToTimestamps,
+    timestampsToDatetime64,
     datetimeToSeconds, secondsToDatetime,
     timestampToSeconds, secondsToTimestamp,
     timeToTimestamp, timeToDatetime, timeToSeconds,
@@ -1,13 +1,98 @@
 from typing import Union
 import datetime as dt
+import numpy as np
+import pandas as pd
 
 
 def datetimeToTimestamp(time: dt.datetime) -> str:
     return time.strftime('%Y-%m-%d %H:%M:%S.%f')
 
 
+def datetimesToTimestamps(times: pd.DatetimeIndex) -> pd.Index:
+    ''' datetimeToTimestamp of many at once, any timezone rendered in utc '''
+    if times.tz is not None:
+        times = times.tz_convert('UTC').tz_localize(None)
+    return pd.Index(times.strftime('%Y-%m-%d %H:%M:%S.%f'), name=times.name)
+
+
+def _parseFixed(time: str) -> Union[dt.datetime, None]:
+    '''
+    timestamps as we write them, '%Y-%m-%d %H:%M:%S' with or without up to 6
+    digits of '.%f', parsed much faster than strptime does. None for anything
+    laid out otherwise, strptime decides those.
+    '''
+    length = len(time)
+    if (
+        not (length == 19 or 21 <= length <= 26) or
+        time[4] != '-' or time[7] != '-' or time[10] != ' ' or
+        time[13] != ':' or time[16] != ':' or
+        (length > 19 and time[19] != '.') or
+        not time.isascii() or
+        not (
+            time[0:4] + time[5:7] + time[8:10] + time[11:13] +
+            time[14:16] + time[17:19] + time[20:]).isdigit() or
+        # newer fromisoformat reads 24:00 as the next midnight
+        time[11:13] >= '24'
+    ):
+        return None
+    if length in (19, 23, 26):
+        # the fractions fromisoformat reads on every python we support
+        return dt.datetime.fromisoformat(time).replace(tzinfo=dt.timezone.utc)
+    return dt.datetime(
+        int(time[0:4]), int(time[5:7]), int(time[8:10]),
+        int(time[11:13]), int(time[14:16]), int(time[17:19]),
+        int(time[20:].ljust(6, '0')),
+        tzinfo=dt.timezone.utc)
+
+
 def timestampToDatetime(time: str) -> dt.datetime:
-    return (dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S.%f') if '.' in time else dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S')).replace(tzinfo=dt.timezone.utc)
+    return _parseFixed(time) or (dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S.%f') if '.' in time else dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S')).replace(tzinfo=dt.timezone.utc)
+
+
+def timestampsToDatetime64(times: 'list[str]|np.ndarray') -> np.ndarray:
+    '''
+    timestampToDatetime of many at once, as datetime64[us] in utc. those in
+    the fixed layout are checked together as arrays of bytes and handed to
+    numpy to parse, the rest are parsed one at a time, so invalid timestamps
+    raise as they would alone.
+    '''
+    count = len(times)
+    parsed = np.empty(count, dtype='datetime64[us]')
+    try:
+        # one byte longer than the layout allows, to see what's too long
+        raw = np.asarray(times, dtype='S27')
+    except UnicodeEncodeError:
+        raw = None
+    if raw is None or count == 0:
+        for i in range(count):
+            parsed[i] = np.datetime64(timestampToDatetime(times[i]).replace(tzinfo=None), 'us')
+        return parsed
+    codes = raw.view(np.uint8).reshape(count, 27)
+    lengths = (codes != 0).sum(axis=1)
+    isDigit = (codes - ord('0')) <= 9  # unsigned, so anything below '0' wraps high
+    fixed = (
+        ((lengths == 19) | ((lengths >= 21) & (lengths <= 26))) &
+        (codes[:, 4] == ord('-')) & (codes[:, 7] == ord('-')) &
+        (codes[:, 10] == ord(' ')) &
+        (codes[:, 13] == ord(':')) & (codes[:, 16] == ord(':')) &
+        ((lengths == 19) | (codes[:, 19] == ord('.'))) &
+        isDigit[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]].all(axis=1) &
+        (isDigit[:, 20:26] | (np.arange(20, 26) >= lengths[:, np.newaxis])).all(axis=1) &
+        # numpy takes year 0, datetime doesn't
+        (codes[:, :4] != ord('0')).any(axis=1))
+    if fixed.all():
+        try:
+            return raw.astype('datetime64[us]')
+        except ValueError:
+            fixed[:] = False
+    elif fixed.any():
+        try:
+            parsed[fixed] = raw[fixed].astype('datetime64[us]')
+        except ValueError:
+            fixed[:] = False
+    for i in np.flatnonzero(~fixed):
+        parsed[i] = np.datetime64(timestampToDatetime(times[i]).replace(tzinfo=None), 'us')
+    return parsed
 
 
 def datetimeToSeconds(time: dt.datetime) -> float:
@@ -1,3 +1,3 @@
-from satorilib.concepts.structs import StreamId, StreamIdMap, Observation, Stream, StreamOverview, StreamOverviews
+from satorilib.concepts.structs import StreamId, StreamIdMap, Observation, LazyObservation, Stream, StreamOverview, StreamOverviews
 from satorilib.concepts.datastructures import TwoWayDictionary
 from satorilib.concepts import constants
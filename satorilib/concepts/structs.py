@@ -1,5 +1,9 @@
 from typing import Union
 import json
+import weakref
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 import datetime as dt
 from functools import partial
@@ -8,7 +12,14 @@ from functools import partial
 
 
 class StreamId:
-    ''' unique identifier for a stream '''
+    '''
+    unique identifier for a stream. it's never changed once made, so its hash,
+    idString and path id are worked out once, when first asked for.
+    '''
+
+    __slots__ = (
+        '__source', '__author', '__stream', '__target',
+        '_hash', '_idString', '_pathId', '__weakref__')
 
     def __init__(
         self,
@@ -21,6 +32,9 @@ class StreamId:
         self.__author = author
         self.__stream = stream
         self.__target = target
+        self._hash = None
+        self._idString = None
+        self._pathId = None
         # disallowing target to be None (for hashability) means an empty string
         # is not a valid target, which it might be in the real world. so we
         # allow target to be None, indicating that a stream observation is a
@@ -75,11 +89,13 @@ class StreamId:
 
     @property
     def idString(self):  # todo: make this .id and the .key a tuple
-        return (
-            (self.__source or '') +
-            (self.__author or '') +
-            (self.__stream or '') +
-            (self.__target or ''))
+        if self._idString is None:
+            self._idString = (
+                (self.__source or '') +
+                (self.__author or '') +
+                (self.__stream or '') +
+                (self.__target or ''))
+        return self._idString
 
     def __repr__(self):
         return str({
@@ -92,12 +108,19 @@ class StreamId:
         return str(self.__repr__())
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, StreamId):
+            if (
+                self._hash is not None and other._hash is not None and
+                self._hash != other._hash
+            ):
+                return False
             return (
-                self.source == other.source and
-                self.author == other.author and
-                self.stream == other.stream and
-                self.target == other.target)
+                self.__source == other.__source and
+                self.__author == other.__author and
+                self.__stream == other.__stream and
+                self.__target == other.__target)
         return False
 
     def __hash__(self):
@@ -138,16 +161,36 @@ class StreamId:
         /remove_stream/<topic> and parse out the topic instead. it's just less
         work for the same quality work around.
         '''
-        return hash(
-            self.__source +
-            self.__author +
-            self.__stream +
-            (self.__target or ''))
+        if self._hash is None:
+            self._hash = hash(
+                self.__source +
+                self.__author +
+                self.__stream +
+                (self.__target or ''))
+        return self._hash
+
+    def __reduce__(self):
+        # string hashes differ between processes, so only the parts travel
+        return (StreamId, (self.__source, self.__author, self.__stream, self.__target))
 
     @property
     def generateHash(self) -> str:
-        from satorilib.api.hash import generatePathId, hashIt
-        return generatePathId(streamId=self)
+        if self._pathId is None:
+            from satorilib.api.hash import generatePathId
+            self._pathId = generatePathId(streamId=self)
+        return self._pathId
+
+    @staticmethod
+    def intern(streamId: 'StreamId') -> 'StreamId':
+        '''
+        the one instance of a StreamId equal to this one, so the same stream
+        shares its cached hash and path id, and compares by identity
+        '''
+        interned = streamIds.get(streamId.id)
+        if interned is None:
+            streamIds[streamId.id] = streamId
+            return streamId
+        return interned
 
     @property
     def key(self):
@@ -176,7 +219,29 @@ class StreamId:
 
     @staticmethod
     def fromTopic(topic: str = None):
-        return StreamId.fromMap(json.loads(topic or '{}'))
+        '''
+        StreamIds don't change, so a recently seen topic isn't parsed again.
+        beyond maxTopics the least recently seen are forgotten, one at a time.
+        '''
+        with topicsLock:
+            streamId = topics.get(topic)
+            if streamId is not None:
+                topics.move_to_end(topic)
+                return streamId
+        streamId = StreamId.intern(StreamId.fromMap(json.loads(topic or '{}')))
+        with topicsLock:
+            topics[topic] = streamId
+            while len(topics) > maxTopics:
+                topics.popitem(last=False)
+        return streamId
+
+
+# the StreamIds of recently seen topics, least recently seen first
+topics: 'OrderedDict[str, StreamId]' = OrderedDict()
+topicsLock = threading.Lock()
+maxTopics = 10000
+# the interned StreamIds, held only while something else holds them
+streamIds: 'weakref.WeakValueDictionary[tuple, StreamId]' = weakref.WeakValueDictionary()
 
 
 # now that we've made the StreamId hashable this is basically unnecessary.
@@ -488,6 +553,9 @@ class StreamOverviews():
 
 class Observation:
 
+    # the keys of an observation as the Satori PubSub delivers it
+    topicKeys = ('topic', 'data', 'hash', 'time')
+
     def __init__(self, raw, **kwargs):
         self.raw = raw
         self.value: Union[str, None] = None
@@ -513,7 +581,13 @@ class Observation:
         })
 
     @staticmethod
-    def parse(raw):
+    def parse(raw, lazy: bool = False):
+        '''
+        lazy decodes the message once and returns a LazyObservation, which
+        builds its df only if it's asked for, see decode.
+        '''
+        if lazy:
+            return Observation.decode(raw)
         if (
             isinstance(raw, dict) and
             'topic' in raw.keys() and
@@ -576,6 +650,44 @@ class Observation:
             target=target,
             df=df)
 
+    @staticmethod
+    def decode(raw) -> 'LazyObservation':
+        '''
+        fromTopic for busy streams: the message is only loaded once, the
+        StreamId of a topic comes from those already parsed, and no dataframe
+        is built unless df is used. messages in any other structure are
+        parsed by fromGuess.
+        '''
+        j = json.loads(raw) if isinstance(raw, str) else raw
+        if not (isinstance(j, dict) and all(key in j for key in Observation.topicKeys)):
+            return LazyObservation.of(Observation.fromGuess(raw))
+        topic = j['topic']
+        return LazyObservation(
+            raw=raw,
+            topic=topic,
+            streamId=StreamId.fromTopic(topic),
+            observationTime=j['time'],
+            observationHash=j.get('observationHash', j['hash']),
+            value=j['data'])
+
+    @staticmethod
+    def decodeMany(raws: list) -> dict[str, np.ndarray]:
+        '''
+        decodes a batch of messages into a column per field, one entry per
+        message, rather than an Observation each:
+        {'topic', 'streamId', 'observationTime', 'observationHash', 'value'}
+        values are floats if they all can be, otherwise as they came.
+        '''
+        observations = [Observation.decode(raw) for raw in raws]
+        columns = {
+            name: np.array([getattr(o, name) for o in observations] or [], dtype=object)
+            for name in ('topic', 'streamId', 'observationTime', 'observationHash', 'value')}
+        try:
+            columns['value'] = columns['value'].astype(float)
+        except (TypeError, ValueError):
+            pass
+        return columns
+
     @staticmethod
     def fromGuess(raw):
         ''' {
@@ -654,3 +766,90 @@ class Observation:
     @property
     def timestamp(self):
         return self.observationTime
+
+
+class LazyObservation:
+    '''
+    an Observation as Observation.decode gives it, slotted, with the one row
+    df only built the first time it's used.
+    '''
+
+    __slots__ = (
+        'raw', 'topic', 'streamId', 'observationTime', 'observationHash',
+        'value', 'target', 'data', 'hash', 'time', 'content', '_df')
+
+    def __init__(
+        self,
+        raw,
+        topic: Union[str, None] = None,
+        streamId: Union[StreamId, None] = None,
+        observationTime: Union[str, None] = None,
+        observationHash: Union[str, None] = None,
+        value=None,
+        target: Union[str, None] = None,
+        content=None,
+        df: Union[pd.DataFrame, None] = None,
+    ):
+        self.raw = raw
+        self.topic = topic
+        self.streamId = streamId
+        self.observationTime = observationTime
+        self.observationHash = observationHash
+        self.value = value
+        self.target = target
+        self.content = content
+        self.data = None
+        self.hash = None
+        self.time = None
+        self._df = df
+
+    @staticmethod
+    def of(observation: Observation) -> 'LazyObservation':
+        return LazyObservation(
+            raw=observation.raw,
+            topic=getattr(observation, 'topic', None),
+            streamId=observation.streamId,
+            observationTime=observation.observationTime,
+            observationHash=observation.observationHash,
+            value=observation.value,
+            target=observation.target,
+            content=getattr(observation, 'content', None),
+            df=observation.df)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            self._df = pd.DataFrame(
+                {
+                    (
+                        self.streamId.source,
+                        self.streamId.author,
+                        self.streamId.stream,
+                        self.streamId.target
+                    ): [self.value]},
+                index=[self.observationTime])
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+
+    def __str__(self):
+        return str({
+            name: getattr(self, name) for name in self.__slots__
+            if name != '_df'})
+
+    def __repr__(self):
+        return f'Observation of {self.streamId}: ' + str({
+            'time': self.time,
+            'data': self.value,
+            'hash': self.observationHash,
+        })
+
+    @property
+    def key(self):
+        return self.streamId
+
+    @property
+    def timestamp(self):
+        return self.observationTime
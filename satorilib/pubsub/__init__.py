@@ -1 +1,2 @@
 from .pubsub import SatoriPubSubConn
+from .asynchronous import SatoriPubSubAsyncConn
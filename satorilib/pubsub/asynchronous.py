@@ -0,0 +1,203 @@
+# this is the asyncio counterpart of SatoriPubSubConn, built on the websockets
+# library. it takes the same arguments, but rather than a thread per connection
+# blocking on recv, every connection is a task on one event loop, so many of
+# them can share a single AsyncThread. a router may be a coroutine function,
+# which is awaited on the loop, or a plain function, which is run in the loop's
+# executor so a slow one holds up its own connection but never the loop.
+
+from typing import Union, Callable
+import json
+import time
+import asyncio
+import inspect
+import concurrent.futures
+from satorilib import logging
+from satorilib.asynchronous import AsyncThread
+
+
+class SatoriPubSubAsyncConn(object):
+
+    # the thread connections run on when they aren't given one, shared by all
+    asyncThread: AsyncThread = None
+
+    def __init__(
+        self, uid: str, payload: Union[dict, str], url: Union[str, None] = None,
+        router: Union['function', None] = None, listening: bool = True,
+        then: Union[str, None] = None, command: str = 'key', threaded: bool = True,
+        onConnect: callable = None, onDisconnect: callable = None,
+        emergencyRestart: callable = None, asyncThread: AsyncThread = None,
+        reconnectDelay: float = 60,
+        *args, **kwargs
+    ):
+        '''
+        threaded - starts running on asyncThread, or on the shared one, right
+            away as SatoriPubSubConn does, otherwise await run() on a loop
+        reconnectDelay - seconds to wait before connecting again
+        '''
+        self.uid = uid
+        self.url = url or 'ws://pubsub.satorinet.io:24603'
+        self.onConnect = onConnect
+        self.onDisconnect = onDisconnect
+        self.router = router
+        self.payload = payload
+        self.command = command
+        self.topicTime: dict[str, float] = {}
+        self.listening = listening
+        self.threaded = threaded
+        self.shouldReconnect = True
+        self.ws = None
+        self.then = then
+        self.emergencyRestart = emergencyRestart
+        self.reconnectDelay = reconnectDelay
+        self.loop: asyncio.AbstractEventLoop = None
+        self.future: concurrent.futures.Future = None
+        if self.threaded:
+            self.start(asyncThread)
+
+    @property
+    def connected(self) -> bool:
+        return self.ws is not None and self.ws.open
+
+    def start(self, asyncThread: AsyncThread = None) -> concurrent.futures.Future:
+        ''' runs the connection on an AsyncThread, from any other thread '''
+        if asyncThread is None:
+            if SatoriPubSubAsyncConn.asyncThread is None:
+                SatoriPubSubAsyncConn.asyncThread = AsyncThread()
+            asyncThread = SatoriPubSubAsyncConn.asyncThread
+        while asyncThread.loop is None:
+            # the thread sets its loop up as it starts
+            time.sleep(0.01)
+        # set before run starts, so schedule works as soon as this returns
+        self.loop = asyncThread.loop
+        self.future = asyncThread.runAsync(task=self.run)
+        return self.future
+
+    def schedule(self, coroutine) -> concurrent.futures.Future:
+        ''' runs a coroutine, like send or publish, on this connection's loop '''
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    async def run(self):
+        ''' connects, listens until dropped, and reconnects, until told not to '''
+        self.loop = asyncio.get_running_loop()
+        while self.shouldReconnect:
+            await self.connect()
+            if self.connected:
+                if self.then is not None:
+                    await asyncio.sleep(3)
+                    await self.send(self.then)
+                    # don't send again
+                    self.then = None
+                await self.listen()
+            if self.shouldReconnect:
+                await asyncio.sleep(self.reconnectDelay)
+
+    async def connect(self):
+        import websockets
+        if self.ws is not None:
+            try:
+                await self.ws.close()
+            except Exception as _:
+                pass
+            self.ws = None
+        try:
+            self.ws = await websockets.connect(
+                f'{self.url}?uid={self.uid}',
+                # the server doesn't answer pings, the sync client never sent any
+                ping_interval=None,
+                max_size=None)
+            if isinstance(self.onConnect, Callable):
+                self.onConnect()
+            await self.send(self.command + ':' + self.payload)
+            logging.info('connected to:', self.url, 'for', 'publishing' if self.router ==
+                         None else 'subscriptions', 'as', self.uid, color='green')
+            return self.ws
+        except Exception as e:
+            if 'Forbidden' in str(e) or '403' in str(e):
+                # other connections share the loop, so stop this one rather
+                # than exiting as SatoriPubSubConn does
+                self.shouldReconnect = False
+            logging.error(
+                e, f'\ndropped {"publishing" if self.router is None else "subscribing"} {self.url}, retrying in {self.reconnectDelay} seconds...', print=True)
+            if isinstance(self.onDisconnect, Callable):
+                self.onDisconnect()
+
+    async def listen(self):
+        try:
+            async for response in self.ws:
+                try:
+                    if response == '---STOP!---':
+                        self.emergencyRestart()
+                except Exception as _:
+                    pass
+                # don't break listener because of router behavior
+                try:
+                    await self.route(response)
+                except Exception as _:
+                    pass
+        except Exception as e:
+            # websockets.ConnectionClosedError, ConnectionResetError
+            logging.error(
+                e, f'\nfailed while listening {self.url}, reconnecting in {self.reconnectDelay} seconds...', print=True)
+
+    async def route(self, response: str):
+        if self.router is None:
+            return
+        if inspect.iscoroutinefunction(self.router):
+            return await self.router(response)
+        return await asyncio.get_running_loop().run_in_executor(None, self.router, response)
+
+    def setTopicTime(self, topic: str):
+        self.topicTime[topic] = time.time()
+
+    async def send(
+        self,
+        payload: Union[str, None] = None,
+        title: Union[str, None] = None,
+        topic: Union[str, None] = None,
+        data: Union[str, None] = None,
+        observationTime: Union[str, None] = None,
+        observationHash: Union[str, None] = None,
+    ):
+        if not self.connected:
+            return
+        if payload is None and title is None and topic is None and data is None:
+            raise ValueError(
+                'payload or (title, topic, data) must not be None')
+        payload = payload or (
+            title + ':' + json.dumps({
+                'topic': topic,
+                'data': str(data),
+                'time': str(observationTime),
+                'hash': str(observationHash),
+            }))
+        try:
+            await self.ws.send(payload)
+        except Exception as e:
+            # closing ends listen, and run reconnects
+            logging.error(
+                e, f'\nfailed while sending to Satori Pubsub, reconnecting in {self.reconnectDelay} seconds...', print=True)
+            await self.ws.close()
+
+    async def publish(self, topic: str, data: str, observationTime: str, observationHash: str):
+        if self.topicTime.get(topic, 0) > time.time() - 55:
+            return
+        self.setTopicTime(topic)
+        await self.send(
+            title='publish',
+            topic=topic,
+            data=data,
+            observationTime=observationTime,
+            observationHash=observationHash)
+
+    async def disconnect(self, reconnect: bool = False):
+        self.shouldReconnect = reconnect
+        self.listening = False
+        await self.send(title='notice', topic='connection', data='False')
+        if isinstance(self.onDisconnect, Callable):
+            self.onDisconnect()
+        if self.ws is not None:
+            await self.ws.close()  # server should detect we closed the connection
+        self.ws = None
+
+    def setRouter(self, router: 'function' = None):
+        self.router = router
@@ -0,0 +1,113 @@
+'''
+publishing many topics through one connection. each topic is published at
+most once per throttle window: an observation arriving within the window waits
+in place of any older one of its topic, so only the latest is sent once the
+window is up. what's due is sent together on a timer, or as soon as enough is
+due, rather than a frame at a time as each is published.
+
+the pubsub server takes one observation per frame, so each still gets its own
+frame, but superseded observations are never sent. frames are built from a
+topic's encoded prefix, kept from its first publish, and match the json.dumps
+of {'topic', 'data', 'time', 'hash'} that send builds.
+'''
+from typing import Callable, Union
+import time
+import threading
+from json.encoder import encode_basestring_ascii as encode
+from satorilib import logging
+
+
+class PublishBatcher:
+
+    def __init__(
+        self,
+        send: Callable[[list[str]], None],
+        throttle: float = 55,
+        interval: float = 1,
+        batchSize: int = 100,
+        title: str = 'publish',
+        topicTime: dict[str, float] = None,
+    ):
+        '''
+        send - sends a list of frames
+        throttle - seconds between publishing the same topic
+        interval - seconds between sending what's due
+        batchSize - sends what's due right away once this many are due
+        topicTime - when each topic was last published, shared with the caller
+        '''
+        self.send = send
+        self.throttle = throttle
+        self.interval = interval
+        self.batchSize = batchSize
+        self.title = title
+        self.topicTime = {} if topicTime is None else topicTime
+        self.prefixes: dict[str, str] = {}
+        self.pending: dict[str, tuple] = {}
+        self.due = 0
+        self.superseded = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.timer: Union[threading.Thread, None] = None
+
+    def frame(self, topic: str, data, observationTime, observationHash) -> str:
+        ''' the publish frame of an observation '''
+        prefix = self.prefixes.get(topic)
+        if prefix is None:
+            prefix = f'{self.title}:{{"topic": {encode(topic)}, "data": '
+            self.prefixes[topic] = prefix
+        return (
+            f'{prefix}{encode(str(data))}, "time": {encode(str(observationTime))}'
+            f', "hash": {encode(str(observationHash))}}}')
+
+    def isDue(self, topic: str, now: float) -> bool:
+        return self.topicTime.get(topic, 0) <= now - self.throttle
+
+    def publish(self, topic: str, data, observationTime, observationHash):
+        ''' holds the observation to be sent with the next batch '''
+        if self.timer is None:
+            self.start()
+        with self.lock:
+            if topic in self.pending:
+                self.superseded += 1
+            elif self.isDue(topic, time.time()):
+                self.due += 1
+            self.pending[topic] = (data, observationTime, observationHash)
+            full = self.due >= self.batchSize
+        if full:
+            self.flush()
+
+    def flush(self, force: bool = False) -> int:
+        ''' sends what's due, or everything if forced, returns how many '''
+        now = time.time()
+        with self.lock:
+            topics = [
+                topic for topic in self.pending
+                if force or self.isDue(topic, now)]
+            observations = [(topic, self.pending.pop(topic)) for topic in topics]
+            for topic in topics:
+                self.topicTime[topic] = now
+            self.due = sum(1 for topic in self.pending if self.isDue(topic, now))
+        if observations:
+            self.send([
+                self.frame(topic, *observation)
+                for topic, observation in observations])
+        return len(observations)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error('failed to send published observations', e)
+
+    def start(self):
+        with self.lock:
+            if self.timer is None:
+                self.timer = threading.Thread(target=self.run, daemon=True)
+                self.timer.start()
+
+    def stop(self, flush: bool = False):
+        ''' stops the timer, sending what's pending first if flush '''
+        self.stopped.set()
+        if flush:
+            self.flush(force=True)
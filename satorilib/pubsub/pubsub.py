@@ -13,8 +13,12 @@
 from typing import Union, Callable
 import json
 import time
+import random
 import threading
+from collections import deque
 from satorilib import logging
+from satorilib.pubsub.receiver import RouterPool
+from satorilib.pubsub.publisher import PublishBatcher
 
 
 class SatoriPubSubConn(object):
@@ -24,8 +28,32 @@ class SatoriPubSubConn(object):
         then: Union[str, None] = None, command: str = 'key', threaded: bool = True,
         onConnect: callable = None, onDisconnect: callable = None,
         emergencyRestart: callable = None,
+        routerWorkers: int = 0, receiveQueueSize: int = 10000,
+        backpressure: str = 'block',
+        publishInterval: float = None, publishBatchSize: int = 100,
+        timeout: float = 10, reconnectDelay: float = 1,
+        maxReconnectDelay: float = 60, sendBufferSize: int = 1000,
         *args, **kwargs
     ):
+        '''
+        routerWorkers - threads routing what's received, from a queue the
+            listener fills, so a slow router doesn't stop it reading. 0 routes
+            on the listener thread as it's received
+        receiveQueueSize - messages the queue holds before backpressure applies
+        backpressure - 'block', 'drop-oldest' or 'coalesce', see receiver.py
+        publishInterval - seconds between sending published observations in
+            batches, keeping the latest of each topic, see publisher.py. None
+            sends each as it's published, skipping those a topic publishes
+            within 55 seconds of the last
+        publishBatchSize - sends a batch before the interval once this many
+            are due
+        timeout - the longest a send waits on the socket, or on another send,
+            before it's buffered instead
+        reconnectDelay, maxReconnectDelay - the first and longest wait between
+            attempts to connect, doubling in between, with jitter
+        sendBufferSize - sends held while we're not connected, to go out once
+            we are, the oldest dropped past this
+        '''
         self.c = 0
         self.uid = uid
         self.url = url or 'ws://pubsub.satorinet.io:24603'
@@ -41,40 +69,117 @@ class SatoriPubSubConn(object):
         self.ws = None
         self.then = then
         self.emergencyRestart = emergencyRestart
+        self.timeout = timeout
+        self.reconnectDelay = reconnectDelay
+        self.maxReconnectDelay = maxReconnectDelay
+        self.state = 'disconnected'
+        self.buffered: deque[str] = deque(maxlen=sendBufferSize)
+        self.dropped = 0
+        self.sendLock = threading.Lock()
+        self.stateLock = threading.Lock()
+        self.wake = threading.Event()
+        self.reconnecting: Union[threading.Thread, None] = None
+        self.routerPool = RouterPool(
+            router=self.routeMessage,
+            workers=routerWorkers,
+            maxsize=receiveQueueSize,
+            policy=backpressure,
+        ) if routerWorkers > 0 else None
+        self.publishInterval = publishInterval
+        self.publisher = PublishBatcher(
+            send=self.sendFrames,
+            throttle=55,
+            interval=publishInterval or 1,
+            batchSize=publishBatchSize,
+            topicTime=self.topicTime)
         if self.threaded:
             self.ear = threading.Thread(
                 target=self.connectThenListen, daemon=True)
             self.ear.start()
 
+    @property
+    def connected(self) -> bool:
+        return self.state == 'connected' and self.ws is not None and self.ws.connected
+
+    def backoff(self, attempt: int) -> float:
+        '''
+        seconds to wait before the next attempt, doubling each time up to
+        maxReconnectDelay, half of it random so a server coming back isn't
+        met by everyone reconnecting at once
+        '''
+        delay = min(self.maxReconnectDelay, self.reconnectDelay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
     def connectThenListen(self):
-        while True:
+        self.reconnect(listen=True)
+
+    def reconnect(self, listen: bool = False):
+        ''' connects, listening until dropped if listen, backing off between tries '''
+        attempt = 0
+        while self.shouldReconnect:
             self.connect()
-            if self.ws and self.ws.connected:
+            if self.connected:
+                attempt = 0
+                if not listen:
+                    return
                 if self.then is not None:
-                    time.sleep(3)
+                    self.wake.wait(3)
                     self.send(self.then)
                     # don't send again
                     self.then = None
                 self.listen()
-            time.sleep(60)
+            if not self.shouldReconnect:
+                break
+            delay = self.backoff(attempt)
+            attempt += 1
+            self.state = 'waiting'
+            logging.info(f'reconnecting to {self.url} in {delay:.1f} seconds...')
+            self.wake.wait(delay)
 
-    def connect(self):
-        import websocket
+    def reconnectInBackground(self):
+        ''' a dropped connection comes back without holding up the caller '''
+        if self.threaded:
+            # the listener sees it's closed and reconnects
+            return self.closeSocket()
+        with self.stateLock:
+            if self.reconnecting is not None and self.reconnecting.is_alive():
+                return
+            self.closeSocket()
+            self.reconnecting = threading.Thread(target=self.reconnect, daemon=True)
+            self.reconnecting.start()
+
+    def closeSocket(self, graceful: bool = False):
+        ''' closes the socket, or if it's broken, wakes anything waiting on it '''
         if self.ws is not None:
             try:
-                self.ws.close()
-                self.ws = None
-            except:
+                if graceful:
+                    self.ws.close(timeout=self.timeout)
+                else:
+                    self.ws.abort()
+            except Exception as _:
                 pass
-        self.ws = self.ws or websocket.WebSocket()
-        self.ws.settimeout(60*60)
+
+    def connect(self):
+        import websocket
+        self.state = 'connecting'
+        if self.ws is not None:
+            self.closeSocket()
+            self.ws = None
+        ws = websocket.WebSocket()
+        # bounds every wait on the socket, so no send holds its caller longer
+        ws.settimeout(self.timeout)
         try:
-            self.ws.connect(f'{self.url}?uid={self.uid}')
+            ws.connect(f'{self.url}?uid={self.uid}')
+            self.ws = ws
             if isinstance(self.onConnect, Callable):
                 self.onConnect()
-            self.send(self.command + ':' + self.payload)
+            with self.sendLock:
+                # ahead of anything buffered while we were away
+                self.ws.send(self.command + ':' + self.payload)
+            self.state = 'connected'
             logging.info('connected to:', self.url, 'for', 'publishing' if self.router ==
                             None else 'subscriptions', 'as', self.uid, color='green')
+            self.flush()
             return self.ws
         except Exception as e:
             # except OSError as e:
@@ -82,17 +187,18 @@ class SatoriPubSubConn(object):
             # pubsub server went down
             if 'Forbidden' in str(e):
                 exit()
+            self.ws = None
+            self.state = 'disconnected'
             logging.error(
-                e, f'\ndropped {"publishing" if self.router is None else "subscribing"} {self.url}, retrying in 60 seconds...', print=True)
+                e, f'\ndropped {"publishing" if self.router is None else "subscribing"} {self.url}', print=True)
             if isinstance(self.onDisconnect, Callable):
                 self.onDisconnect()
-            time.sleep(60)
 
     def listen(self):
+        import websocket
         while True:
-            if not self.ws or not self.ws.connected:
+            if not self.connected:
                 logging.error('WebSocket is not connected, reconnecting...')
-                time.sleep(60)
                 break
             try:
                 response = self.ws.recv()
@@ -101,20 +207,34 @@ class SatoriPubSubConn(object):
                         self.emergencyRestart()
                 except Exception as _:
                     pass
+                if self.routerPool is not None:
+                    self.routerPool.put(response)
+                    continue
                 # don't break listener because of router behavior
                 try:
-                    if self.router is not None:
-                        self.router(response)
+                    self.routeMessage(response)
                 except Exception as _:
                     pass
+            except websocket.WebSocketTimeoutException:
+                # nothing to read yet, the timeout is there for sending
+                continue
             except Exception as e:
                 # except WebSocketConnectionClosedException as e:
                 # except ConnectionResetError:
-                logging.error(
-                    e, f'\nfailed while listening {self.url}, reconnecting in 60 seconds...', print=True)
-                time.sleep(60)
+                if self.shouldReconnect:
+                    logging.error(
+                        e, f'\nfailed while listening {self.url}', print=True)
+                self.state = 'disconnected'
                 break
 
+    def routeMessage(self, response: str):
+        if self.router is not None:
+            self.router(response)
+
+    def metrics(self) -> Union[dict, None]:
+        ''' queue depth and router latency, if routing on worker threads '''
+        return self.routerPool.metrics() if self.routerPool is not None else None
+
     def setTopicTime(self, topic: str):
         self.topicTime[topic] = time.time()
 
@@ -153,8 +273,6 @@ class SatoriPubSubConn(object):
         observationTime: Union[str, None] = None,
         observationHash: Union[str, None] = None,
     ):
-        if self.ws.connected == False:
-            return
         if payload is None and title is None and topic is None and data is None:
             raise ValueError(
                 'payload or (title, topic, data) must not be None')
@@ -165,36 +283,80 @@ class SatoriPubSubConn(object):
                 'time': str(observationTime),
                 'hash': str(observationHash),
             }))
+        if not self.sendLock.acquire(timeout=self.timeout):
+            return self.buffer(payload)
+        try:
+            if self.buffered or not self.connected:
+                # behind what's waiting, so it goes out in order
+                return self.buffer(payload)
+            if not self.transmit(payload):
+                self.buffer(payload)
+        finally:
+            self.sendLock.release()
+
+    def transmit(self, payload: str) -> bool:
+        ''' sends on the socket, with the send lock held '''
         try:
             self.ws.send(payload)
+            return True
         except Exception as e:
             # BrokenPipeError
             # WebSocketConnectionClosedException
             # WebSocketTimeoutException
             logging.error(
-                e, '\nfailed while sending to Satori Pubsub, reconnecting in 30 seconds...', print=True)
-            time.sleep(30)
-            self.connect()
+                e, '\nfailed while sending to Satori Pubsub, reconnecting...', print=True)
+            self.state = 'disconnected'
+            self.reconnectInBackground()
+            return False
+
+    def buffer(self, payload: str):
+        ''' holds a send until we're connected, dropping the oldest past the limit '''
+        if len(self.buffered) == self.buffered.maxlen:
+            self.dropped += 1
+        self.buffered.append(payload)
+
+    def flush(self):
+        ''' sends what was buffered while we weren't connected, in order '''
+        while self.buffered and self.connected:
+            if not self.sendLock.acquire(timeout=self.timeout):
+                return
+            try:
+                if not self.buffered:
+                    return
+                payload = self.buffered.popleft()
+                if not self.transmit(payload):
+                    self.buffered.appendleft(payload)
+                    return
+            finally:
+                self.sendLock.release()
+
+    def sendFrames(self, frames: list[str]):
+        for frame in frames:
+            self.send(frame)
 
     def publish(self, topic: str, data: str, observationTime: str, observationHash: str):
-        if self.topicTime.get('topic', 0) > time.time() - 55:
+        if self.publishInterval is not None:
+            return self.publisher.publish(topic, data, observationTime, observationHash)
+        if self.topicTime.get(topic, 0) > time.time() - 55:
             return
         self.setTopicTime(topic)
-        self.send(
-            title='publish',
-            topic=topic,
-            data=data,
-            observationTime=observationTime,
-            observationHash=observationHash)
+        self.send(self.publisher.frame(topic, data, observationTime, observationHash))
 
     def disconnect(self, reconnect: bool = False):
         self.shouldReconnect = reconnect
         self.listening = False
-        self.send(title='notice', topic='connection', data='False')
+        if not reconnect:
+            # what's waiting to be published goes out before we do
+            self.publisher.stop(flush=True)
+            self.wake.set()
+        if self.connected:
+            self.send(title='notice', topic='connection', data='False')
         if isinstance(self.onDisconnect, Callable):
             self.onDisconnect()
-        self.ws.close()  # server should detect we closed the connection
-        assert (self.ws.connected == False)
+        if not reconnect and self.routerPool is not None:
+            self.routerPool.stop(wait=False)
+        self.closeSocket(graceful=True)  # server should detect we closed the connection
+        self.state = 'disconnected'
         self.ws = None
 
     def setRouter(self, router: 'function' = None):
@@ -0,0 +1,178 @@
+'''
+a bounded queue between the socket and the router. the listener only puts
+what it receives here and goes back to reading, while a pool of worker threads
+calls the router, so a slow disk write or model update no longer stops us
+reading and the server no longer sees us lagging.
+
+messages are sharded to workers by topic, each worker has its own queue, so
+messages of the same topic are routed in the order they arrived while other
+topics are routed alongside them. when a worker's queue is full the policy
+decides what gives:
+    block - the listener waits for room, pushing back on the socket
+    drop-oldest - the oldest waiting message is dropped
+    coalesce - only the newest waiting message of each topic is kept, as
+        only the latest observation matters, then the oldest is dropped if
+        it's still full
+'''
+from typing import Callable, Union
+import json
+import time
+import threading
+from collections import deque, OrderedDict
+from satorilib import logging
+
+POLICIES = ('block', 'drop-oldest', 'coalesce')
+
+
+def topicOf(message: str) -> Union[str, None]:
+    ''' the topic of a message from the pubsub server, None if it has none '''
+    try:
+        j = json.loads(message)
+    except Exception as _:
+        return None
+    return j.get('topic') if isinstance(j, dict) else None
+
+
+class Lane:
+    ''' one worker's queue of (message, time it arrived) '''
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.waiting: OrderedDict = OrderedDict()
+        self.condition = threading.Condition()
+        self.sequence = 0
+
+
+class RouterPool:
+
+    def __init__(
+        self,
+        router: Callable,
+        workers: int = 4,
+        maxsize: int = 10000,
+        policy: str = 'block',
+        keyOf: Callable = topicOf,
+        latencies: int = 1000,
+    ):
+        '''
+        workers - threads calling the router
+        maxsize - messages waiting across all workers before the policy applies
+        keyOf - the topic of a message, messages without one share a worker
+        latencies - how many recent router timings the metrics are taken from
+        '''
+        if policy not in POLICIES:
+            raise ValueError(f'policy must be one of {POLICIES}')
+        self.router = router
+        self.policy = policy
+        self.keyOf = keyOf
+        self.lanes = [Lane(max(maxsize // workers, 1)) for _ in range(workers)]
+        self.running = True
+        self.lock = threading.Lock()
+        self.received = 0
+        self.routed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=latencies)
+        self.waits = deque(maxlen=latencies)
+        self.workers = [
+            threading.Thread(target=self.work, args=(lane,), daemon=True)
+            for lane in self.lanes]
+        for worker in self.workers:
+            worker.start()
+
+    @property
+    def depth(self) -> int:
+        ''' messages waiting to be routed '''
+        return sum(len(lane.waiting) for lane in self.lanes)
+
+    def put(self, message: str):
+        ''' queues a message for the router, called by the listener '''
+        key = self.keyOf(message)
+        lane = self.lanes[hash(key) % len(self.lanes) if key is not None else 0]
+        with lane.condition:
+            self.received += 1
+            if self.policy == 'coalesce' and key is not None and ('topic', key) in lane.waiting:
+                # replaced where it waits, still behind the rest of its topic
+                lane.waiting[('topic', key)] = (message, time.perf_counter())
+                self.coalesced += 1
+                return
+            while len(lane.waiting) >= lane.maxsize:
+                if self.policy == 'block' and self.running:
+                    lane.condition.wait()
+                    continue
+                lane.waiting.popitem(last=False)
+                self.dropped += 1
+            if self.policy == 'coalesce' and key is not None:
+                lane.waiting[('topic', key)] = (message, time.perf_counter())
+            else:
+                lane.sequence += 1
+                lane.waiting[lane.sequence] = (message, time.perf_counter())
+            lane.condition.notify_all()
+
+    def work(self, lane: Lane):
+        while True:
+            with lane.condition:
+                while not lane.waiting and self.running:
+                    lane.condition.wait()
+                if not lane.waiting:
+                    return
+                _, (message, arrived) = lane.waiting.popitem(last=False)
+                lane.condition.notify_all()
+            started = time.perf_counter()
+            try:
+                self.router(message)
+            except Exception as e:
+                # don't stop the worker because of router behavior
+                logging.error('router failed', e)
+                with self.lock:
+                    self.failed += 1
+            finished = time.perf_counter()
+            with self.lock:
+                self.routed += 1
+                self.waits.append(started - arrived)
+                self.latencies.append(finished - started)
+
+    def metrics(self) -> dict:
+        '''
+        counts of messages, the queue depth, and the router's time per
+        message and time messages spent waiting, over recent messages, in
+        seconds
+        '''
+        def summary(values: list[float]) -> dict:
+            if not values:
+                return {'mean': None, 'p50': None, 'p99': None, 'max': None}
+            values = sorted(values)
+            return {
+                'mean': sum(values) / len(values),
+                'p50': values[len(values) // 2],
+                'p99': values[min(int(len(values) * 0.99), len(values) - 1)],
+                'max': values[-1]}
+
+        with self.lock:
+            latencies = list(self.latencies)
+            waits = list(self.waits)
+            routed = self.routed
+        return {
+            'depth': self.depth,
+            'depths': [len(lane.waiting) for lane in self.lanes],
+            'received': self.received,
+            'routed': routed,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'failed': self.failed,
+            'latency': summary(latencies),
+            'wait': summary(waits)}
+
+    def setRouter(self, router: Callable):
+        self.router = router
+
+    def stop(self, wait: bool = True):
+        ''' routes what's waiting then stops the workers '''
+        self.running = False
+        for lane in self.lanes:
+            with lane.condition:
+                lane.condition.notify_all()
+        if wait:
+            for worker in self.workers:
+                worker.join()
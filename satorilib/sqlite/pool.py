@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import threading
+
+# WAL lets readers carry on while a write is in progress, NORMAL sync is safe
+# under WAL, the rest keeps more of the database in memory between queries.
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -16000,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+
+class ConnectionPool:
+    '''
+    one open connection per thread to the same database, reused for every
+    query rather than connecting each time. sqlite connections can't be
+    shared between threads, so each thread opens its own on first use. a
+    connection keeps its prepared statements cached by query text, so
+    repeating a query skips parsing it again.
+    '''
+
+    def __init__(
+        self,
+        database: str,
+        pragmas: dict = None,
+        cached_statements: int = 256,
+        initialize: str = None,
+    ):
+        '''
+        pragmas - set on every connection, PRAGMAS by default
+        initialize - a script run on every new connection, like creating
+            tables if they don't exist
+        '''
+        self.database = database
+        self.pragmas = PRAGMAS if pragmas is None else pragmas
+        self.initialize = initialize
+        self.cached_statements = cached_statements
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections: list[sqlite3.Connection] = []
+        # the thread each connection was opened by, in the same order
+        self.owners: list[threading.Thread] = []
+        self.pid = os.getpid()
+
+    def __repr__(self):
+        return f'ConnectionPool({self.database}, {len(self.connections)} open)'
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.database,
+            cached_statements=self.cached_statements,
+            # only ever used by the thread that opened it, but closed by any
+            check_same_thread=False)
+        for pragma, value in self.pragmas.items():
+            conn.execute(f'pragma {pragma}={value}')
+        if self.initialize:
+            conn.executescript(self.initialize)
+        with self.lock:
+            self.connections.append(conn)
+            self.owners.append(threading.current_thread())
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        ''' this thread's connection, opened on first use '''
+        if self.pid != os.getpid():
+            # connections don't survive a fork, start over in the child
+            self.local = threading.local()
+            self.connections = []
+            self.owners = []
+            self.pid = os.getpid()
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.connect()
+            self.local.conn = conn
+        return conn
+
+    def close(self):
+        ''' closes every thread's connection, they reopen if used again '''
+        with self.lock:
+            for conn in self.connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self.connections = []
+            self.owners = []
+        self.local = threading.local()
+
+    def release(self) -> bool:
+        '''
+        closes this thread's connection, and those of threads that have
+        finished, leaving any other thread's open as it may be using it.
+        returns True once none are left open.
+        '''
+        current = threading.current_thread()
+        with self.lock:
+            kept = []
+            for conn, owner in zip(self.connections, self.owners):
+                if owner is current or not owner.is_alive():
+                    try:
+                        conn.close()
+                    except sqlite3.Error:
+                        pass
+                else:
+                    kept.append((conn, owner))
+            self.connections = [conn for conn, _ in kept]
+            self.owners = [owner for _, owner in kept]
+            done = not self.connections
+        self.local.conn = None
+        return done
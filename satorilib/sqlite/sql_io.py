@@ -1,5 +1,8 @@
 import sqlite3
+import itertools
+import numpy as np
 import pandas as pd
+from typing import Iterable, Union
 from .coerce import coerce
 import threading
 
@@ -17,6 +20,18 @@ class MockLock:
         pass
 
 
+def choose_lock():
+    ''' a dask lock if there are dask workers to share it, otherwise a mock '''
+    try:
+        from dask.distributed import Lock
+        lock = Lock('db-lock')
+        with lock:
+            pass
+        return lock
+    except Exception:
+        return MockLock('db-lock')
+
+
 def execute(
     query: str = None,
     params: list = None,
@@ -26,24 +41,20 @@ def execute(
     database: str = None,
     index_col: str = None,
     lock=None,
+    conn: sqlite3.Connection = None,
 ):
+    ''' conn - an open connection to use, otherwise one is opened '''
     if not query and data is None:
         return
     if lock is None:
-        from dask.distributed import Lock
-        lock = Lock('db-lock')
-        try:
-            with lock:
-                pass
-        except Exception:
-            lock = MockLock('db-lock')
+        lock = choose_lock()
     with lock:
-        with sqlite3.connect(database) as conn:
+        with conn or sqlite3.connect(database) as conn:
             if query:
                 if ';' in query and (params is None or params == []):
                     return conn.executescript(query)
                 else:
-                    return conn.execute(query, params)
+                    return conn.execute(query, params or [])
             if data is not None and table:
                 if (not data.empty and data.columns.tolist() != [' ']) or data.empty:
                     return data.to_sql(
@@ -61,6 +72,7 @@ def write(
     database=None,
     index_col=None,
     lock=None,
+    conn: sqlite3.Connection = None,
 ):
     ''' writes to a database table '''
     return execute(
@@ -70,7 +82,310 @@ def write(
         table=table,
         database=database,
         index_col=index_col,
-        lock=lock)
+        lock=lock,
+        conn=conn)
+
+
+def batches(rows: Iterable, batch_size: int):
+    ''' lists of up to batch_size rows, without holding more than one '''
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def execute_many(
+    query: str,
+    rows: Iterable,
+    database: str = None,
+    lock=None,
+    conn: sqlite3.Connection = None,
+    batch_size: int = 10000,
+) -> int:
+    '''
+    runs the query once per row, a batch of rows per transaction, rather
+    than committing every row. returns the number of rows.
+    '''
+    if lock is None:
+        lock = choose_lock()
+    opened = conn is None
+    conn = conn or sqlite3.connect(database)
+    count = 0
+    try:
+        for batch in batches(rows, batch_size):
+            with lock:
+                with conn:
+                    conn.executemany(query, batch)
+            count += len(batch)
+    finally:
+        if opened:
+            conn.close()
+    return count
+
+
+def insert_query(
+    table: str,
+    columns: list,
+    replace: bool = False,
+    conflict: list = None,
+) -> str:
+    '''
+    an insert of one row of the columns. replace - insert or replace,
+    conflict - the unique columns to upsert on, updating the others.
+    '''
+    names = ', '.join(f'"{column}"' for column in columns)
+    marks = ', '.join('?' for _ in columns)
+    query = f'insert {"or replace " if replace else ""}into "{table}" ({names}) values ({marks})'
+    if conflict:
+        keys = ', '.join(f'"{column}"' for column in coerce(conflict, list))
+        updates = ', '.join(
+            f'"{column}"=excluded."{column}"'
+            for column in columns if column not in conflict)
+        query += f' on conflict({keys}) do ' + (f'update set {updates}' if updates else 'nothing')
+    return query
+
+
+def rows_of(data: pd.DataFrame, index: bool = False) -> Iterable[tuple]:
+    '''
+    the rows as tuples sqlite can bind, NaN as null and datetimes as the text
+    to_sql would have written.
+    '''
+    def text(times: pd.DatetimeIndex) -> pd.Index:
+        return pd.Index(times.strftime('%Y-%m-%d %H:%M:%S.%f')).str.replace(
+            r'\.000000$', '', regex=True)
+
+    for column in data.columns[[dtype.kind == 'M' for dtype in data.dtypes]]:
+        data = data.assign(**{column: text(pd.DatetimeIndex(data[column])).values})
+    if index and data.index.dtype.kind == 'M':
+        data = data.set_axis(text(data.index), axis=0)
+    if data.isna().values.any():
+        data = data.astype(object).where(data.notna(), None)
+    return data.itertuples(index=index, name=None)
+
+
+def load_chunks(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    table: str,
+    database: str = None,
+    lock=None,
+    conn: sqlite3.Connection = None,
+    chunksize: int = 10000,
+    if_exists: str = 'append',
+    index_col: str = None,
+) -> int:
+    '''
+    loads a dataframe, or an iterator of them, into the table a chunk at a
+    time, so memory is bounded by the chunk rather than the whole load.
+    the table is created by to_sql from the first chunk's columns.
+    returns the number of rows.
+    '''
+    if lock is None:
+        lock = choose_lock()
+    if isinstance(data, pd.DataFrame):
+        frames = (
+            data.iloc[start:start + chunksize]
+            for start in range(0, max(len(data), 1), chunksize))
+    else:
+        frames = iter(data)
+    opened = conn is None
+    conn = conn or sqlite3.connect(database)
+    count = 0
+    query = None
+    try:
+        for frame in frames:
+            if query is None:
+                with lock:
+                    with conn:
+                        frame.iloc[:0].to_sql(
+                            table, conn,
+                            if_exists=if_exists,
+                            index=True if index_col else False,
+                            index_label=index_col if index_col else None)
+                query = insert_query(
+                    table=table,
+                    columns=([index_col] if index_col else []) + [str(c) for c in frame.columns])
+            count += execute_many(
+                query=query,
+                rows=rows_of(frame, index=bool(index_col)),
+                lock=lock,
+                conn=conn,
+                batch_size=chunksize)
+    finally:
+        if opened:
+            conn.close()
+    return count
+
+
+def fetch_chunks(
+    query: str,
+    params: list = None,
+    database: str = None,
+    lock=None,
+    conn: sqlite3.Connection = None,
+    chunksize: int = 10000,
+):
+    '''
+    yields the column names, then lists of up to chunksize row tuples as
+    they're fetched from a live cursor, so only a chunk is ever held.
+    '''
+    if lock is None:
+        lock = choose_lock()
+    opened = conn is None
+    conn = conn or sqlite3.connect(database)
+    cursor = None
+    try:
+        with lock:
+            cursor = conn.execute(query, params or [])
+        yield [description[0] for description in cursor.description or []]
+        while True:
+            with lock:
+                rows = cursor.fetchmany(chunksize)
+            if not rows:
+                return
+            yield rows
+    finally:
+        if cursor is not None:
+            cursor.close()
+        if opened:
+            conn.close()
+
+
+def iterate(
+    query: str,
+    params: list = None,
+    database: str = None,
+    lock=None,
+    conn: sqlite3.Connection = None,
+    chunksize: int = 10000,
+    frames: bool = True,
+    index_col: str = None,
+):
+    ''' yields the results a chunk at a time, as dataframes or row tuples '''
+    chunks = fetch_chunks(query, params, database, lock, conn, chunksize)
+    columns = next(chunks)
+    for rows in chunks:
+        if not frames:
+            yield rows
+            continue
+        df = pd.DataFrame.from_records(rows, columns=columns)
+        yield df.set_index(index_col) if index_col else df
+
+
+def typed(values: tuple) -> np.ndarray:
+    '''
+    a column of results as a typed array, null numbers as NaN. the type is
+    taken from every value, as a column without a declared type can hold ints
+    and floats alike.
+    '''
+    sample = next((value for value in values if value is not None), None)
+    if not isinstance(sample, (int, float)):
+        return np.array(values, dtype=object)
+    try:
+        array = np.array(values)
+    except (OverflowError, TypeError, ValueError):
+        return np.array(values, dtype=object)
+    if array.dtype.kind == 'i':
+        return array.astype(np.int64, copy=False)
+    if array.dtype.kind in 'uf':
+        return array.astype(np.float64, copy=False)
+    if array.dtype.kind == 'O' and all(
+        value is None or type(value) in (int, float) for value in values
+    ):
+        return np.array(values, dtype=np.float64)
+    return np.array(values, dtype=object)
+
+
+def joined(chunks: list[np.ndarray]) -> np.ndarray:
+    '''
+    a column's chunks as one array, of the type it would have had if typed
+    all at once: ints become floats alongside floats or nulls, and numbers
+    are kept as they are, nulls as None, alongside anything else.
+    '''
+    nulls = [
+        chunk.dtype == object and all(value is None for value in chunk)
+        for chunk in chunks]
+    numeric = [chunk for chunk in chunks if chunk.dtype != object]
+    if not numeric:
+        return np.concatenate(chunks)
+    if all(null or chunk.dtype != object for chunk, null in zip(chunks, nulls)):
+        dtype = np.float64 if any(nulls) else np.result_type(*numeric)
+        return np.concatenate([
+            np.full(len(chunk), np.nan) if null else chunk.astype(dtype, copy=False)
+            for chunk, null in zip(chunks, nulls)])
+
+    def objects(chunk: np.ndarray) -> np.ndarray:
+        if chunk.dtype == object:
+            return chunk
+        array = chunk.astype(object)
+        if chunk.dtype.kind == 'f':
+            # sqlite has no NaN, it stores them as null
+            array[np.isnan(chunk)] = None
+        return array
+
+    return np.concatenate([objects(chunk) for chunk in chunks])
+
+
+def numpy_chunks(
+    query: str,
+    params: list = None,
+    database: str = None,
+    lock=None,
+    conn: sqlite3.Connection = None,
+    chunksize: int = 100000,
+):
+    '''
+    yields the column names, then a typed array per column per chunk. a
+    column's type can differ between chunks, see joined.
+    '''
+    chunks = fetch_chunks(query, params, database, lock, conn, chunksize)
+    yield next(chunks)
+    for rows in chunks:
+        yield [typed(column) for column in zip(*rows)]
+
+
+def read_numpy(
+    query: str,
+    params: list = None,
+    database: str = None,
+    lock=None,
+    conn: sqlite3.Connection = None,
+    chunksize: int = 100000,
+) -> dict[str, np.ndarray]:
+    '''
+    the results as a typed numpy array per column. rows are converted a chunk
+    at a time, so numeric columns never exist as python objects all at once,
+    and nothing becomes a dataframe of object columns on the way.
+    '''
+    chunks = numpy_chunks(query, params, database, lock, conn, chunksize)
+    columns = next(chunks)
+    arrays = list(chunks)
+    if not arrays:
+        return {column: np.empty(0) for column in columns}
+    # a column at a time, dropping its chunks as it goes
+    read = {}
+    for i, column in enumerate(columns):
+        read[column] = joined([chunk[i] for chunk in arrays])
+        for chunk in arrays:
+            chunk[i] = None
+    return read
+
+
+def read_arrow(
+    query: str,
+    params: list = None,
+    database: str = None,
+    lock=None,
+    conn: sqlite3.Connection = None,
+    chunksize: int = 100000,
+):
+    ''' the results as a pyarrow Table, from the typed numpy arrays '''
+    import pyarrow as pa
+    arrays = read_numpy(query, params, database, lock, conn, chunksize)
+    return pa.table({
+        column: pa.array(array, from_pandas=True)
+        for column, array in arrays.items()})
 
 
 def read(
@@ -79,32 +394,28 @@ def read(
     database=None,
     index_col=None,
     lock=None,
+    conn: sqlite3.Connection = None,
 ):
     ''' returns dataframe '''
     if lock is None:
-        from dask.distributed import Lock
-        lock = Lock('db-lock')
-        try:
-            with lock:
-                pass
-        except Exception:
-            lock = MockLock('db-lock')
+        lock = choose_lock()
     with lock:
-        with sqlite3.connect(database) as conn:
+        with conn or sqlite3.connect(database) as conn:
             if index_col:
                 return pd.read_sql(query, conn, params=params, index_col=index_col)
             else:
                 return pd.read_sql(query, conn, params=params)
 
 
-def drop(table: str, database=None, lock=None):
+def drop(table: str, database=None, lock=None, conn: sqlite3.Connection = None):
     ''' drops a table '''
     # should not hide error? - defaults if exists functionality
     try:
         return execute(
             query=f'drop table {table};',
             database=database,
-            lock=lock)
+            lock=lock,
+            conn=conn)
     except sqlite3.OperationalError:  # no such table
         return
 
@@ -113,12 +424,13 @@ def delete_query(where: str, table: str):
     return f"delete from {table} where {where}"
 
 
-def delete(where: str, table: str, database=None, lock=None):
+def delete(where: str, table: str, database=None, lock=None, conn: sqlite3.Connection = None):
     ''' deletes a row from a table '''
     return execute(
         query=delete_query(where, table),
         database=database,
-        lock=lock)
+        lock=lock,
+        conn=conn)
 
 
 def update_query(where: str, columns: list, values: list, table: str):
@@ -133,7 +445,9 @@ def update(
     columns: list,
     values: list,
     table: str,
-    database: str = None
+    database: str = None,
+    lock=None,
+    conn: sqlite3.Connection = None,
 ):
     ''' returns query for updates '''
     query = update_query(
@@ -144,7 +458,8 @@ def update(
     return execute(
         query=query,
         database=database,
-        lock=lock)
+        lock=lock,
+        conn=conn)
 
 
 def apply_params(query: str, params: dict = None) -> str:
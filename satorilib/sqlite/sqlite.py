@@ -1,8 +1,10 @@
 import os
-from typing import Union
+import re
+from typing import Iterable, Union
 import pandas as pd
 import sqlite3
 from . import sql_io
+from .pool import ConnectionPool
 
 
 class Sqlite:
@@ -25,6 +27,20 @@ class Sqlite:
         # delete
         df = sql.delete(where="col='foo'", table='table')
     ```
+    pooled=True keeps a connection open per thread, in WAL mode, rather than
+    connecting for every query, and picks the lock once up front. rows can
+    then be fetched without building a dataframe:
+    ```
+    with Sqlite(database='path-to-db-file', pooled=True) as sql:
+        rows = sql.fetch(query='select col from table where id=?', params=(1,))
+    ```
+    big tables can be scanned a chunk at a time, or read straight into typed
+    arrays rather than a dataframe of python objects:
+    ```
+        for df in sql.iterate(query='select * from table', chunksize=10000):
+            ...
+        arrays = sql.readNumpy(query='select id, value from table')
+    ```
     '''
 
     def __init__(
@@ -33,15 +49,18 @@ class Sqlite:
         initialize: str = None,
         index_col: str = None,
         lock=None,
+        pooled: bool = False,
     ):
         '''
         database - path to database file
         initialize - query to set up datbase tables first time
+        pooled - reuse a connection per thread, see ConnectionPool
         '''
         self.database = database
         self.initialize = initialize or f'create table data ([column] text)'
         self.index_col = index_col
-        self.lock = lock
+        self.pool = ConnectionPool(database) if pooled else None
+        self.lock = lock or (sql_io.choose_lock() if pooled else None)
 
     def __enter__(self):
         if not os.path.exists(os.path.abspath(self.database)):
@@ -53,8 +72,18 @@ class Sqlite:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
         return
 
+    @property
+    def conn(self) -> Union[sqlite3.Connection, None]:
+        ''' this thread's pooled connection, None if not pooled '''
+        return self.pool.connection() if self.pool else None
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+
     def get_initialize(self):
         return self.initialize
 
@@ -69,6 +98,7 @@ class Sqlite:
         if query:
             return sql_io.execute(
                 lock=self.lock,
+                conn=self.conn,
                 query=query,
                 # query=sql_io.apply_params(query, params),
                 data=data,
@@ -78,6 +108,7 @@ class Sqlite:
                 index_col=self.index_col)
         return sql_io.execute(
             lock=self.lock,
+            conn=self.conn,
             data=data,
             table=table,
             if_exists=if_exists,
@@ -94,6 +125,7 @@ class Sqlite:
             return sql_io.read(
                 # query=sql_io.apply_params(query, params),
                 lock=self.lock,
+                conn=self.conn,
                 query=query,
                 params=params,
                 database=self.database,
@@ -101,11 +133,76 @@ class Sqlite:
         return sql_io.read(
             # query=sql_io.apply_params(f'select * from {table}', params),
             lock=self.lock,
+            conn=self.conn,
             query='select * from ?',
             params=params or [table],
             database=self.database,
             index_col=self.index_col)
 
+    def fetch(
+        self,
+        query: str,
+        params: Union[list[str], tuple[str, ...], dict[str, str], None] = None,
+    ) -> list[tuple]:
+        ''' the rows of a query as tuples, skipping the dataframe read builds '''
+        with self.lock or sql_io.choose_lock():
+            if self.pool:
+                return self.conn.execute(query, params or []).fetchall()
+            with sqlite3.connect(self.database) as conn:
+                return conn.execute(query, params or []).fetchall()
+
+    def iterate(
+        self,
+        query: str,
+        params: Union[list[str], tuple[str, ...], dict[str, str], None] = None,
+        chunksize: int = 10000,
+        frames: bool = True,
+    ):
+        '''
+        yields the results a chunk of rows at a time from a live cursor, as
+        dataframes, or as lists of row tuples if not frames, so a table far
+        bigger than memory can be scanned.
+        '''
+        return sql_io.iterate(
+            lock=self.lock,
+            conn=self.conn,
+            query=query,
+            params=params,
+            database=self.database,
+            chunksize=chunksize,
+            frames=frames,
+            index_col=self.index_col if frames else None)
+
+    def readNumpy(
+        self,
+        query: str,
+        params: Union[list[str], tuple[str, ...], dict[str, str], None] = None,
+        chunksize: int = 100000,
+    ) -> dict:
+        ''' the results as {column: typed numpy array}, built a chunk at a time '''
+        return sql_io.read_numpy(
+            lock=self.lock,
+            conn=self.conn,
+            query=query,
+            params=params,
+            database=self.database,
+            chunksize=chunksize)
+
+    def readArrow(
+        self,
+        query: str,
+        params: Union[list[str], tuple[str, ...], dict[str, str], None] = None,
+        chunksize: int = 100000,
+    ):
+        ''' the results as a pyarrow Table, built a chunk at a time '''
+        return sql_io.read_arrow(
+            lock=self.lock,
+            conn=self.conn,
+            query=query,
+            params=params,
+            database=self.database,
+            chunksize=chunksize)
+
     def write(
         self,
         query: str,
@@ -113,23 +210,87 @@ class Sqlite:
     ):
         return sql_io.write(
             lock=self.lock,
+            conn=self.conn,
             # query=sql_io.apply_params(query, params),
             query=query,
             params=params,
             database=self.database,
             index_col=self.index_col)
 
-    def load(self, data: pd.DataFrame, table: str):
-        return sql_io.write(
+    def writeMany(
+        self,
+        query: str = None,
+        rows: Iterable[Union[tuple, list, dict]] = None,
+        table: str = None,
+        columns: list[str] = None,
+        batchSize: int = 10000,
+        replace: bool = False,
+        conflict: list[str] = None,
+    ) -> int:
+        '''
+        writes many rows, a transaction per batch of rows rather than per row.
+        query - run once per row, or built from table and columns
+        replace - insert or replace rather than insert, a query given with it
+            must start with insert into
+        conflict - unique columns to upsert on, updating the rest, only with
+            table and columns
+        returns the number of rows written
+        '''
+        if query is None:
+            query = sql_io.insert_query(
+                table=table,
+                columns=columns,
+                replace=replace,
+                conflict=conflict)
+        elif conflict:
+            raise ValueError('conflict needs table and columns rather than a query')
+        elif replace:
+            query, replaced = re.subn(
+                r'^\s*insert\s+into', 'insert or replace into', query, flags=re.IGNORECASE)
+            if not replaced:
+                raise ValueError('replace needs an insert into query, or table and columns')
+        return sql_io.execute_many(
             lock=self.lock,
+            conn=self.conn,
+            query=query,
+            rows=rows or [],
+            database=self.database,
+            batch_size=batchSize)
+
+    def load(
+        self,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        table: str,
+        chunksize: int = None,
+        if_exists: str = 'append',
+    ):
+        '''
+        writes a dataframe to the table. given a chunksize, or an iterator of
+        dataframes, it's written a chunk at a time instead of all at once
+        through to_sql, and the number of rows is returned.
+        '''
+        if chunksize is None and isinstance(data, pd.DataFrame) and if_exists == 'append':
+            return sql_io.write(
+                lock=self.lock,
+                conn=self.conn,
+                data=data,
+                table=table,
+                database=self.database,
+                index_col=self.index_col)
+        return sql_io.load_chunks(
+            lock=self.lock,
+            conn=self.conn,
             data=data,
             table=table,
             database=self.database,
+            chunksize=chunksize or 10000,
+            if_exists=if_exists,
             index_col=self.index_col)
 
     def update(self, where: str, table: str, columns: list, values: list):
         return sql_io.update(
             lock=self.lock,
+            conn=self.conn,
             where=where, table=table,
             columns=columns, values=values,
             database=self.database)
@@ -137,6 +298,7 @@ class Sqlite:
     def delete(self, where: str, table: str):
         return sql_io.delete(
             lock=self.lock,
+            conn=self.conn,
             where=where,
             table=table,
             database=self.database)
@@ -144,5 +306,6 @@ class Sqlite:
     def drop(self, table: str):
         return sql_io.drop(
             lock=self.lock,
+            conn=self.conn,
             table=table,
             database=self.database)
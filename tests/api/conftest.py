@@ -0,0 +1,68 @@
+'''
+factories for the stream histories the disk tests write: timestamps as the
+disk keeps them, frames of values on those timestamps, and caches, disks and
+streams written in a folder.
+'''
+from typing import Union
+import numpy as np
+import pandas as pd
+import pytest
+from satorilib.api.disk import Cache, Disk
+from satorilib.api.hash import historyHashes
+from satorilib.concepts import StreamId
+
+
+@pytest.fixture
+def times():
+    def make(count: int, start: str = '2020-01-01', freq: str = 's', jitter: int = 0) -> list[str]:
+        ''' jitter - microseconds added per row, so rows aren't evenly spaced '''
+        index = pd.date_range(start, periods=count, freq=freq)
+        if jitter:
+            index = index + pd.to_timedelta(np.arange(count) * jitter, unit='us')
+        return index.strftime('%Y-%m-%d %H:%M:%S.%f').tolist()
+    return make
+
+
+@pytest.fixture
+def makeFrame(times):
+    def make(values: Union[int, list], hashed: bool = True, **kwargs) -> pd.DataFrame:
+        ''' values, or a count of rows valued 0.0 up, on times(**kwargs) '''
+        if isinstance(values, int):
+            values = [float(i) for i in range(values)]
+        df = pd.DataFrame({'value': values}, index=times(len(values), **kwargs))
+        return historyHashes(df) if hashed else df
+    return make
+
+
+@pytest.fixture
+def makeStreamId():
+    def make(stream: str = 'x') -> StreamId:
+        return StreamId(source='s', author='a', stream=stream, target='t')
+    return make
+
+
+@pytest.fixture
+def makeDisk(makeFrame, makeStreamId):
+    def make(loc: str, rows: int = 0, ext: str = 'csv', stream: str = 'x') -> Disk:
+        ''' a disk with rows written, if any '''
+        disk = Disk(id=makeStreamId(stream), loc=loc, ext=ext)
+        if rows:
+            disk.write(makeFrame(rows, hashed=False))
+        return disk
+    return make
+
+
+@pytest.fixture
+def makeCache(makeDisk):
+    def make(loc: str, rows: int = 0, ext: str = 'csv', stream: str = 'x') -> Cache:
+        ''' a cache of a stream with rows written, if any, read from disk '''
+        return Cache(id=makeDisk(loc, rows, ext, stream).id, loc=loc, ext=ext)
+    return make
+
+
+@pytest.fixture
+def makeStreams(makeDisk):
+    def make(loc: str, count: int = 3, rows: int = 1000, ext: str = 'csv') -> list[StreamId]:
+        ''' streams x0, x1... each with rows written '''
+        return [makeDisk(loc, rows, ext, f'x{i}').id for i in range(count)]
+    return make
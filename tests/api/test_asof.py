@@ -0,0 +1,78 @@
+from functools import reduce
+import numpy as np
+import pandas as pd
+from satorilib.api.asof import asOfMerge, AsOfJoin, InsertBuffer
+from satorilib.api.memory import Memory
+
+rng = np.random.default_rng(0)
+
+
+def pairwise(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    return reduce(
+        lambda left, right:
+            pd.merge_asof(left, right, left_index=True, right_index=True),
+        dfs)
+
+
+def makeStreams() -> list[pd.DataFrame]:
+    def stream(column: str, start: str, freq: str, rows: int) -> pd.DataFrame:
+        return pd.DataFrame(
+            {column: np.round(rng.random(rows), 4)},
+            index=pd.date_range(start, periods=rows, freq=freq, tz='UTC'))
+    return [
+        stream('a', '2023-01-01 00:10', '7T', 40),
+        stream('target', '2023-01-01', '5T', 50),
+        stream('b', '2023-01-01 00:03', '11T', 30)]
+
+
+def test_mergeMatchesPairwiseMergeAsof():
+    a, target, b = makeStreams()
+    merged = asOfMerge([a, target.iloc[::-1], b], 'target')
+    pd.testing.assert_frame_equal(merged, pairwise([target, a, b]), check_freq=False)
+
+
+def test_observeMatchesFullMerge():
+    a, target, b = makeStreams()
+    join = AsOfJoin([a.iloc[:20], target.iloc[:30], b], 'target')
+    join.observe(target.iloc[30:])
+    join.observe(a.iloc[20:])
+    # a feature arriving late and a target row out of order
+    late = pd.DataFrame({'b': [0.5]}, index=pd.DatetimeIndex(['2023-01-01 01:00:30'], tz='UTC'))
+    early = pd.DataFrame({'target': [0.25]}, index=pd.DatetimeIndex(['2023-01-01 00:12:00'], tz='UTC'))
+    join.observe(late)
+    join.observe(early)
+    expected = asOfMerge([a, pd.concat([target, early]), pd.concat([b, late])], 'target')
+    pd.testing.assert_frame_equal(join.frame(), expected.astype(float), check_freq=False)
+
+
+def test_insertBufferMatchesAppendAndFill():
+    columns = pd.MultiIndex.from_tuples([('s', 'a', x, 't') for x in 'xyz'])
+    index = pd.date_range('2023-01-01', periods=20, freq='10T')
+    observed = pd.DataFrame(np.round(rng.random((20, 3)), 3), index=index, columns=columns)
+    observed.iloc[:3, 2] = np.nan
+    # gaps observed later inserts fill
+    observed.iloc[8:14, 0] = np.nan
+    observed.iloc[5:7, 1] = np.nan
+    rows = InsertBuffer.fromFrame(observed)
+    for i in range(100):
+        at = index[0] + pd.Timedelta(minutes=int(rng.integers(-30, 300)))
+        some = columns[sorted(rng.choice(3, int(rng.integers(1, 3)), replace=False))]
+        incremental = pd.DataFrame([rng.random(len(some))], index=[at], columns=some)
+        if at in observed.index:
+            observed.loc[incremental.index, some] = incremental
+        else:
+            observed = pd.concat([observed, incremental]).sort_index()
+        pd.testing.assert_frame_equal(
+            rows.insert(incremental), observed.fillna(method='ffill'), check_freq=False)
+
+
+def test_insertFillsTheGapAfterIt():
+    index = pd.date_range('2023-01-01', periods=3, freq='10T')
+    df = pd.DataFrame({'a': [1, np.nan, np.nan], 'b': [1.0, 2.0, 3.0]}, index=index)
+    incremental = pd.DataFrame({'a': [5.0]}, index=[index[0] + pd.Timedelta(minutes=5)])
+    inserted = Memory.appendInsert(df, incremental)
+    assert inserted['a'].tolist() == [1.0, 5.0, 5.0, 5.0]
+    pd.testing.assert_frame_equal(
+        inserted,
+        pd.concat([df, incremental]).sort_index().fillna(method='ffill'),
+        check_freq=False)
@@ -0,0 +1,90 @@
+import os
+import functools
+import numpy as np
+import pandas as pd
+import pytest
+from satorilib.api.hash import verifyHashes
+from satorilib.api.disk.filetypes import BinaryManager, CSVManager, convertCsvFolders
+
+
+@pytest.fixture
+def makeFrame(makeFrame):
+    ''' rows 1.1s and some microseconds apart, across a leap day by default '''
+    return functools.partial(makeFrame, start='2024-02-28 23:59:58', freq='1100ms', jitter=37)
+
+
+def test_timesRoundTrip():
+    strings = [
+        '1000-01-01 00:00:00.000000', '1969-12-31 23:59:59.999999',
+        '1970-01-01 00:00:00.000001', '2000-02-29 12:34:56.789012',
+        '2024-12-31 23:59:59.000000', '9999-12-31 23:59:59.999999']
+    times = BinaryManager.stringsToTimes(strings)
+    assert BinaryManager.timesToStrings(times) == strings
+
+
+def test_writeReadAppend(tmp_path, makeFrame):
+    path = str(tmp_path / 'aggregate.bin')
+    manager = BinaryManager()
+    df = makeFrame([1.5, 2.25, 3.0, 4.125])
+    df.iloc[2, 1] = np.nan
+    assert manager.write(path, df.copy())
+    assert os.path.getsize(path) == 16 + 24 * 4
+    read = manager.read(path)
+    assert read.index.tolist() == df.index.tolist()
+    assert read['value'].tolist() == df['value'].tolist()
+    assert read['hash'].tolist()[:2] == df['hash'].tolist()[:2]
+    assert pd.isna(read['hash'].iloc[2])
+    assert manager.readLines(path, 1, 3).index.tolist() == df.index[1:3].tolist()
+    assert manager.readLines(path, -2).index.tolist() == df.index[-2:-1].tolist()
+    # out of order and duplicate rows are sorted and deduped on read
+    later = makeFrame([9.0], start='2030-01-01 00:00:00')
+    assert manager.append(path, later.copy())
+    assert manager.append(path, df.iloc[[0]].assign(value=7.0))
+    read = manager.read(path)
+    assert read.shape[0] == 5 and read['value'].iloc[0] == 7.0
+    assert read.index[-1] == later.index[0]
+
+
+def test_integerValuesKeepTheirHashes(tmp_path, makeFrame):
+    path = str(tmp_path / 'aggregate.bin')
+    manager = BinaryManager()
+    df = makeFrame([1, 2, 3])
+    assert manager.write(path, df.copy())
+    assert verifyHashes(manager.read(path)) == (True, None)
+    assert manager.append(path, makeFrame([4.5], start='2030-01-01'))
+    assert manager.read(path)['value'].dtype == np.float64
+
+
+def test_refusesWhatItCannotRoundTrip(tmp_path):
+    path = str(tmp_path / 'aggregate.bin')
+    manager = BinaryManager()
+    assert not manager.write(path, pd.DataFrame(
+        {'value': ['a'], 'hash': ['']}, index=['2024-01-01 00:00:00.000000']))
+    assert not manager.write(path, pd.DataFrame(
+        {'value': [1.0], 'hash': ['']}, index=['2024-01-01 00:00:00']))
+
+
+def test_convertCsvFolders(tmp_path, makeFrame):
+    folder = tmp_path / 'stream'
+    folder.mkdir()
+    df = makeFrame([0.1, 0.2, 0.3])
+    CSVManager().write(str(folder / 'aggregate.csv'), df)
+    assert convertCsvFolders(str(tmp_path), remove=True) == {'stream': True}
+    assert not (folder / 'aggregate.csv').exists()
+    read = BinaryManager().read(str(folder / 'aggregate.bin'))
+    assert verifyHashes(read) == (True, None)
+
+
+def test_viewIsZeroCopy(tmp_path, makeFrame, makeDisk):
+    from satorilib.api.disk import Disk
+    disk = makeDisk(str(tmp_path), ext='bin')
+    df = makeFrame([1.5, 2.25, 3.0, 4.125])
+    assert disk.manager.write(disk.path(), df.copy())
+    view = disk.view()
+    assert len(view) == 4 and view.ordered
+    assert not view.values.flags.owndata
+    assert view.values.tolist() == df['value'].tolist()
+    assert view.timestamps() == df.index.tolist()
+    assert view.between(df.index[1], df.index[3]).timestamps() == df.index[1:3].tolist()
+    assert view.frame()['hash'].tolist() == df['hash'].tolist()
+    assert Disk(id=disk.id, loc=str(tmp_path)).view() is None
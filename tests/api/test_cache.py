@@ -0,0 +1,83 @@
+import pandas as pd
+from satorilib.api.disk import Cache
+from satorilib.api.hash import verifyHashes
+
+
+def test_appendByAttributesMatchesDisk(tmp_path, times, makeCache):
+    cache = makeCache(str(tmp_path))
+    for i, time in enumerate(times(50)):
+        result = cache.appendByAttributes(value=str(i), timestamp=time, hashThis=True)
+        assert result.success and result.validated in (True, None)
+        cache.modifyBasedValidation(result.validated, result.validatedFrame)
+    assert cache.appendByAttributes(value='9', timestamp=times(1)[0]).success is False
+    onDisk = makeCache(str(tmp_path)).df
+    assert onDisk.index.tolist() == cache.df.index.tolist()
+    assert verifyHashes(onDisk) == (True, None)
+    assert cache.getRowCounts() == 50
+    assert cache.getLatestObservationTime() == times(50)[-1]
+
+
+def test_tailValidationFindsBadRow(tmp_path, times, makeCache):
+    cache = makeCache(str(tmp_path))
+    stamps = times(10)
+    for i, time in enumerate(stamps[:5]):
+        result = cache.appendByAttributes(value=str(i), timestamp=time, hashThis=True)
+        cache.modifyBasedValidation(result.validated, result.validatedFrame)
+    result = cache.appendByAttributes(value='5', timestamp=stamps[5], observationHash='bad')
+    assert result.validated is False and result.validatedFrame is None
+    cache.modifyBasedValidation(result.validated, result.validatedFrame)
+    success, lastGood = cache.performValidation()
+    assert success is False and lastGood.index[-1] == stamps[4]
+
+
+def test_appendWritesOnlyNewRows(tmp_path, times, makeCache):
+    cache = makeCache(str(tmp_path))
+    stamps = times(6)
+    cache.write(pd.DataFrame({'value': [1.0, 2.0, 3.0]}, index=stamps[:3]))
+    df = cache.hashDataFrame(
+        pd.DataFrame({'value': [1.0, 2.0, 3.0, 4.0, 5.0]}, index=stamps[:5]))
+    assert cache.append(df)
+    with open(cache.path()) as f:
+        assert len(f.read().splitlines()) == 5
+    assert cache.df.index.tolist() == stamps[:5]
+    assert verifyHashes(makeCache(str(tmp_path)).df) == (True, None)
+
+
+def test_lookupsByTime(tmp_path, times, makeStreamId):
+    stamps = times(5)
+    cache = Cache(
+        df=pd.DataFrame(
+            {'value': [0.0, 1.0, 2.0, 3.0, 4.0], 'hash': list('abcde')},
+            index=[stamps[i] for i in [3, 0, 4, 1, 2]]),
+        id=makeStreamId(),
+        loc=str(tmp_path))
+    assert cache.df.index.tolist() == stamps
+    assert cache.getHashBefore(stamps[2]) == 'd'
+    assert cache.getHashBefore(stamps[0]) == ''
+    assert cache.getObservationBefore(stamps[2]).index.tolist() == [stamps[1]]
+    assert cache.getObservationAfter(stamps[2]).index.tolist() == [stamps[3]]
+    assert cache.getObservationAfter(stamps[4]).empty
+    assert cache.timeExistsInAggregate(stamps[2].split('.')[0])
+    assert not cache.timeExistsInAggregate('2020-01-01 00:00:00.500000')
+    assert cache.search(stamps[1], after=True).shape[0] == 3
+    cache.removeItAndAfter(stamps[3])
+    assert cache.getLatestObservationTime() == stamps[2]
+    assert cache.getHashBefore('2030-01-01 00:00:00.000000') == 'e'
+
+
+def test_nativeTimesKeepTheHashChain(tmp_path, times, makeStreamId):
+    stamps = times(20)
+    streamId = makeStreamId()
+    plain = Cache(id=streamId, loc=str(tmp_path / 'plain'))
+    native = Cache(id=streamId, loc=str(tmp_path / 'native'), native=True)
+    for i, time in enumerate(stamps):
+        plain.appendByAttributes(value=str(i), timestamp=time, hashThis=True)
+        native.appendByAttributes(value=str(i), timestamp=pd.Timestamp(time, tz='UTC'), hashThis=True)
+    with open(plain.path()) as f, open(native.path()) as g:
+        assert f.read() == g.read()
+    frame = native.cache
+    assert isinstance(frame.index, pd.DatetimeIndex)
+    assert frame.index.tolist() == pd.to_datetime(stamps).tolist()
+    assert native.getLatestObservationTime() == pd.Timestamp(stamps[-1])
+    assert native.search(pd.Timestamp(stamps[5]), before=True).shape[0] == 5
+    assert native.getHashBefore(pd.Timestamp(stamps[5])) == plain.getHashBefore(stamps[5])
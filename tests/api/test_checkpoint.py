@@ -0,0 +1,42 @@
+from satorilib.api.disk import Cache
+from satorilib.api.disk.checkpoint import Checkpoints
+
+
+def test_resumesFromCheckpoint(tmp_path, monkeypatch, makeCache):
+    monkeypatch.setattr(Checkpoints, 'interval', 100)
+    cache = makeCache(str(tmp_path), rows=1050)
+    assert cache.performValidation() == (True, None)
+    assert cache.checkpoints.last().row == 999
+    restarted = Cache(id=cache.id, loc=str(tmp_path))
+    assert restarted.checkpoints.trusted(restarted.df).row == 999
+    assert restarted.performValidation() == (True, None)
+
+
+def test_tamperingFallsBackToFullVerification(tmp_path, monkeypatch, makeCache):
+    monkeypatch.setattr(Checkpoints, 'interval', 100)
+    cache = makeCache(str(tmp_path), rows=1050)
+    cache.performValidation()
+    with open(cache.path(), mode='r') as f:
+        lines = f.read().split('\n')
+    time, _, rowHash = lines[5].split(',')
+    lines[5] = ','.join([time, '9.9', rowHash])
+    with open(cache.path(), mode='w') as f:
+        f.write('\n'.join(lines))
+    restarted = Cache(id=cache.id, loc=str(tmp_path))
+    assert restarted.checkpoints.trusted(restarted.df) is None
+    success, lastGood = restarted.performValidation()
+    assert not success and lastGood.index[0] == lines[4].split(',')[0]
+
+
+def test_truncationFallsBackToFullVerification(tmp_path, monkeypatch, makeCache):
+    monkeypatch.setattr(Checkpoints, 'interval', 100)
+    cache = makeCache(str(tmp_path), rows=1050)
+    cache.performValidation()
+    with open(cache.path(), mode='r') as f:
+        lines = f.read().split('\n')
+    with open(cache.path(), mode='w') as f:
+        f.write('\n'.join(lines[:500]) + '\n')
+    restarted = Cache(id=cache.id, loc=str(tmp_path))
+    assert restarted.checkpoints.trusted(restarted.df) is None
+    assert restarted.performValidation() == (True, None)
+    assert restarted.checkpoints.last().row == 499
@@ -0,0 +1,60 @@
+import random
+import pandas as pd
+from satorilib.api.hash import (
+    hashIt, historyHashes, verifyRoot, verifyHashes, verifyHashesReturnError,
+    verifyHashesReturnLastGood, cleanHashes)
+
+
+def iterrowsHistoryHashes(df: pd.DataFrame, priorRowHash: str = '') -> list[str]:
+    ''' the original row by row implementation, kept as the reference '''
+    rowHashes = []
+    for index, row in df.iterrows():
+        priorRowHash = hashIt(priorRowHash + str(index) + str(row['value']))
+        rowHashes.append(priorRowHash)
+    return rowHashes
+
+
+def makeFrame(rows: int = 50, values: list = None) -> pd.DataFrame:
+    index = [
+        f'2024-01-01 00:{i // 60:02d}:{i % 60:02d}.{random.randint(0, 999999):06d}'
+        for i in range(rows)]
+    return pd.DataFrame(
+        {'value': values or [round(random.random() * 100, 4) for _ in range(rows)]},
+        index=index)
+
+
+def test_historyHashes():
+    for df in [
+        makeFrame(),
+        makeFrame(values=[random.randint(0, 9) for _ in range(50)]),
+        makeFrame(values=[str(random.random()) for _ in range(50)]),
+        pd.DataFrame({'value': [1, 2, 3], 'other': [0.5, 0.5, 0.5]}),
+    ]:
+        expected = iterrowsHistoryHashes(df)
+        assert historyHashes(df.copy())['hash'].tolist() == expected
+        assert historyHashes(df.copy(), priorRowHash='abc')['hash'].tolist() == (
+            iterrowsHistoryHashes(df, priorRowHash='abc'))
+
+
+def test_verifyHashes():
+    df = historyHashes(makeFrame())
+    assert verifyRoot(df)
+    assert verifyHashes(df) == (True, None)
+    assert verifyHashesReturnError(df) == (True, None)
+    success, lastGood = verifyHashesReturnLastGood(df)
+    assert success and lastGood.name == df.index[-1]
+    assert cleanHashes(df) == (True, None)
+    broken = df.copy()
+    broken.iloc[10, broken.columns.get_loc('value')] = -1
+    success, priorRow = verifyHashes(broken)
+    assert not success and priorRow.index[0] == df.index[9]
+    success, errorRow = verifyHashesReturnError(broken)
+    assert not success and errorRow.index[0] == df.index[10]
+    success, lastGood = verifyHashesReturnLastGood(broken)
+    assert not success and lastGood.index[0] == df.index[9]
+    success, cleaned = cleanHashes(broken)
+    assert success and cleaned.index.tolist() == df.index[:10].tolist()
+    broken.iloc[0, broken.columns.get_loc('value')] = -1
+    assert not verifyRoot(broken)
+    assert verifyHashes(broken) == (False, None)
+    assert verifyHashesReturnLastGood(broken) == (False, None)
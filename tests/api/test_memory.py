@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+from satorilib.api.memory import Memory
+
+
+def test_dropDuplicatesKeepsChangesAndLeavesInputAlone():
+    columns = pd.MultiIndex.from_tuples([('s', 'a', 'x', 't')])
+    df = pd.DataFrame([1.0, 1.0, 2.0, np.nan, np.nan, 2.0, 2.0, 1.0], columns=columns)
+    deduped = Memory.dropDuplicates(df)
+    assert deduped.index.tolist() == [0, 2, 3, 4, 5, 7]
+    assert df.columns.equals(columns) and len(df) == 8
+    kept = []
+    last = None
+    for i in range(len(df)):
+        observation = Memory.dropDuplicatesAfter(df.iloc[i:i + 1], last)
+        if not observation.empty:
+            kept.append(observation)
+            last = observation.iloc[-1, 0]
+    pd.testing.assert_frame_equal(pd.concat(kept), deduped)
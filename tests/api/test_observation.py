@@ -0,0 +1,29 @@
+import json
+import numpy as np
+import pandas as pd
+from satorilib.concepts import Observation, LazyObservation, StreamId
+
+topic = json.dumps({'source': 'satori', 'author': 'pubkey', 'stream': 'WeatherBerlin', 'target': 'temperature'})
+
+
+def message(value, time: str = '2024-04-13 17:53:00.661619') -> str:
+    return json.dumps({'topic': topic, 'time': time, 'data': value, 'hash': 'abc'})
+
+
+def test_lazyDecodeMatchesParse():
+    parsed = Observation.parse(message(4.2))
+    decoded = Observation.parse(message(4.2), lazy=True)
+    assert isinstance(decoded, LazyObservation) and decoded._df is None
+    for name in ('topic', 'streamId', 'observationTime', 'observationHash', 'value', 'target'):
+        assert getattr(decoded, name) == getattr(parsed, name)
+    pd.testing.assert_frame_equal(decoded.df, parsed.df)
+    assert decoded.streamId is Observation.decode(message(5)).streamId
+    assert decoded.key == StreamId.fromTopic(topic)
+
+
+def test_decodeManyIsColumnar():
+    columns = Observation.decodeMany([message(i, f'2024-04-13 17:53:0{i}') for i in range(3)])
+    assert columns['value'].dtype == np.float64 and columns['value'].tolist() == [0, 1, 2]
+    assert columns['observationTime'].tolist() == [f'2024-04-13 17:53:0{i}' for i in range(3)]
+    assert set(columns['streamId']) == {StreamId.fromTopic(topic)}
+    assert Observation.decodeMany([message('a'), message(1)])['value'].tolist() == ['a', 1]
@@ -0,0 +1,59 @@
+from satorilib.api.disk import Cache, CacheRegistry
+
+
+def test_sharesCachesAndEvictsLeastRecentlyUsed(tmp_path, makeStreams):
+    streamIds = makeStreams(str(tmp_path))
+    registry = CacheRegistry(loc=str(tmp_path))
+    first = registry.get(streamIds[0])
+    assert registry.get(streamIds[0]) is first and not first.loaded
+    assert first.getRowCounts() == 1000 and first.loaded
+    oneStream = first.nbytes()
+    registry.budget = int(oneStream * 2.5)
+    for streamId in streamIds[1:]:
+        registry.get(streamId).getRowCounts()
+    assert not first.loaded
+    assert [registry.caches[(s, str(tmp_path), "csv")].loaded for s in streamIds] == [False, True, True]
+    assert registry.get(streamIds[1]).getLatestObservationTime() is not None
+    assert first.getHashBefore('2030-01-01') != ''
+    assert [registry.caches[(s, str(tmp_path), "csv")].loaded for s in streamIds] == [True, True, False]
+    stats = registry.stats
+    assert (stats['misses'], stats['evictions'], stats['hits']) == (4, 2, 1)
+    assert stats['bytes'] <= registry.budget
+
+
+def test_gatherSeesRowsAppendedElsewhere(tmp_path, makeStreams):
+    from satorilib.api.disk import registry
+    registry.CacheRegistry.shared = CacheRegistry()
+    try:
+        for ext in ('csv', 'db'):
+            loc = str(tmp_path / ext)
+            target, other = makeStreams(loc, count=2, rows=5, ext=ext)
+            cache = Cache(id=target, loc=loc, ext=ext)
+            assert cache.gather(targetColumn=('s', 'a', 'x0', 't'), streamIds=[target, other]).iloc[-1].tolist() == [4.0, 4.0]
+            # another writer appends to the other stream after it's been read
+            Cache(id=other, loc=loc, ext=ext).appendByAttributes(value=104.0, timestamp='2020-01-01 00:00:04.500000')
+            cache.appendByAttributes(value=5.0, timestamp='2020-01-01 00:00:05.000000')
+            assert cache.gather(targetColumn=('s', 'a', 'x0', 't'), streamIds=[target, other]).iloc[-1].tolist() == [5.0, 104.0]
+            assert registry.CacheRegistry.shared.get(other, loc=loc, ext=ext).getRowCounts() == 6
+    finally:
+        registry.CacheRegistry.shared = None
+
+
+def test_cachesInUseAreNotUnloaded(tmp_path, monkeypatch, makeStreams):
+    target, other = makeStreams(str(tmp_path), count=2, rows=10)
+    registry = CacheRegistry(budget=1, loc=str(tmp_path))
+    cache = registry.get(target)
+    times = cache.df.index.tolist()
+    registry.get(other).getRowCounts()
+    path = cache.path
+
+    def enforcing(*args, **kwargs):
+        # another thread loading a stream, between the trim and the write
+        registry.enforce()
+        return path(*args, **kwargs)
+
+    monkeypatch.setattr(cache, 'path', enforcing)
+    cache.removeItAndAfter(times[6])
+    monkeypatch.undo()
+    assert not registry.get(other).loaded
+    assert Cache(id=target, loc=str(tmp_path)).df.index.tolist() == times[:6]
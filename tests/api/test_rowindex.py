@@ -0,0 +1,79 @@
+import os
+import pandas as pd
+from satorilib.api.disk import Disk, CSVManager
+from satorilib.api.disk.rowindex import RowIndex
+
+
+def test_lookupsSeekThroughIndex(tmp_path, monkeypatch, makeDisk):
+    monkeypatch.setattr(RowIndex, 'interval', 100)
+    disk = makeDisk(str(tmp_path), rows=1050)
+    df = disk.read()
+    stamps = df.index.tolist()
+    for row in [0, 1, 99, 100, 101, 555, 1000, 1049]:
+        assert disk.getHashOf(stamps[row]) == df['hash'].iloc[row]
+        after = disk.getObservationAfter(stamps[row])
+        assert (after is None) if row == 1049 else after.index[0] == stamps[row + 1]
+        before = disk.getObservationBefore(stamps[row])
+        assert (before is None) if row == 0 else before.index[0] == stamps[row - 1]
+    assert disk.rowIndex.rows == 1050 and len(disk.rowIndex.offsets) == 11
+    before, after, index = disk.searchCache(stamps[555])
+    assert (before, after, index) == (500, 800, stamps[500])
+
+
+def test_indexFollowsAppendsAndRewrites(tmp_path, monkeypatch, times, makeDisk):
+    monkeypatch.setattr(RowIndex, 'interval', 100)
+    disk = makeDisk(str(tmp_path), rows=1050)
+    disk.getHashOf(times(1)[0])
+    later = times(200, start='2021-01-01')
+    assert disk.append(pd.DataFrame({'value': [1.0] * 200}, index=later), hashThis=True)
+    assert disk.rowIndex.rows == 1250
+    assert disk.getObservationBefore(later[150]).index[0] == later[149]
+    assert disk.getHashOf(later[-1]) == disk.read()['hash'].iloc[-1]
+    Disk(id=disk.id, loc=disk.loc).write(
+        pd.DataFrame({'value': [2.0] * 300}, index=times(300, start='2019-06-01')))
+    assert disk.getObservationAfter(times(300, start='2019-06-01')[120]).index[0] == \
+        times(300, start='2019-06-01')[121]
+    assert disk.rowIndex.rows == 300
+
+
+def test_outOfOrderAppendFallsBackToFullRead(tmp_path, monkeypatch, times, makeDisk):
+    monkeypatch.setattr(RowIndex, 'interval', 100)
+    disk = makeDisk(str(tmp_path), rows=250)
+    stamps = times(250)
+    late = '2020-01-01 00:03:20.500000'
+    disk.append(pd.DataFrame({'value': [9.0], 'hash': ['x']}, index=[late]))
+    assert disk.getHashOf(late) == 'x'
+    assert disk.getObservationAfter(stamps[200]).index[0] == late
+
+
+def test_readLinesSeeksAndTails(tmp_path, monkeypatch, makeDisk):
+    monkeypatch.setattr(RowIndex, 'interval', 100)
+    disk = makeDisk(str(tmp_path), rows=1050)
+    df = disk.read()
+    for start, end in [(0, None), (99, 101), (100, 100), (555, 777), (1040, 2000)]:
+        lines = disk.manager.readLines(disk.path(), start, end)
+        expected = df.iloc[start:end if end is not None and end > start else start + 1]
+        assert lines.index.tolist() == expected.index.tolist()
+        assert lines['hash'].tolist() == expected['hash'].tolist()
+    assert disk.manager.readLines(disk.path(), -1).index.tolist() == df.index[-1:].tolist()
+    assert disk.manager.readLines(disk.path(), -5, -2).index.tolist() == df.index[-5:-2].tolist()
+    monkeypatch.setattr(type(disk.manager), 'tailBlockSize', 7)
+    assert disk.manager.readTail(disk.path(), rows=3).index.tolist() == df.index[-3:].tolist()
+    assert disk.manager.readTail(disk.path(), rows=5000).shape[0] == 1050
+
+
+def test_filesInOneFolderKeepTheirOwnIndex(tmp_path, monkeypatch, makeFrame):
+    monkeypatch.setattr(RowIndex, 'interval', 100)
+    manager = CSVManager()
+    frames = {
+        str(tmp_path / 'a.csv'): makeFrame(300),
+        str(tmp_path / 'b.csv'): makeFrame(500, start='2021-01-01')}
+    for path, df in frames.items():
+        manager.write(path, df)
+        assert manager.readLines(path, 250).index[0] == df.index[250]
+    assert sorted(os.listdir(tmp_path)) == ['a.csv', 'a.rowindex.csv', 'b.csv', 'b.rowindex.csv']
+    monkeypatch.setattr(RowIndex, 'indexes', {})
+    for path, df in frames.items():
+        index = RowIndex.of(path)
+        index.load()
+        assert index.rows == len(df) and index.times[-1] == df.index[-100]
@@ -0,0 +1,100 @@
+import os
+import threading
+from satorilib.api.disk import Cache, Disk, CSVManager, SqliteManager, migrateCsvFolders
+from satorilib.api.hash import verifyHashes
+
+
+def test_indexedQueries(tmp_path, makeFrame):
+    path = str(tmp_path / 'aggregate.db')
+    manager = SqliteManager()
+    df = makeFrame(10)
+    assert manager.write(path, df.copy())
+    assert manager.append(path, df.iloc[[3]].assign(value=7.0))
+    read = manager.read(path)
+    assert read.index.tolist() == df.index.tolist() and read['value'].iloc[3] == 7.0
+    assert manager.readLines(path, 2, 5).index.tolist() == df.index[2:5].tolist()
+    assert manager.readLines(path, -2).index.tolist() == df.index[-2:-1].tolist()
+    assert manager.before(path, df.index[5]).index.tolist() == [df.index[4]]
+    assert manager.after(path, df.index[5]).index.tolist() == [df.index[6]]
+    assert manager.rowOf(path, df.index[5])['hash'].iloc[0] == df['hash'].iloc[5]
+    assert manager.removeFrom(path, df.index[8]) and manager.rowCount(path) == 8
+    manager.remove(path)
+    assert not os.path.exists(path)
+
+
+def test_cacheOnSqliteMatchesCsv(tmp_path, times, makeFrame, makeStreamId):
+    streamId = makeStreamId()
+    df = makeFrame(50)
+    csv = Cache(id=streamId, loc=str(tmp_path / 'csv'))
+    csv.write(df.copy())
+    db = Cache(id=streamId, loc=str(tmp_path / 'db'), ext='db')
+    db.write(df.copy())
+    for i, time in enumerate(times(5, start='2024-02-01')):
+        for cache in (csv, db):
+            cache.appendByAttributes(value=str(i + 0.5), timestamp=time, hashThis=True)
+    time = df.index[20]
+    assert db.getHashBefore(time) == csv.getHashBefore(time)
+    disk = Disk(id=streamId, loc=str(tmp_path / 'db'), ext='db')
+    assert disk.getHashBefore(time) == csv.getHashBefore(time)
+    assert disk.getHashOf(time) == csv.getHashOf(time)
+    assert disk.getObservationAfter(time).equals(csv.getObservationAfter(time))
+    assert verifyHashes(disk.read()) == (True, None)
+    db.removeItAndAfter(df.index[40])
+    assert Disk(id=streamId, loc=str(tmp_path / 'db'), ext='db').read().index.tolist() == df.index[:40].tolist()
+
+
+def test_migrateCsvFolders(tmp_path, makeFrame):
+    folder = tmp_path / 'stream'
+    folder.mkdir()
+    df = makeFrame(20)
+    CSVManager().write(str(folder / 'aggregate.csv'), df)
+    assert migrateCsvFolders(str(tmp_path), remove=True) == {'stream': True}
+    assert not (folder / 'aggregate.csv').exists()
+    assert verifyHashes(SqliteManager().read(str(folder / 'aggregate.db'))) == (True, None)
+
+
+def test_poolsAreBounded(tmp_path, monkeypatch, makeFrame, makeCache):
+    monkeypatch.setattr(SqliteManager, 'maxPools', 2)
+    SqliteManager.close()
+    manager = SqliteManager()
+    paths = [str(tmp_path / f'{i}.db') for i in range(3)]
+    for path in paths:
+        assert manager.write(path, makeFrame(3))
+    assert list(SqliteManager.pools) == paths[1:]
+    assert manager.rowCount(paths[0]) == 3
+    assert list(SqliteManager.pools) == [paths[2], paths[0]]
+    cache = makeCache(str(tmp_path), ext='db')
+    cache.write(makeFrame(3))
+    assert cache.path() in SqliteManager.pools
+    cache.unload()
+    assert cache.path() not in SqliteManager.pools
+    assert len(cache.cache) == 3
+
+
+def test_retiringLeavesAnotherThreadsConnectionOpen(tmp_path, monkeypatch, makeFrame):
+    monkeypatch.setattr(SqliteManager, 'maxPools', 1)
+    SqliteManager.close()
+    manager = SqliteManager()
+    first, second = str(tmp_path / 'first.db'), str(tmp_path / 'second.db')
+    writing, retired, counted = threading.Event(), threading.Event(), []
+
+    def write():
+        conn = SqliteManager.connection(first)
+        with conn:
+            conn.executemany('insert into stream values (?, ?, ?)', manager.toRows(makeFrame(3)))
+            writing.set()
+            retired.wait(timeout=5)
+            conn.executemany('insert into stream values (?, ?, ?)', manager.toRows(makeFrame(2, start='2021-01-01')))
+        # asking for another connection closes this thread's retired one
+        counted.append(manager.rowCount(second))
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    assert writing.wait(timeout=5)
+    assert manager.write(second, makeFrame(4))
+    SqliteManager.close(first)
+    assert list(SqliteManager.pools) == [second] and len(SqliteManager.retired) == 1
+    retired.set()
+    thread.join(timeout=5)
+    assert counted == [4] and SqliteManager.retired == []
+    assert manager.rowCount(first) == 5
@@ -0,0 +1,36 @@
+import gc
+import copy
+import pickle
+from collections import OrderedDict
+from satorilib.concepts import StreamId
+
+
+def test_internedStreamIdsAreSharedAndCached():
+    streamId = StreamId(source='s', author='a', stream='x', target='t')
+    equal = StreamId(source='s', author='a', stream='x', target='t')
+    assert streamId == equal and hash(streamId) == hash(equal) and streamId is not equal
+    assert StreamId.intern(streamId) is streamId and StreamId.intern(equal) is streamId
+    assert StreamId.fromTopic(equal.topic()) is StreamId.fromTopic(streamId.topic())
+    assert streamId.generateHash is streamId.generateHash
+    assert streamId.idString == 'saxt' and streamId != streamId.new(target='u')
+    assert {streamId: 1}[equal] == 1
+    for copied in (pickle.loads(pickle.dumps(streamId)), copy.deepcopy(streamId)):
+        assert copied == streamId and copied._hash is None
+
+
+def test_topicsAreForgottenLeastRecentlySeenFirst(monkeypatch):
+    from satorilib.concepts import structs
+    monkeypatch.setattr(structs, 'maxTopics', 2)
+    monkeypatch.setattr(structs, 'topics', OrderedDict())
+    first, second, third = (
+        StreamId(source='s', author='a', stream=f'seen{i}', target='t').topic()
+        for i in range(3))
+    StreamId.fromTopic(first)
+    StreamId.fromTopic(second)
+    StreamId.fromTopic(first)
+    StreamId.fromTopic(third)
+    assert list(structs.topics) == [first, third]
+    gc.collect()
+    # nothing holds the forgotten one, so it isn't interned either
+    assert ('s', 'a', 'seen1', 't') not in structs.streamIds
+    assert ('s', 'a', 'seen0', 't') in structs.streamIds
@@ -0,0 +1,47 @@
+import random
+import datetime as dt
+import numpy as np
+from satorilib.api.time import timestampToDatetime, timestampsToDatetime64, isValidTimestamp
+
+
+def strptimeOf(time: str) -> dt.datetime:
+    return (dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S.%f') if '.' in time else dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S')).replace(tzinfo=dt.timezone.utc)
+
+
+def randomTimestamps(count: int, seed: int = 0) -> list[str]:
+    ''' mostly well formed, with some fields out of range and some mangled '''
+    rng = random.Random(seed)
+    made = []
+    for _ in range(count):
+        time = '{:04d}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}'.format(
+            rng.choice([rng.randint(1, 9999), 0, 1970, 2024]),
+            rng.randint(0, 13), rng.randint(0, 32),
+            rng.randint(0, 24), rng.randint(0, 60), rng.randint(0, 60))
+        if rng.random() < 0.7:
+            time += '.' + ''.join(rng.choice('0123456789') for _ in range(rng.randint(0, 7)))
+        if rng.random() < 0.2:
+            i = rng.randrange(len(time))
+            time = time[:i] + rng.choice(['', ' ', 'x', '1', '-', ':', '.', '٣', 'T']) + time[i + 1:]
+        made.append(time)
+    return made
+
+
+def outcomeOf(parse, time: str):
+    try:
+        return parse(time)
+    except ValueError:
+        return ValueError
+
+
+def test_parsersAgreeWithStrptime():
+    times = randomTimestamps(20000)
+    expected = [outcomeOf(strptimeOf, time) for time in times]
+    assert [outcomeOf(timestampToDatetime, time) for time in times] == expected
+    valid = [time for time, parsed in zip(times, expected) if parsed is not ValueError]
+    parsed = timestampsToDatetime64(valid)
+    assert parsed.tolist() == [
+        strptimeOf(time).replace(tzinfo=None) for time in valid]
+    assert [isValidTimestamp(time) for time in times] == [
+        18 < len(time) < 27 and parsed is not ValueError
+        for time, parsed in zip(times, expected)]
+    assert timestampsToDatetime64([]).dtype == np.dtype('datetime64[us]')
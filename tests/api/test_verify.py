@@ -0,0 +1,26 @@
+import pytest
+from satorilib.api.disk import Cache, Disk
+from satorilib.api.hash import verifyHashesReturnLastGood
+
+
+@pytest.mark.parametrize('ext', ['csv', 'bin', 'db'])
+def test_verifyStreamsMatchesVerifyingEach(tmp_path, ext, makeFrame, makeStreamId):
+    good, broken, missing = (
+        makeStreamId(stream) for stream in ('good', 'broken', 'missing'))
+    frames = {good: makeFrame(6), broken: makeFrame(6)}
+    frames[broken].iloc[3, frames[broken].columns.get_loc('hash')] = '0123456789abcdef'
+    for streamId, df in frames.items():
+        disk = Disk(id=streamId, loc=str(tmp_path), ext=ext)
+        disk.manager.write(filePath=disk.path(), data=df)
+    report = Cache.verifyStreams(
+        [good, broken, missing], workers=2, loc=str(tmp_path), ext=ext)
+    assert report.rows == 12 and report.workers == 2
+    for streamId, df in frames.items():
+        expected = verifyHashesReturnLastGood(
+            Disk(id=streamId, loc=str(tmp_path), ext=ext).read())
+        success, lastGood = report.results[streamId]
+        assert success == expected[0]
+        assert type(lastGood) is type(expected[1]) and lastGood.equals(expected[1])
+    assert report.failures == [broken]
+    assert report.missing == [missing]
+    assert report.results[missing] == (None, None)
@@ -0,0 +1,55 @@
+'''
+inserting one row incrementals into merged model inputs: appending to the
+dataframe, sorting and forward filling all of it, as Memory.appendInsert did,
+against holding an InsertBuffer. mostly in order, every tenth one earlier.
+
+usage: python appendInsert.py [rows]
+'''
+import sys
+import time
+import numpy as np
+import pandas as pd
+from satorilib.api.asof import InsertBuffer
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+inserts = 200
+columns = pd.MultiIndex.from_tuples([('s', 'a', f'x{i}', 't') for i in range(10)])
+
+
+def appendAndFill(df: pd.DataFrame, incremental: pd.DataFrame) -> pd.DataFrame:
+    df.index = pd.to_datetime(df.index)
+    incremental.index = pd.to_datetime(incremental.index)
+    if incremental.index.values[0] in df.index.values:
+        df.loc[incremental.index, list(incremental.columns)] = incremental
+    else:
+        df = pd.concat([df, incremental]).sort_index()
+    return df.fillna(method='ffill')
+
+
+def incrementals(start: pd.Timestamp) -> list[pd.DataFrame]:
+    made = []
+    for i in range(inserts):
+        at = start + pd.Timedelta(seconds=i * 60 + 30 if i % 10 else -i * 3600)
+        made.append(pd.DataFrame(
+            [np.random.rand(3)],
+            index=[at],
+            columns=columns[np.random.choice(10, 3, replace=False)]))
+    return made
+
+
+if __name__ == '__main__':
+    index = pd.date_range('2020-01-01', periods=rows, freq='min')
+    df = pd.DataFrame(np.random.rand(rows, 10), index=index, columns=columns)
+    made = incrementals(index[-1])
+    began = time.perf_counter()
+    old = df.copy()
+    for incremental in made:
+        old = appendAndFill(old, incremental.copy())
+    perOld = (time.perf_counter() - began) / inserts * 1000
+    buffer = InsertBuffer.fromFrame(df)
+    began = time.perf_counter()
+    for incremental in made:
+        new = buffer.insert(incremental)
+    perNew = (time.perf_counter() - began) / inserts * 1000
+    pd.testing.assert_frame_equal(old, new, check_freq=False)
+    print(f'{rows:,} rows  append, sort and fill {perOld:.3f} ms  InsertBuffer {perNew:.3f} ms per insert')
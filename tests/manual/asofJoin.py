@@ -0,0 +1,64 @@
+'''
+as-of join of 30 streams onto a target: pd.merge_asof reduced over the streams
+pairwise, asOfMerge aligning each stream to the target once, and AsOfJoin
+keeping the join and taking one new observation at a time.
+
+usage: python asofJoin.py [rows per stream] [streams]
+'''
+import sys
+import time
+from functools import reduce
+import numpy as np
+import pandas as pd
+from satorilib.api.asof import asOfMerge, AsOfJoin
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+streamCount = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+observations = 1000
+
+
+def makeStreams() -> list[pd.DataFrame]:
+    start = np.datetime64('2020-01-01', 'ns').astype(np.int64)
+    dfs = []
+    for i in range(streamCount):
+        times = start + np.cumsum(np.random.randint(1, 120, rows)) * 1_000_000_000
+        dfs.append(pd.DataFrame(
+            {f's{i}': np.random.rand(rows)},
+            index=pd.DatetimeIndex(times.view('datetime64[ns]'))))
+    return dfs
+
+
+def pairwise(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    return reduce(
+        lambda left, right:
+            pd.merge_asof(left, right, left_index=True, right_index=True),
+        dfs)
+
+
+def timed(name: str, f, *args):
+    began = time.perf_counter()
+    result = f(*args)
+    print(f'{name:>28}: {time.perf_counter() - began:8.3f} s')
+    return result
+
+
+if __name__ == '__main__':
+    dfs = makeStreams()
+    print(f'{streamCount} streams x {rows:,} rows')
+    old = timed('pairwise merge_asof', pairwise, dfs)
+    new = timed('asOfMerge', asOfMerge, dfs, 's0')
+    pd.testing.assert_frame_equal(old, new)
+    del old, new
+    held = [df.iloc[:-observations] for df in dfs]
+    join = timed('AsOfJoin build', AsOfJoin, held, 's0')
+    began = time.perf_counter()
+    for i in range(observations):
+        stream = i % streamCount
+        join.observe(dfs[stream].iloc[[-observations + i // streamCount]])
+    elapsed = time.perf_counter() - began
+    print(f'{"AsOfJoin.observe":>28}: {elapsed / observations * 1000:8.3f} ms per observation')
+    began = time.perf_counter()
+    for i in range(10):
+        asOfMerge(held, 's0')
+    elapsed = time.perf_counter() - began
+    print(f'{"asOfMerge rebuild":>28}: {elapsed / 10 * 1000:8.3f} ms per observation')
@@ -0,0 +1,30 @@
+''' load time and disk footprint of a 1M row stream, csv against binary '''
+import os
+import time
+import random
+import tempfile
+import pandas as pd
+from satorilib.api.hash import historyHashes
+from satorilib.api.disk.filetypes import CSVManager, BinaryManager
+
+rows = 1_000_000
+folder = tempfile.mkdtemp()
+index = pd.date_range('2020-01-01', periods=rows, freq='s').strftime(
+    '%Y-%m-%d %H:%M:%S.%f')
+df = historyHashes(pd.DataFrame(
+    {'value': [round(random.random() * 100, 4) for _ in range(rows)]},
+    index=index))
+
+for name, manager in [('csv', CSVManager()), ('bin', BinaryManager())]:
+    path = os.path.join(folder, f'aggregate.{name}')
+    manager.write(filePath=path, data=df.copy())
+    then = time.time()
+    loaded = manager.read(filePath=path)
+    seconds = time.time() - then
+    print(
+        f'{name}: {os.path.getsize(path) / 1024 / 1024:.1f} MB, '
+        f'read {seconds:.3f}s, {loaded.shape[0]} rows')
+
+then = time.time()
+mapped = BinaryManager().memmap(os.path.join(folder, 'aggregate.bin'))
+print(f'bin memmap columns: {time.time() - then:.4f}s', mapped['value'][-3:])
@@ -0,0 +1,42 @@
+''' per call latency of Cache lookups by time against boolean index masks '''
+import time
+import random
+import tempfile
+import numpy as np
+import pandas as pd
+from satorilib.api.disk import Cache
+from satorilib.concepts import StreamId
+
+
+def makeCache(rows: int) -> Cache:
+    index = pd.date_range('2020-01-01', periods=rows, freq='s').strftime(
+        '%Y-%m-%d %H:%M:%S.%f')
+    df = pd.DataFrame(
+        {'value': np.round(np.random.rand(rows), 4), 'hash': ['0' * 16] * rows},
+        index=index)
+    return Cache(
+        df=df,
+        id=StreamId(source='s', author='a', stream='x', target='t'),
+        loc=tempfile.mkdtemp())
+
+
+def latency(fn, times: list[str]) -> float:
+    ''' microseconds per call '''
+    then = time.perf_counter()
+    for t in times:
+        fn(t)
+    return (time.perf_counter() - then) / len(times) * 1e6
+
+
+for rows in [100_000, 5_000_000]:
+    cache = makeCache(rows)
+    df = cache.df
+    probes = [cache.rows.times[random.randrange(rows)] for _ in range(200)]
+    print(f'{rows:>10,} rows')
+    print(f'  getHashBefore         {latency(cache.getHashBefore, probes):>10,.1f} us')
+    print(f'  getObservationBefore  {latency(cache.getObservationBefore, probes):>10,.1f} us')
+    print(f'  getObservationAfter   {latency(cache.getObservationAfter, probes):>10,.1f} us')
+    print(f'  timeExistsInAggregate {latency(cache.timeExistsInAggregate, probes):>10,.1f} us')
+    print(f'  mask before           {latency(lambda t: df[df.index < t].iloc[[-1]], probes[:20]):>10,.1f} us')
+    print(f'  mask after            {latency(lambda t: df[df.index > t].iloc[[0]], probes[:20]):>10,.1f} us')
+    print(f'  in index              {latency(lambda t: t in df.index, probes):>10,.1f} us')
@@ -1,6 +1,10 @@
-''' turns out it's not faster to read in a single line from a csv file... '''
+'''
+turns out it's not faster to read in a single line from a csv file with
+skiprows... so CSVManager.readLines seeks through the row index instead.
+'''
 import pandas as pd
 import time
+from satorilib.api.disk.filetypes.csv import CSVManager
 
 # Generate a DataFrame with 1 million rows
 data = {'Column1': range(1, 10000001)}
@@ -32,3 +36,18 @@ x = pd.read_table(
 print(x.iloc[0:2])
 read_time = time.time() - start_time
 print(f"Time taken to read 1 line from CSV: {read_time} seconds")
+
+start_time = time.time()
+x = CSVManager().readLines(csv_file, 10000001-6, 10000001-4)
+read_time = time.time() - start_time
+print(f"Time taken to read 1 line with readLines, building the index: {read_time} seconds")
+
+start_time = time.time()
+x = CSVManager().readLines(csv_file, 5000000, 5000002)
+read_time = time.time() - start_time
+print(f"Time taken to read 1 line with readLines once indexed: {read_time} seconds")
+
+start_time = time.time()
+x = CSVManager().readTail(csv_file, rows=1)
+read_time = time.time() - start_time
+print(f"Time taken to read the last line from the end: {read_time} seconds")
@@ -0,0 +1,58 @@
+''' rows/sec of the hash chain functions against the original iterrows loops '''
+import sys
+import time
+import random
+import pandas as pd
+from satorilib.api.hash import hashIt, historyHashes, verifyHashes
+
+
+def iterrowsHistoryHashes(df: pd.DataFrame, priorRowHash: str = None) -> pd.DataFrame:
+    priorRowHash = priorRowHash or ''
+    rowHashes = []
+    for index, row in df.iterrows():
+        rowStr = priorRowHash + str(index) + str(row['value'])
+        rowHash = hashIt(rowStr)
+        rowHashes.append(rowHash)
+        priorRowHash = rowHash
+    df['hash'] = rowHashes
+    return df
+
+
+def iterrowsVerifyHashes(df: pd.DataFrame, priorRowHash: str = None):
+    priorRowHash = priorRowHash or ''
+    priorRow = None
+    for index, row in df.iterrows():
+        rowHash = hashIt(priorRowHash + str(index) + str(row['value']))
+        if rowHash != row['hash']:
+            return False, priorRow.to_frame().T if isinstance(priorRow, pd.Series) else None
+        priorRowHash = rowHash
+        priorRow = row
+    return True, None
+
+
+def makeFrame(rows: int) -> pd.DataFrame:
+    index = pd.date_range('2020-01-01', periods=rows, freq='s').strftime(
+        '%Y-%m-%d %H:%M:%S.%f')
+    return pd.DataFrame(
+        {'value': [round(random.random() * 100, 4) for _ in range(rows)]},
+        index=index)
+
+
+def rate(rows: int, fn) -> float:
+    then = time.time()
+    fn()
+    return rows / (time.time() - then)
+
+
+# the iterrows loops take minutes at 10M rows, cap them with a second argument
+sizes = [10_000, 1_000_000, 10_000_000]
+legacyLimit = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+for rows in sizes:
+    df = makeFrame(rows)
+    hashed = historyHashes(df.copy())
+    print(f'{rows:>10,} rows')
+    print(f'  historyHashes       {rate(rows, lambda: historyHashes(df.copy())):>12,.0f} rows/sec')
+    print(f'  verifyHashes        {rate(rows, lambda: verifyHashes(hashed)):>12,.0f} rows/sec')
+    if rows <= legacyLimit:
+        print(f'  iterrows history    {rate(rows, lambda: iterrowsHistoryHashes(df.copy())):>12,.0f} rows/sec')
+        print(f'  iterrows verify     {rate(rows, lambda: iterrowsVerifyHashes(hashed)):>12,.0f} rows/sec')
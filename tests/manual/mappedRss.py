@@ -0,0 +1,72 @@
+'''
+memory of 4 processes each loading the same 50 streams, as dataframes through
+Disk.read and as memory mapped views through Disk.view.
+
+rss counts shared file pages in every process that touches them, pss splits
+them between the processes sharing them, so pss is the one that adds up to
+what the host actually spends. usage: python mappedRss.py [rows per stream]
+'''
+import sys
+import tempfile
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+import psutil
+from satorilib.api.disk import Disk
+from satorilib.concepts import StreamId
+
+streamCount = 50
+processCount = 4
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+
+def streamIdOf(i: int) -> StreamId:
+    return StreamId(source='s', author='a', stream=f'x{i}', target='t')
+
+
+def makeStreams(loc: str):
+    index = pd.date_range('2020-01-01', periods=rows, freq='s').strftime(
+        '%Y-%m-%d %H:%M:%S.%f')
+    for i in range(streamCount):
+        disk = Disk(id=streamIdOf(i), loc=loc, ext='bin')
+        disk.manager.write(disk.path(), pd.DataFrame(
+            {'value': np.round(np.random.rand(rows), 4), 'hash': ['0123456789abcdef'] * rows},
+            index=index))
+
+
+def load(loc: str, mode: str, barrier, results):
+    held = []
+    total = 0.0
+    for i in range(streamCount):
+        disk = Disk(id=streamIdOf(i), loc=loc, ext='bin')
+        if mode == 'read':
+            df = disk.read()
+            total += df['value'].sum()
+            held.append(df)
+        else:
+            view = disk.view()
+            total += view.values.sum()
+            held.append(view)
+    barrier.wait()
+    info = psutil.Process().memory_full_info()
+    results.put((info.rss, getattr(info, 'pss', 0)))
+    barrier.wait()
+
+
+if __name__ == '__main__':
+    loc = tempfile.mkdtemp()
+    makeStreams(loc)
+    for mode in ['read', 'view']:
+        barrier = mp.Barrier(processCount)
+        results = mp.Queue()
+        processes = [
+            mp.Process(target=load, args=(loc, mode, barrier, results))
+            for _ in range(processCount)]
+        for process in processes:
+            process.start()
+        measured = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        rss = sum(r for r, _ in measured) / 1024 / 1024
+        pss = sum(p for _, p in measured) / 1024 / 1024
+        print(f'{mode:>5}: {processCount} processes x {streamCount} streams x {rows:,} rows  rss {rss:,.0f} MB  pss {pss:,.0f} MB')
@@ -0,0 +1,34 @@
+'''
+decoding pubsub messages: Observation.parse building a one row dataframe each,
+the lazy decode, and decodeMany for a batch, over a few hundred topics.
+
+usage: python observationDecode.py [messages] [topics]
+'''
+import sys
+import json
+import time
+from satorilib.concepts import Observation
+
+messages = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+topics = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+raws = [
+    json.dumps({
+        'topic': json.dumps({'source': 'satori', 'author': '02a85fb71485c6d7c62a3784c5549bd3849d0afa3ee44ce3f9ea5541e4c56402d8', 'stream': f'stream{i % topics}', 'target': 'close'}),
+        'time': '2024-04-13 17:53:00.661619',
+        'data': i / 7,
+        'hash': 'abcdef0123456789'})
+    for i in range(messages)]
+
+
+def rate(name: str, f):
+    began = time.perf_counter()
+    f()
+    elapsed = time.perf_counter() - began
+    print(f'{name:>18}: {elapsed / messages * 1e6:8.2f}us per message')
+
+
+if __name__ == '__main__':
+    rate('parse', lambda: [Observation.parse(raw) for raw in raws])
+    rate('parse lazy', lambda: [Observation.parse(raw, lazy=True) for raw in raws])
+    rate('parse lazy, df', lambda: [Observation.parse(raw, lazy=True).df for raw in raws])
+    rate('decodeMany', lambda: Observation.decodeMany(raws))
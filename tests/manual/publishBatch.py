@@ -0,0 +1,51 @@
+'''
+publishing hundreds of topics: the cost of building a frame, json.dumps as
+send does against the encoded topic prefix, and how many frames go out when
+every topic publishes faster than the throttle window, scaled down to seconds.
+
+usage: python publishBatch.py [topics]
+'''
+import sys
+import json
+import time
+import timeit
+from satorilib.pubsub.publisher import PublishBatcher
+
+topics = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+names = [
+    json.dumps({'source': 'satori', 'author': '02a85fb71485c6d7c62a3784c5549bd3849d0afa3ee44ce3f9ea5541e4c56402d8', 'stream': f'stream{i}', 'target': 'close'})
+    for i in range(topics)]
+
+
+def dumps():
+    for name in names:
+        'publish' + ':' + json.dumps({
+            'topic': name,
+            'data': str(1.2345),
+            'time': str('2024-04-13 17:53:00.661619'),
+            'hash': str('abcdef0123456789')})
+
+
+def frames(publisher: PublishBatcher):
+    for name in names:
+        publisher.frame(name, 1.2345, '2024-04-13 17:53:00.661619', 'abcdef0123456789')
+
+
+if __name__ == '__main__':
+    publisher = PublishBatcher(send=lambda frames: None)
+    for name, f in (('json.dumps', dumps), ('encoded prefix', lambda: frames(publisher))):
+        seconds = min(timeit.repeat(f, number=100, repeat=5)) / 100 / topics
+        print(f'{name:>16}: {seconds * 1e6:6.2f}us per frame')
+
+    # every topic publishes every 50ms for 3s with a 1s throttle window
+    sent = []
+    publisher = PublishBatcher(send=sent.extend, throttle=1, interval=0.1, batchSize=topics)
+    began = time.perf_counter()
+    publishes = 0
+    while time.perf_counter() - began < 3:
+        for name in names:
+            publisher.publish(name, time.perf_counter(), 'time', 'hash')
+            publishes += 1
+        time.sleep(0.05)
+    publisher.stop(flush=True)
+    print(f'{publishes:,} publishes, {len(sent):,} frames batched, {publisher.superseded:,} superseded')
@@ -0,0 +1,73 @@
+'''
+a slow router on the listener thread against the receive queue and router
+workers: how long until everything sent has been read off the socket, and
+until it's all been routed, when each message takes the router a while.
+
+usage: python pubsubRouting.py [messages] [router milliseconds] [topics]
+'''
+import sys
+import json
+import time
+import threading
+import websockets
+from satorilib.asynchronous import AsyncThread
+from satorilib.pubsub import SatoriPubSubConn
+
+messages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+routerTime = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.005
+topics = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+
+async def echo(ws, path=None):
+    async for message in ws:
+        await ws.send(message)
+
+
+def measure(url: str, name: str, **kwargs):
+    routed = threading.Event()
+    count = [0]
+    lock = threading.Lock()
+
+    def router(message: str):
+        time.sleep(routerTime)
+        if 'topic' not in message:
+            return
+        with lock:
+            count[0] += 1
+            if count[0] == messages:
+                routed.set()
+
+    conn = SatoriPubSubConn(uid=name.replace(' ', '-'), payload='payload', url=url, router=router, **kwargs)
+    while not (conn.ws and conn.ws.connected):
+        time.sleep(0.01)
+    began = time.perf_counter()
+    for n in range(messages):
+        conn.send(json.dumps({'topic': f't{n % topics}', 'data': n}))
+    # inline, a message is read once the one before it has been routed
+    while (conn.routerPool.received - 1 if conn.routerPool else count[0]) < messages:
+        time.sleep(0.001)
+    readIn = time.perf_counter() - began
+    routed.wait()
+    routedIn = time.perf_counter() - began
+    print(f'{name:>18}: read in {readIn:6.2f}s, routed in {routedIn:6.2f}s')
+    if conn.routerPool is not None:
+        metrics = conn.metrics()
+        print(
+            f'{"":>18}  router p50 {metrics["latency"]["p50"] * 1000:.1f}ms, '
+            f'wait p99 {metrics["wait"]["p99"] * 1000:.0f}ms')
+    conn.ws.close()
+
+
+if __name__ == '__main__':
+    server = AsyncThread()
+    while server.loop is None:
+        time.sleep(0.01)
+
+    async def serve():
+        return await websockets.serve(echo, '127.0.0.1', 0)
+
+    port = server.runAsync(task=serve).result().sockets[0].getsockname()[1]
+    url = f'ws://127.0.0.1:{port}'
+    measure(url, 'inline')
+    measure(url, '4 router workers', routerWorkers=4)
+    measure(url, '8 router workers', routerWorkers=8)
@@ -0,0 +1,99 @@
+'''
+messages routed per second through a local websocket echo server: the
+threaded SatoriPubSubConn, a thread per connection, against the asyncio
+SatoriPubSubAsyncConn, every connection on one event loop.
+
+usage: python pubsubThroughput.py [connections] [messages per connection]
+'''
+import sys
+import time
+import threading
+import websockets
+from satorilib.asynchronous import AsyncThread
+from satorilib.pubsub import SatoriPubSubConn, SatoriPubSubAsyncConn
+
+connections = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+messages = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+
+async def echo(ws, path=None):
+    async for message in ws:
+        await ws.send(message)
+
+
+class Counter:
+    def __init__(self, total: int):
+        self.total = total
+        self.count = 0
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def route(self, message: str):
+        with self.lock:
+            self.count += 1
+            if self.count == self.total:
+                self.done.set()
+
+
+def report(name: str, began: float, threads: int):
+    elapsed = time.perf_counter() - began
+    print(
+        f'{name:>7}: {connections * messages / elapsed:10,.0f} messages per second, '
+        f'{threads} threads')
+
+
+def threaded(url: str):
+    counter = Counter(connections * (messages + 1))
+    conns = [
+        SatoriPubSubConn(uid=str(i), payload='payload', url=url, router=counter.route)
+        for i in range(connections)]
+    while not all(conn.ws and conn.ws.connected for conn in conns):
+        time.sleep(0.01)
+    began = time.perf_counter()
+    for n in range(messages):
+        for conn in conns:
+            conn.send(f'{n}')
+    counter.done.wait()
+    report('threads', began, threading.active_count())
+    for conn in conns:
+        conn.ws.close()
+
+
+def asynchronous(url: str):
+    counter = Counter(connections * (messages + 1))
+
+    async def route(message: str):
+        counter.route(message)
+
+    asyncThread = AsyncThread()
+    conns = [
+        SatoriPubSubAsyncConn(uid=str(i), payload='payload', url=url, router=route, asyncThread=asyncThread)
+        for i in range(connections)]
+    while not all(conn.connected for conn in conns):
+        time.sleep(0.01)
+
+    async def sendAll():
+        for n in range(messages):
+            for conn in conns:
+                await conn.send(f'{n}')
+
+    began = time.perf_counter()
+    asyncThread.runAsync(task=sendAll).result()
+    counter.done.wait()
+    report('asyncio', began, threading.active_count())
+    for conn in conns:
+        conn.schedule(conn.disconnect()).result()
+
+
+if __name__ == '__main__':
+    server = AsyncThread()
+    while server.loop is None:
+        time.sleep(0.01)
+
+    async def serve():
+        return await websockets.serve(echo, '127.0.0.1', 0)
+
+    port = server.runAsync(task=serve).result().sockets[0].getsockname()[1]
+    url = f'ws://127.0.0.1:{port}'
+    asynchronous(url)
+    threaded(url)
@@ -0,0 +1,49 @@
+'''
+loading history into sqlite: a write per row, to_sql through load, and the
+batched writeMany and chunked load.
+
+usage: python sqliteBulk.py [rows]
+'''
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from satorilib.sqlite import Sqlite
+from satorilib.sqlite.sql_io import MockLock
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+create = 'create table history (ts text primary key, value real, hash text)'
+
+
+def rate(name: str, count: int, f):
+    began = time.perf_counter()
+    f()
+    elapsed = time.perf_counter() - began
+    print(f'{name:>28}: {count / elapsed:12,.0f} rows per second')
+
+
+if __name__ == '__main__':
+    folder = tempfile.mkdtemp()
+    df = pd.DataFrame({
+        'ts': pd.date_range('2020-01-01', periods=rows, freq='s').strftime('%Y-%m-%d %H:%M:%S.%f'),
+        'value': np.random.rand(rows),
+        'hash': ['0123456789abcdef'] * rows})
+    tuples = list(df.itertuples(index=False, name=None))
+    perRow = min(rows, 2000)
+    with Sqlite(database=os.path.join(folder, 'a.db'), initialize=create, lock=MockLock('db-lock')) as sql:
+        rate('write per row', perRow, lambda: [
+            sql.write('insert into history values (?, ?, ?)', params=row)
+            for row in tuples[:perRow]])
+    with Sqlite(database=os.path.join(folder, 'b.db'), lock=MockLock('db-lock')) as sql:
+        rate('load (to_sql)', rows, lambda: sql.load(data=df, table='history'))
+    for pooled in (False, True):
+        name = 'pooled ' if pooled else ''
+        with Sqlite(database=os.path.join(folder, f'c{pooled}.db'), initialize=create, lock=MockLock('db-lock'), pooled=pooled) as sql:
+            rate(f'{name}writeMany', rows, lambda: sql.writeMany(
+                table='history', columns=['ts', 'value', 'hash'], rows=iter(tuples)))
+            rate(f'{name}writeMany upsert', rows, lambda: sql.writeMany(
+                table='history', columns=['ts', 'value', 'hash'], rows=iter(tuples), conflict=['ts']))
+        with Sqlite(database=os.path.join(folder, f'd{pooled}.db'), lock=MockLock('db-lock'), pooled=pooled) as sql:
+            rate(f'{name}load chunked', rows, lambda: sql.load(data=df, table='history', chunksize=50_000))
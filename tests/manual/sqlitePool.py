@@ -0,0 +1,44 @@
+'''
+inserts and point reads per second through Sqlite, connecting for every
+query as it does by default, against pooled=True. without dask workers the
+default also probes for a dask lock every query, we pass the mock lock it
+falls back to so only the connections are compared.
+
+usage: python sqlitePool.py [operations]
+'''
+import os
+import sys
+import time
+import tempfile
+from satorilib.sqlite import Sqlite
+from satorilib.sqlite.sql_io import MockLock
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+create = 'create table wallet (id integer primary key, pubkey text, cpu integer)'
+
+
+def rate(name: str, f):
+    began = time.perf_counter()
+    for i in range(count):
+        f(i)
+    elapsed = time.perf_counter() - began
+    print(f'{name:>32}: {count / elapsed:10,.0f} per second')
+
+
+def run(name: str, sql: Sqlite):
+    with sql:
+        rate(f'{name} insert', lambda i: sql.write(
+            query='insert into wallet (id, pubkey, cpu) values (?, ?, ?)',
+            params=(i, f'key{i}', i)))
+        rate(f'{name} read', lambda i: sql.read(
+            query='select * from wallet where id=?', params=(i,)))
+        rate(f'{name} fetch', lambda i: sql.fetch(
+            query='select * from wallet where id=?', params=(i,)))
+
+
+if __name__ == '__main__':
+    folder = tempfile.mkdtemp()
+    run('per query', Sqlite(
+        database=os.path.join(folder, 'a.db'), initialize=create, lock=MockLock('db-lock')))
+    run('pooled', Sqlite(
+        database=os.path.join(folder, 'b.db'), initialize=create, pooled=True))
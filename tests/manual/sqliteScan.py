@@ -0,0 +1,63 @@
+'''
+scanning a big table: peak memory and time of reading it all into a dataframe
+against iterating it a chunk at a time and reading it into typed arrays. each
+read runs in a forked process so its peak resident memory is its own.
+
+usage: python sqliteScan.py [rows]
+'''
+import os
+import sys
+import time
+import resource
+import tempfile
+import multiprocessing
+import numpy as np
+from satorilib.sqlite import Sqlite
+from satorilib.sqlite.sql_io import MockLock
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+create = 'create table history (id integer primary key, value real, hash text)'
+query = 'select id, value from history'
+
+
+def scan(database: str, how: str) -> float:
+    with Sqlite(database=database, lock=MockLock('db-lock'), pooled=True) as sql:
+        if how == 'read':
+            return sql.read(query)['value'].sum()
+        if how == 'fetch':
+            return sum(value for _, value in sql.fetch(query))
+        if how == 'iterate':
+            return sum(df['value'].sum() for df in sql.iterate(query, chunksize=100_000))
+        if how == 'iterate rows':
+            return sum(
+                sum(value for _, value in chunk)
+                for chunk in sql.iterate(query, chunksize=100_000, frames=False))
+        if how == 'readNumpy':
+            return sql.readNumpy(query)['value'].sum()
+
+
+def measure(database: str, how: str, results):
+    began = time.perf_counter()
+    total = scan(database, how)
+    elapsed = time.perf_counter() - began
+    results.put((total, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+if __name__ == '__main__':
+    database = os.path.join(tempfile.mkdtemp(), 'scan.db')
+    with Sqlite(database=database, initialize=create, lock=MockLock('db-lock'), pooled=True) as sql:
+        sql.writeMany(
+            table='history',
+            columns=['id', 'value', 'hash'],
+            rows=((i, float(v), '0123456789abcdef') for i, v in enumerate(np.random.rand(rows))),
+            batchSize=100_000)
+    print(f'{rows:,} rows, {os.path.getsize(database) / 2**20:,.0f} MB on disk')
+    print(f'{"baseline":>14}: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:8,.0f} MB peak')
+    context = multiprocessing.get_context('fork')
+    for how in ('read', 'fetch', 'iterate', 'iterate rows', 'readNumpy'):
+        results = context.Queue()
+        process = context.Process(target=measure, args=(database, how, results))
+        process.start()
+        total, elapsed, peak = results.get()
+        process.join()
+        print(f'{how:>14}: {peak:8,.0f} MB peak {elapsed:8.2f}s (sum {total:,.1f})')
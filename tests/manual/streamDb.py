@@ -0,0 +1,41 @@
+'''
+lookups by time and trimming a stream's history, on csv against the sqlite
+backend (ext='db').
+
+usage: python streamDb.py [rows]
+'''
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from satorilib.api.disk import Disk, Cache
+from satorilib.api.hash import historyHashes
+from satorilib.concepts import StreamId
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+lookups = 200
+
+
+def timed(name: str, f, count: int = 1):
+    began = time.perf_counter()
+    for i in range(count):
+        f(i)
+    elapsed = time.perf_counter() - began
+    print(f'{name:>36}: {elapsed / count * 1000:10.3f} ms')
+
+
+if __name__ == '__main__':
+    streamId = StreamId(source='s', author='a', stream='x', target='t')
+    index = pd.date_range('2020-01-01', periods=rows, freq='s').strftime('%Y-%m-%d %H:%M:%S.%f')
+    df = historyHashes(pd.DataFrame({'value': np.round(np.random.rand(rows), 4)}, index=index))
+    times = index[np.random.randint(0, rows, lookups)]
+    for ext in ('csv', 'db'):
+        loc = tempfile.mkdtemp()
+        disk = Disk(id=streamId, loc=loc, ext=ext)
+        timed(f'{ext} write', lambda _: disk.manager.write(disk.path(), df.copy()))
+        timed(f'{ext} getHashBefore', lambda i: disk.getHashBefore(times[i]), 5)
+        timed(f'{ext} getObservationBefore', lambda i: disk.getObservationBefore(times[i]), lookups)
+        timed(f'{ext} readLines tail', lambda i: disk.read(start=-10, end=0), lookups)
+        cache = Cache(id=streamId, loc=loc, ext=ext)
+        timed(f'{ext} cache removeItAndAfter', lambda i: cache.removeItAndAfter(index[rows - 1000 * (i + 1)]), 5)
@@ -0,0 +1,27 @@
+'''
+the cost of using StreamIds as keys: hashing, equality, idString, the path id
+and looking one up in a dict of a few hundred, per call.
+
+usage: python streamIdHash.py
+'''
+import timeit
+from satorilib.concepts import StreamId
+
+author = '02a85fb71485c6d7c62a3784c5549bd3849d0afa3ee44ce3f9ea5541e4c56402d8'
+streamIds = [StreamId(source='satori', author=author, stream=f'stream{i}', target='close') for i in range(300)]
+lookup = {streamId: i for i, streamId in enumerate(streamIds)}
+streamId = streamIds[150]
+equal = StreamId(source='satori', author=author, stream='stream150', target='close')
+interned = StreamId.intern(streamId)
+
+if __name__ == '__main__':
+    for name, f in (
+        ('hash', lambda: hash(streamId)),
+        ('== equal', lambda: streamId == equal),
+        ('== same', lambda: streamId == interned),
+        ('idString', lambda: streamId.idString),
+        ('generateHash', lambda: streamId.generateHash),
+        ('dict lookup', lambda: lookup[streamId]),
+    ):
+        seconds = min(timeit.repeat(f, number=100000, repeat=5)) / 100000
+        print(f'{name:>14}: {seconds * 1e9:8.0f}ns')
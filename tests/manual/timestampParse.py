@@ -0,0 +1,39 @@
+'''
+parsing observation timestamps: strptime as timestampToDatetime did, the
+fixed layout parser it uses now, and the batch parser, against pandas.
+
+usage: python timestampParse.py [count]
+'''
+import sys
+import time
+import datetime as dt
+import numpy as np
+import pandas as pd
+from satorilib.api.time import timestampToDatetime, timestampsToDatetime64, isValidTimestamp
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+
+def strptimeOf(time: str) -> dt.datetime:
+    return (dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S.%f') if '.' in time else dt.datetime.strptime(time, '%Y-%m-%d %H:%M:%S')).replace(tzinfo=dt.timezone.utc)
+
+
+def timed(name: str, f, times: list[str]):
+    began = time.perf_counter()
+    f(times)
+    elapsed = time.perf_counter() - began
+    print(f'{name:>26}: {elapsed:7.3f} s  {elapsed / len(times) * 1e9:7.0f} ns each')
+
+
+if __name__ == '__main__':
+    times = (
+        pd.Timestamp('2020-01-01') +
+        pd.to_timedelta(np.random.randint(0, 10**15, count), unit='us')
+    ).strftime('%Y-%m-%d %H:%M:%S.%f').tolist()
+    print(f'{count:,} timestamps')
+    timed('strptime', lambda ts: [strptimeOf(t) for t in ts], times)
+    timed('timestampToDatetime', lambda ts: [timestampToDatetime(t) for t in ts], times)
+    timed('isValidTimestamp', lambda ts: [isValidTimestamp(t) for t in ts], times)
+    timed('timestampsToDatetime64', timestampsToDatetime64, times)
+    timed('pd.to_datetime', pd.to_datetime, times)
+    timed('numpy datetime64', lambda ts: np.array(ts, dtype='datetime64[us]'), times)
@@ -0,0 +1,24 @@
+import json
+from satorilib.pubsub.publisher import PublishBatcher
+
+
+def test_framesMatchSendAndOnlyTheLatestIsSent():
+    sent = []
+    publisher = PublishBatcher(send=sent.append, throttle=55, interval=60, batchSize=3)
+    topic = json.dumps({'source': 'satori', 'author': 'ü', 'stream': 's', 'target': 't'})
+    assert publisher.frame(topic, 1.5, '2024-01-01 00:00:00', 'abc') == 'publish:' + json.dumps({
+        'topic': topic, 'data': '1.5', 'time': '2024-01-01 00:00:00', 'hash': 'abc'})
+    for n in range(5):
+        publisher.publish('a', n, 'time', 'hash')
+        publisher.publish('b', n, 'time', 'hash')
+    # nothing is due until the interval, or batchSize topics are
+    assert sent == []
+    publisher.publish('c', 0, 'time', 'hash')
+    assert [json.loads(frame.split(':', 1)[1])['data'] for frame in sent[0]] == ['4', '4', '0']
+    assert publisher.superseded == 8
+    # within the throttle window they wait, and the latest goes out at the end
+    publisher.publish('a', 5, 'time', 'hash')
+    publisher.publish('a', 6, 'time', 'hash')
+    assert publisher.flush() == 0
+    publisher.stop(flush=True)
+    assert [json.loads(frame.split(':', 1)[1])['data'] for frame in sent[1]] == ['6']
@@ -0,0 +1,97 @@
+import json
+import time
+import asyncio
+import websockets
+from satorilib.asynchronous import AsyncThread
+from satorilib.pubsub import SatoriPubSubAsyncConn
+
+
+async def echo(ws, path=None):
+    async for message in ws:
+        await ws.send(message)
+
+
+def test_manyConnectionsOnOneLoop():
+    connections, messages = 20, 200
+
+    async def exercise():
+        server = await websockets.serve(echo, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        received = {i: [] for i in range(connections)}
+        done = asyncio.Event()
+
+        def router(i: int):
+            async def route(message: str):
+                received[i].append(message)
+                if sum(len(v) for v in received.values()) == connections * (messages + 1):
+                    done.set()
+            return route
+
+        conns = [
+            SatoriPubSubAsyncConn(
+                uid=str(i),
+                payload='payload',
+                url=f'ws://127.0.0.1:{port}',
+                router=router(i),
+                threaded=False)
+            for i in range(connections)]
+        tasks = [asyncio.create_task(conn.run()) for conn in conns]
+        while not all(conn.connected for conn in conns):
+            await asyncio.sleep(0.01)
+        for n in range(messages):
+            for i, conn in enumerate(conns):
+                await conn.send(f'{i}:{n}')
+        await asyncio.wait_for(done.wait(), timeout=30)
+        for conn in conns:
+            await conn.disconnect()
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+        server.close()
+        await server.wait_closed()
+        return received
+
+    received = asyncio.run(exercise())
+    for i, messages_ in received.items():
+        # the key command first, then everything in the order it was sent
+        assert messages_ == ['key:payload'] + [f'{i}:{n}' for n in range(messages)]
+
+
+def test_runsOnAsyncThreadWithPlainRouter():
+    asyncThread = AsyncThread()
+    received = []
+
+    async def serve():
+        return await websockets.serve(echo, '127.0.0.1', 0)
+
+    while asyncThread.loop is None:
+        time.sleep(0.01)
+    server = asyncThread.runAsync(task=serve).result(timeout=5)
+    conn = SatoriPubSubAsyncConn(
+        uid='a',
+        payload='payload',
+        url=f'ws://127.0.0.1:{server.sockets[0].getsockname()[1]}',
+        router=received.append,
+        asyncThread=asyncThread)
+    while not conn.connected:
+        time.sleep(0.01)
+    conn.schedule(conn.publish(topic='t', data=1, observationTime='now', observationHash='h')).result(timeout=5)
+    conn.schedule(conn.publish(topic='t', data=2, observationTime='now', observationHash='h')).result(timeout=5)
+    while len(received) < 2:
+        time.sleep(0.01)
+    conn.schedule(conn.disconnect()).result(timeout=5)
+    conn.future.result(timeout=5)
+    # the second publish to a topic within 55 seconds is skipped
+    assert received == ['key:payload', 'publish:' + json.dumps({
+        'topic': 't', 'data': '1', 'time': 'now', 'hash': 'h'})]
+
+
+def test_scheduleRightAfterStarting():
+    asyncThread = AsyncThread()
+    conn = SatoriPubSubAsyncConn(
+        uid='a',
+        payload='payload',
+        url='ws://127.0.0.1:9',
+        reconnectDelay=0.1,
+        asyncThread=asyncThread)
+    assert conn.schedule(asyncio.sleep(0, result='ran')).result(timeout=5) == 'ran'
+    conn.schedule(conn.disconnect()).result(timeout=5)
+    conn.future.result(timeout=5)
@@ -0,0 +1,63 @@
+import json
+import threading
+from satorilib.pubsub.receiver import RouterPool
+
+
+def message(topic: str, n: int) -> str:
+    return json.dumps({'topic': topic, 'data': n})
+
+
+def test_topicsKeepTheirOrderAcrossWorkers():
+    routed = []
+    lock = threading.Lock()
+
+    def router(m: str):
+        with lock:
+            routed.append(json.loads(m))
+
+    pool = RouterPool(router, workers=4, maxsize=8, policy='block')
+    for n in range(200):
+        for topic in 'abcde':
+            pool.put(message(topic, n))
+    pool.stop()
+    for topic in 'abcde':
+        assert [m['data'] for m in routed if m['topic'] == topic] == list(range(200))
+    metrics = pool.metrics()
+    assert metrics['routed'] == metrics['received'] == 1000
+    assert metrics['depth'] == metrics['dropped'] == 0
+    assert metrics['latency']['max'] >= metrics['latency']['p50'] >= 0
+
+
+def test_dropOldestAndCoalesceWhileTheRouterIsBusy():
+    gate = threading.Event()
+    busy = threading.Event()
+
+    def slow(m: str):
+        busy.set()
+        gate.wait()
+        routed.append(json.loads(m))
+
+    routed = []
+    pool = RouterPool(slow, workers=1, maxsize=3, policy='drop-oldest')
+    pool.put(message('a', 0))
+    busy.wait()
+    for n in range(1, 6):
+        pool.put(message('a', n))
+    assert pool.depth == 3 and pool.metrics()['dropped'] == 2
+    gate.set()
+    pool.stop()
+    assert [m['data'] for m in routed] == [0, 3, 4, 5]
+
+    gate.clear()
+    busy.clear()
+    routed = []
+    pool = RouterPool(slow, workers=1, maxsize=3, policy='coalesce')
+    pool.put(message('a', 0))
+    busy.wait()
+    for n in range(1, 6):
+        for topic in 'ab':
+            pool.put(message(topic, n))
+    assert pool.depth == 2 and pool.metrics()['coalesced'] == 8
+    gate.set()
+    pool.stop()
+    assert [(m['topic'], m['data']) for m in routed] == [('a', 0), ('a', 5), ('b', 5)]
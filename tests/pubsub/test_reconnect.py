@@ -0,0 +1,83 @@
+import time
+import socket
+import websockets
+from satorilib.asynchronous import AsyncThread
+from satorilib.pubsub import SatoriPubSubConn
+
+
+class DroppingServer:
+    ''' records what it receives, dropping each connection after dropAfter messages '''
+
+    def __init__(self, port: int, dropAfter: int = None):
+        self.port = port
+        self.dropAfter = dropAfter
+        self.received = []
+        self.connections = 0
+        self.thread = AsyncThread()
+        while self.thread.loop is None:
+            time.sleep(0.01)
+        self.server = self.thread.runAsync(task=self.serve).result(timeout=5)
+
+    async def serve(self):
+        return await websockets.serve(self.handle, '127.0.0.1', self.port)
+
+    async def handle(self, ws, path=None):
+        self.connections += 1
+        count = 0
+        async for message in ws:
+            self.received.append(message)
+            count += 1
+            if self.dropAfter is not None and count == self.dropAfter:
+                ws.transport.abort()
+                return
+
+
+def freePort() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def waitFor(condition, timeout: float = 10):
+    began = time.time()
+    while not condition():
+        assert time.time() - began < timeout
+        time.sleep(0.01)
+
+
+def test_sendsAreBufferedUntilTheServerIsUp():
+    port = freePort()
+    conn = SatoriPubSubConn(
+        uid='a', payload='payload', url=f'ws://127.0.0.1:{port}',
+        timeout=1, reconnectDelay=0.05, maxReconnectDelay=0.2, sendBufferSize=5)
+    began = time.time()
+    for n in range(8):
+        conn.send(f'{n}')
+    assert time.time() - began < 1
+    assert list(conn.buffered) == ['3', '4', '5', '6', '7'] and conn.dropped == 3
+    server = DroppingServer(port)
+    waitFor(lambda: len(server.received) == 6)
+    assert server.received == ['key:payload', '3', '4', '5', '6', '7']
+    conn.disconnect()
+
+
+def test_reconnectsWhenDroppedWithoutBlockingSends():
+    port = freePort()
+    server = DroppingServer(port, dropAfter=6)
+    conn = SatoriPubSubConn(
+        uid='a', payload='payload', url=f'ws://127.0.0.1:{port}',
+        timeout=1, reconnectDelay=0.05, maxReconnectDelay=0.2)
+    waitFor(lambda: conn.connected)
+    slowest = 0
+    for n in range(50):
+        began = time.time()
+        conn.send(f'{n}')
+        slowest = max(slowest, time.time() - began)
+        time.sleep(0.02)
+    waitFor(lambda: not conn.buffered and conn.connected)
+    conn.disconnect()
+    assert slowest < 1
+    assert server.connections >= 5
+    sent = [int(m) for m in server.received if m != 'key:payload' and not m.startswith('notice')]
+    # in order, and only what was in flight as a connection dropped is lost
+    assert sent == sorted(sent) and len(sent) >= 40
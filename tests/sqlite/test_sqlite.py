@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import threading
+import pytest
+from satorilib.sqlite import Sqlite
+
+
+def test_pooledConnectionsPerThread(tmp_path):
+    create = 'create table wallet (id integer primary key, pubkey text)'
+    with Sqlite(database=str(tmp_path / 'db.sqlite'), initialize=create, pooled=True) as sql:
+        assert sql.conn is sql.conn
+        assert sql.fetch('pragma journal_mode') == [('wal',)]
+        sql.write('insert into wallet (id, pubkey) values (?, ?)', params=(1, 'a'))
+        others = []
+        thread = threading.Thread(target=lambda: others.append(
+            (sql.conn, sql.fetch('select pubkey from wallet where id=?', params=(1,)))))
+        thread.start()
+        thread.join()
+        assert others[0][0] is not sql.conn and others[0][1] == [('a',)]
+        assert sql.read('select * from wallet')['pubkey'].tolist() == ['a']
+    assert sql.pool.connections == []
+
+
+def test_writeManyAndChunkedLoad(tmp_path):
+    create = 'create table wallet (id integer primary key, pubkey text, cpu integer)'
+    with Sqlite(database=str(tmp_path / 'db.sqlite'), initialize=create, pooled=True) as sql:
+        assert sql.writeMany(
+            table='wallet',
+            columns=['id', 'pubkey', 'cpu'],
+            rows=((i, f'key{i}', i) for i in range(25)),
+            batchSize=10) == 25
+        assert sql.writeMany(
+            table='wallet',
+            columns=['id', 'pubkey', 'cpu'],
+            rows=[(0, 'changed', None), (99, 'new', 1)],
+            conflict=['id']) == 2
+        assert sql.fetch('select count(*) from wallet') == [(26,)]
+        assert sql.fetch('select pubkey, cpu from wallet where id=0') == [('changed', None)]
+        frames = (
+            pd.DataFrame({'value': [float(i), np.nan], 'when': pd.date_range('2020', periods=2)})
+            for i in range(3))
+        assert sql.load(data=frames, table='data') == 6
+        assert sql.load(data=pd.DataFrame({'value': range(5)}), table='more', chunksize=2) == 5
+        assert sql.fetch('select count(value), count(*) from data') == [(3, 6)]
+        assert sql.fetch('select "when" from data limit 1') == [('2020-01-01 00:00:00',)]
+        assert sql.fetch('select sum(value) from more') == [(10,)]
+
+
+def test_iterateAndTypedReads(tmp_path):
+    create = 'create table data (id integer primary key, value real, label text)'
+    with Sqlite(database=str(tmp_path / 'db.sqlite'), initialize=create, pooled=True) as sql:
+        sql.writeMany(
+            table='data',
+            columns=['id', 'value', 'label'],
+            rows=[(i, None if i == 3 else i / 2, f'l{i}') for i in range(25)])
+        query = 'select * from data where id < ? order by id'
+        frames = list(sql.iterate(query, params=(20,), chunksize=8))
+        assert [len(df) for df in frames] == [8, 8, 4]
+        pd.testing.assert_frame_equal(
+            pd.concat(frames, ignore_index=True),
+            sql.read(query, params=(20,)))
+        assert [len(rows) for rows in sql.iterate(query, params=(20,), chunksize=8, frames=False)] == [8, 8, 4]
+        arrays = sql.readNumpy(query, params=(20,), chunksize=8)
+        assert arrays['id'].dtype == np.int64 and arrays['id'].tolist() == list(range(20))
+        assert arrays['value'].dtype == np.float64 and np.isnan(arrays['value'][3])
+        assert arrays['label'].tolist() == [f'l{i}' for i in range(20)]
+        assert list(sql.readNumpy(query, params=(-1,))) == ['id', 'value', 'label']
+
+
+def test_readNumpyPromotesAcrossChunks(tmp_path):
+    with Sqlite(database=str(tmp_path / 'db.sqlite'), initialize='create table data (id integer, value)') as sql:
+        sql.writeMany(
+            table='data',
+            columns=['id', 'value'],
+            rows=list(enumerate([1, 2, 2.75, 3.5, None])))
+        query = 'select value from data order by id'
+        whole = sql.readNumpy(query)['value']
+        chunked = sql.readNumpy(query, chunksize=2)['value']
+        assert whole.dtype == chunked.dtype == np.float64
+        np.testing.assert_array_equal(chunked, [1., 2., 2.75, 3.5, np.nan])
+        np.testing.assert_array_equal(chunked, whole)
+        sql.write('insert into data values (?, ?)', [5, 'six'])
+        assert sql.readNumpy(query, chunksize=2)['value'].tolist() == [1, 2, 2.75, 3.5, None, 'six']
+
+
+def test_writeManyReplaceNeedsAnInsert(tmp_path):
+    with Sqlite(database=str(tmp_path / 'db.sqlite'), initialize='create table data (id integer primary key, value)') as sql:
+        query = 'insert into data values (?, ?)'
+        assert sql.writeMany(query=query, rows=[(1, 'a'), (2, 'b')]) == 2
+        assert sql.writeMany(query=query, rows=[(1, 'c')], replace=True) == 1
+        assert sql.fetch('select value from data order by id') == [('c',), ('b',)]
+        with pytest.raises(ValueError):
+            sql.writeMany(query='update data set value = ? where id = ?', rows=[('d', 2)], replace=True)
+        with pytest.raises(ValueError):
+            sql.writeMany(query=query, rows=[(2, 'd')], conflict=['id'])
+        assert sql.fetch('select value from data order by id') == [('c',), ('b',)]